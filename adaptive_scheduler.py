@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Adaptive polling schedule per event.
+
+Polls come faster when the last diff showed churn or price drops, or as the
+show gets close, and back off multiplicatively while listings are stable.
+A new event starts at POLL_START_SECONDS (the old 5-minute cron cadence)
+and adapts from there. Every interval is clamped to the event's [min, max]
+bounds (POLL_EVENT_BOUNDS, else POLL_MIN_SECONDS/POLL_MAX_SECONDS), and a
+global hourly request budget spreads polls out when too many events are
+hot at once.
+
+The next poll is timed from when the run started, not when its fetch
+finished, and is_due allows POLL_GRACE_SECONDS of slack, so a cron wake-up
+a few seconds early still polls on a 5-minute interval.
+"""
+import os
+from datetime import datetime, timedelta
+
+from listing_diff import churn_ratio
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS poll_schedule (
+    event_id TEXT PRIMARY KEY,
+    interval_seconds REAL NOT NULL,
+    next_poll_at TEXT NOT NULL,
+    last_poll_at TEXT,
+    last_churn REAL,
+    last_price_drops INTEGER
+);
+CREATE TABLE IF NOT EXISTS poll_log (
+    event_id TEXT NOT NULL,
+    polled_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_poll_log_time ON poll_log (polled_at);
+CREATE TABLE IF NOT EXISTS poll_bounds (
+    event_id TEXT PRIMARY KEY,
+    min_interval_seconds REAL,
+    max_interval_seconds REAL
+);
+"""
+
+
+def parse_event_bounds(spec):
+    """{event_id: (min, max)} from 'event:min:max,...'; an empty min or max means the global one"""
+    bounds = {}
+    for entry in (spec or '').split(','):
+        parts = [part.strip() for part in entry.split(':')]
+        if len(parts) != 3 or not parts[0]:
+            continue
+        bounds[parts[0]] = tuple(float(part) if part else None for part in parts[1:])
+    return bounds
+
+
+class AdaptiveScheduler:
+    """Volatility- and deadline-driven poll intervals, bounded by a request budget"""
+
+    def __init__(self, conn, min_interval=None, max_interval=None, hourly_budget=None,
+                 start_interval=None, grace=None, speedup=0.5, backoff=1.5, churn_threshold=0.05):
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self.min_interval = min_interval or float(os.environ.get('POLL_MIN_SECONDS', 60))
+        self.max_interval = max_interval or float(os.environ.get('POLL_MAX_SECONDS', 3600))
+        self.hourly_budget = hourly_budget or int(os.environ.get('POLL_HOURLY_BUDGET', 60))
+        self.start_interval = start_interval or float(os.environ.get('POLL_START_SECONDS', 300))
+        # Slack for cron waking up a little before the next poll time
+        self.grace = grace if grace is not None else float(os.environ.get('POLL_GRACE_SECONDS', 30))
+        self.speedup = speedup
+        self.backoff = backoff
+        self.churn_threshold = churn_threshold
+        for event_id, (min_interval, max_interval) in parse_event_bounds(os.environ.get('POLL_EVENT_BOUNDS')).items():
+            self.set_event_bounds(event_id, min_interval, max_interval)
+
+    def set_event_bounds(self, event_id, min_interval=None, max_interval=None):
+        """Per-event override of the global interval bounds (None keeps the global one)"""
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO poll_bounds (event_id, min_interval_seconds, max_interval_seconds)
+                VALUES (?, ?, ?)
+                ON CONFLICT (event_id) DO UPDATE SET
+                    min_interval_seconds = excluded.min_interval_seconds,
+                    max_interval_seconds = excluded.max_interval_seconds
+            """, (str(event_id), min_interval, max_interval))
+
+    def bounds(self, event_id):
+        row = self.conn.execute(
+            "SELECT min_interval_seconds, max_interval_seconds FROM poll_bounds WHERE event_id = ?",
+            (str(event_id),)
+        ).fetchone()
+        if not row:
+            return self.min_interval, self.max_interval
+        return row[0] or self.min_interval, row[1] or self.max_interval
+
+    def state(self, event_id):
+        row = self.conn.execute(
+            "SELECT interval_seconds, next_poll_at, last_poll_at FROM poll_schedule WHERE event_id = ?",
+            (str(event_id),)
+        ).fetchone()
+        if not row:
+            return None
+        return {
+            'interval_seconds': row[0],
+            'next_poll_at': datetime.fromisoformat(row[1]),
+            'last_poll_at': datetime.fromisoformat(row[2]) if row[2] else None,
+        }
+
+    def next_poll_at(self, event_id):
+        state = self.state(event_id)
+        return state['next_poll_at'] if state else None
+
+    def is_due(self, event_id, now=None):
+        """True when the event's next poll time has passed (give or take the grace) and the hourly budget has room"""
+        now = now or datetime.now()
+        if self.polls_last_hour(now) >= self.hourly_budget:
+            return False
+        next_poll = self.next_poll_at(event_id)
+        return next_poll is None or now >= next_poll - timedelta(seconds=self.grace)
+
+    def polls_last_hour(self, now):
+        cutoff = (now - timedelta(hours=1)).isoformat(timespec='seconds')
+        return self.conn.execute("SELECT COUNT(*) FROM poll_log WHERE polled_at >= ?", (cutoff,)).fetchone()[0]
+
+    def proximity_cap(self, event_date, now):
+        """Longest sensible interval given time to show: 1/48th of the remaining time"""
+        if not event_date:
+            return None
+        remaining = (event_date - now).total_seconds()
+        if remaining <= 0:
+            return None
+        return remaining / 48
+
+    def compute_interval(self, event_id, diff, event_date=None, now=None):
+        """Next interval in seconds from the previous interval, latest diff and time to show"""
+        now = now or datetime.now()
+        min_interval, max_interval = self.bounds(event_id)
+        state = self.state(event_id)
+        interval = state['interval_seconds'] if state else self.start_interval
+
+        churn = churn_ratio(diff) if diff else 0.0
+        price_drops = len(diff['price_drops']) if diff else 0
+        if price_drops or churn >= self.churn_threshold:
+            interval *= self.speedup
+        elif diff is not None and churn == 0:
+            interval *= self.backoff
+
+        cap = self.proximity_cap(event_date, now)
+        if cap is not None:
+            interval = min(interval, cap)
+
+        interval = max(min_interval, min(max_interval, interval))
+
+        # Fair share of the global budget across every scheduled event; this floor
+        # wins over the event's max so the fleet of events never exceeds the budget
+        scheduled = self.conn.execute("SELECT COUNT(*) FROM poll_schedule").fetchone()[0] or 1
+        interval = max(interval, 3600 * scheduled / max(self.hourly_budget, 1))
+
+        return interval
+
+    def record_poll(self, event_id, diff, event_date=None, now=None, started=None):
+        """Log a completed poll and schedule the next one, `interval` after the run `started`;
+        returns the new interval"""
+        now = now or datetime.now()
+        interval = self.compute_interval(event_id, diff, event_date, now)
+        next_poll = (started or now) + timedelta(seconds=interval)
+        churn = churn_ratio(diff) if diff else None
+        price_drops = len(diff['price_drops']) if diff else None
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO poll_log (event_id, polled_at) VALUES (?, ?)",
+                (str(event_id), now.isoformat(timespec='seconds'))
+            )
+            self.conn.execute(
+                "DELETE FROM poll_log WHERE polled_at < ?",
+                ((now - timedelta(days=1)).isoformat(timespec='seconds'),)
+            )
+            self.conn.execute("""
+                INSERT INTO poll_schedule (event_id, interval_seconds, next_poll_at, last_poll_at, last_churn, last_price_drops)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (event_id) DO UPDATE SET
+                    interval_seconds = excluded.interval_seconds,
+                    next_poll_at = excluded.next_poll_at,
+                    last_poll_at = excluded.last_poll_at,
+                    last_churn = excluded.last_churn,
+                    last_price_drops = excluded.last_price_drops
+            """, (str(event_id), interval, next_poll.isoformat(timespec='seconds'),
+                  now.isoformat(timespec='seconds'), churn, price_drops))
+
+        return interval
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the premium monitor pipeline.
+
+Replays recorded SeatPick listings and saved vendor checkout pages from a
+local HTTP server (see mock_server.py) and measures throughput and latency
+for each stage. Results are written as JSON so runs can be compared between
+commits.
+
+Usage:
+    python3 benchmark.py                          # Run all benchmarks
+    python3 benchmark.py --iterations 500         # More iterations per stage
+    python3 benchmark.py --size 5000              # Synthetic payload instead of the recording
+    python3 benchmark.py --workers 4              # Verification across 4 worker processes
+    python3 benchmark.py --compare old.json       # Compare against a previous run
+    python3 benchmark.py --check-import           # Fail if startup exceeds the import budget
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from mock_server import MockSeatPickServer
+from listing_store import ListingStore
+from premium_monitor import PremiumSeatPickMonitor
+from traffic_control import TrafficControl
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+
+# Cold `import premium_monitor` must stay under this, and must not pull in a browser,
+# HTTP client or mail stack: cron runs that skip the poll never need them
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 200))
+HEAVY_MODULES = ['aiohttp', 'rebrowser_playwright', 'camoufox', 'requests', 'bs4', 'smtplib', 'simplepush']
+
+
+class FixturePage:
+    """Minimal stand-in for a Playwright page backed by the mock server"""
+
+    def __init__(self, session):
+        self.session = session
+        self._content = ''
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        async with self.session.get(url) as response:
+            self._content = await response.text()
+        return response
+
+    async def wait_for_timeout(self, timeout):
+        pass
+
+    async def content(self):
+        return self._content
+
+    async def close(self):
+        pass
+
+
+class FixtureContext:
+    """Minimal stand-in for a Playwright browser context"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def new_page(self):
+        return FixturePage(self.session)
+
+
+class BenchmarkMonitor(PremiumSeatPickMonitor):
+    """Premium monitor wired to the mock server, with notifications captured"""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api/proxy/4/events/{self.event_id}/listings"
+        self.vendor_base_url = base_url
+        self.sent_notifications = []
+        # Keep benchmark polls out of the real monitor state
+        self._store = ListingStore(os.path.join(tempfile.mkdtemp(prefix='benchmark_'), 'monitor_state.db'))
+        self._traffic = TrafficControl(rate=0)  # no vendor rate limits against the mock server
+        self.verify_workers = 1
+        self.ticket_sources = 'seatpick'  # SeatGeek has no mock; it would hit the real site
+
+    @contextlib.asynccontextmanager
+    async def verification_context(self):
+        async with aiohttp.ClientSession() as session:
+            yield FixtureContext(session)
+
+    def send_notifications(self, subject, body_html, body_text=None, push_text=None, push=True):
+        self.sent_notifications.append((subject, body_html, body_text, push_text if push else None))
+        return True
+
+
+def summarize(name, latencies, items_per_op=1):
+    """Throughput and latency percentiles for a list of per-operation timings"""
+    total = sum(latencies)
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index] * 1000
+
+    return {
+        'name': name,
+        'iterations': len(latencies),
+        'items_per_op': items_per_op,
+        'total_seconds': round(total, 6),
+        'ops_per_second': round(len(latencies) / total, 2) if total else None,
+        'items_per_second': round(len(latencies) * items_per_op / total, 2) if total else None,
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies) * 1000, 4),
+            'p50': round(percentile(50), 4),
+            'p95': round(percentile(95), 4),
+            'p99': round(percentile(99), 4),
+            'max': round(ordered[-1] * 1000, 4),
+        }
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the monitor's progress prints while timing"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def time_import(module, runs):
+    """Cold import latencies of a module in fresh interpreters, and the heavy modules it loaded"""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    latencies = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().splitlines()
+        latencies.append(float(output[-2]))
+        loaded = [m for m in output[-1].split(',') if m]
+    return latencies, loaded
+
+
+def check_import_budget(runs=5):
+    """Print cold import time of premium_monitor; False if over budget or heavy deps loaded"""
+    latencies, loaded = time_import('premium_monitor', runs)
+    p50 = summarize('import', latencies)['latency_ms']['p50']
+    print(f"⏱️  import premium_monitor: p50 {p50:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    if loaded:
+        print(f"❌ Eagerly imported: {', '.join(loaded)}")
+    if p50 > IMPORT_BUDGET_MS:
+        print("❌ Import budget exceeded")
+    return p50 <= IMPORT_BUDGET_MS and not loaded
+
+
+def time_sync(func, iterations):
+    latencies = []
+    with quiet():
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def time_async(func, iterations):
+    latencies = []
+    with quiet():
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await func()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_benchmarks(iterations, e2e_iterations, size=None, workers=1, vendor_latency_ms=0):
+    server = MockSeatPickServer(size=size, seed=0, vendor_latency_ms=vendor_latency_ms)
+    base_url = server.start()
+    print(f"🧪 Mock server at {base_url}")
+
+    try:
+        monitor = BenchmarkMonitor(base_url)
+        listings = server.payload.get('listings', [])
+        deeplinks = [l['deepLink'] for l in listings if l.get('deepLink')]
+        results = []
+
+        # Startup
+        print("⏱️  import premium_monitor...")
+        latencies, _ = time_import('premium_monitor', max(3, min(iterations // 20, 10)))
+        results.append(summarize('import_premium_monitor', latencies))
+
+        # Filtering
+        print("⏱️  Filtering...")
+        latencies = time_sync(lambda: monitor.filter_listings(listings), iterations)
+        results.append(summarize('filter_listings', latencies, len(listings)))
+        with quiet():
+            filtered = monitor.filter_listings(listings)
+
+        # URL sanitizing
+        print("⏱️  sanitize_checkout_url...")
+        latencies = time_sync(lambda: [monitor.sanitize_checkout_url(u) for u in deeplinks], iterations)
+        results.append(summarize('sanitize_checkout_url', latencies, len(deeplinks)))
+
+        # Price extraction from saved checkout pages, per vendor
+        async with aiohttp.ClientSession() as session:
+            context = FixtureContext(session)
+            for seller in ['vividseats', 'vgg', 'tn', 'te']:
+                sample = next((l for l in listings if l['seller'] == seller), None)
+                if not sample:
+                    continue
+                page = await context.new_page()
+                await page.goto(monitor.navigation_url(monitor.sanitize_checkout_url(sample['deepLink'])))
+                print(f"⏱️  extract_final_price ({seller})...")
+                latencies = await time_async(lambda: monitor.extract_final_price(page, seller), iterations)
+                results.append(summarize(f'extract_final_price[{seller}]', latencies))
+
+        # Verification of every filtered listing, in-process or across worker processes
+        name = 'verify_final_prices' if workers == 1 else f'verify_final_prices[workers={workers}]'
+        print(f"⏱️  {name}...")
+        monitor.verify_workers = workers
+        latencies = await time_async(lambda: monitor.verify_final_prices(filtered), e2e_iterations)
+        results.append(summarize(name, latencies, len(filtered)))
+        monitor.verify_workers = 1
+
+        # Rendering
+        with quiet():
+            verified = await monitor.verify_final_prices(filtered)
+        print("⏱️  Rendering...")
+        latencies = time_sync(lambda: (
+            monitor.format_tickets_html_premium(verified, "Benchmark"),
+            monitor.generate_dynamic_subject(verified, 400, "test")
+        ), iterations)
+        results.append(summarize('render_alert', latencies, len(verified)))
+
+        # End-to-end check_for_alerts against the mock server
+        print("⏱️  End-to-end check_for_alerts...")
+        latencies = await time_async(monitor.check_for_alerts, e2e_iterations)
+        results.append(summarize('check_for_alerts', latencies, len(listings)))
+
+        return results
+    finally:
+        server.stop()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def save_results(results, output=None):
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {r['name']: r for r in results},
+    }
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return output, report
+
+
+def print_report(report, baseline=None):
+    print("\n📊 Benchmark results")
+    print("=" * 86)
+    print(f"{'stage':32} {'iters':>6} {'items/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'vs base':>10}")
+    for name, r in report['results'].items():
+        change = ''
+        if baseline and name in baseline.get('results', {}):
+            old = baseline['results'][name]['latency_ms']['p50']
+            new = r['latency_ms']['p50']
+            if old:
+                change = f"{(new - old) / old * 100:+.1f}%"
+        print(f"{name:32} {r['iterations']:>6} {r['items_per_second'] or 0:>12,.0f} "
+              f"{r['latency_ms']['p50']:>10.3f} {r['latency_ms']['p95']:>10.3f} {change:>10}")
+    if baseline:
+        print(f"\nBaseline: commit {baseline.get('commit')} at {baseline.get('timestamp')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the premium monitor")
+    parser.add_argument('--iterations', type=int, default=200, help="iterations per micro-benchmark")
+    parser.add_argument('--e2e-iterations', type=int, default=10, help="iterations of check_for_alerts")
+    parser.add_argument('--size', type=int, help="synthetic listings to serve instead of the recording")
+    parser.add_argument('--workers', type=int, default=1, help="verification worker processes")
+    parser.add_argument('--vendor-latency-ms', type=int, default=0, help="delay on mock checkout pages")
+    parser.add_argument('--output', help="results JSON path (default: benchmark_results/)")
+    parser.add_argument('--compare', help="previous results JSON to compare against")
+    parser.add_argument('--check-import', action='store_true',
+                        help="only check the premium_monitor import budget; exit 1 if exceeded")
+    args = parser.parse_args()
+
+    if args.check_import:
+        sys.exit(0 if check_import_budget() else 1)
+
+    results = asyncio.run(run_benchmarks(args.iterations, args.e2e_iterations, args.size,
+                                         args.workers, args.vendor_latency_ms))
+    output, report = save_results(results, args.output)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+    print(f"\n📁 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 import asyncio
 import aiohttp
 
+from quantity_index import PARTY_SIZE, can_sell
+
 async def find_cheap_tickets():
     """Find tickets that might be causing false alerts"""
     
@@ -52,11 +54,11 @@ async def find_cheap_tickets():
         quantity = ticket.get('quantity', 1)
         splits = ticket.get('splits', [])
         
-        # Check if can buy 2 together
-        can_buy_two = quantity >= 2 and (not splits or 2 in splits or max(splits) >= 2)
-        two_status = "✅ 2+ together" if can_buy_two else f"❌ Only {quantity}, splits: {splits}"
+        # Check if can buy PARTY_SIZE together (same rule the monitor filters on)
+        can_buy_party = can_sell(ticket, PARTY_SIZE)
+        party_status = f"✅ {PARTY_SIZE} together" if can_buy_party else f"❌ Only {quantity}, splits: {splits}"
         
-        print(f"{i+1:2d}. {section:15s} ${price:4.0f} via {seller:12s} {two_status}")
+        print(f"{i+1:2d}. {section:15s} ${price:4.0f} via {seller:12s} {party_status}")
         if ticket.get('deepLink'):
             print(f"    Link: {ticket['deepLink'][:80]}...")
         print()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Columnar history of ticket observations.
+
+The extract scripts used to write a new timestamped CSV per run. Here each
+run appends a Parquet file to a date-partitioned dataset instead:
+
+    ticket_history/<dataset>/date=2025-09-07/part-001707-1a2b3c4d.parquet
+
+section, row, seller and site are dictionary-encoded, and `compact` merges
+the small per-run files of a day into one. History scans go through
+pyarrow.dataset with memory-mapped reads instead of globbing and parsing
+CSVs.
+
+pyarrow is optional: `available()` is False without it and the extract
+scripts fall back to CSV.
+
+Usage:
+    python3 columnar_export.py compact [dataset]
+    python3 columnar_export.py import-csv tickets_*.csv
+    python3 columnar_export.py summary [dataset]
+"""
+import argparse
+import csv
+import glob
+import importlib.util
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+EXPORT_DIR = os.environ.get(
+    'TICKET_HISTORY_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ticket_history')
+)
+
+# Column name -> type; 'dict' columns are dictionary-encoded strings
+SCHEMAS = {
+    'tickets': [
+        ('timestamp', 'timestamp'),
+        ('section', 'dict'),
+        ('row', 'dict'),
+        ('price_per_ticket', 'float'),
+        ('total_for_2', 'float'),
+        ('quantity', 'int'),
+        ('seller', 'dict'),
+        ('site', 'dict'),
+        ('checkout_url', 'string'),
+    ],
+    'verified_tickets': [
+        ('timestamp', 'timestamp'),
+        ('section', 'dict'),
+        ('row', 'dict'),
+        ('seatpick_price', 'float'),
+        ('final_price_per_ticket', 'float'),
+        ('total_for_2', 'float'),
+        ('price_accurate', 'dict'),
+        ('seller', 'dict'),
+        ('site', 'dict'),
+        ('checkout_url', 'string'),
+    ],
+}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def available():
+    """True when pyarrow is installed"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def arrow_schema(dataset):
+    import pyarrow as pa
+
+    types = {
+        'timestamp': pa.timestamp('s'),
+        'dict': pa.dictionary(pa.int32(), pa.string()),
+        'float': pa.float64(),
+        'int': pa.int32(),
+        'string': pa.string(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in SCHEMAS[dataset]])
+
+
+def coerce(value, kind):
+    """CSV/dict field value as the Python type its Arrow column expects"""
+    if value is None or value == '':
+        return None
+    if kind == 'timestamp':
+        return value if isinstance(value, datetime) else datetime.strptime(value, TIMESTAMP_FORMAT)
+    if kind in ('float', 'int'):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            # Older CSVs carry 'N/A' for prices SeatPick didn't report
+            return None
+        return number if kind == 'float' else int(number)
+    return str(value)
+
+
+def to_table(dataset, rows):
+    import pyarrow as pa
+
+    columns = {name: [coerce(row.get(name), kind) for row in rows] for name, kind in SCHEMAS[dataset]}
+    return pa.Table.from_pydict(columns, schema=arrow_schema(dataset))
+
+
+def partition_dir(dataset, date, root=None):
+    return os.path.join(root or EXPORT_DIR, dataset, f"date={date}")
+
+
+def append_observations(dataset, rows, root=None):
+    """Write one run's rows as new Parquet file(s) in their date partitions; returns the paths"""
+    import pyarrow.parquet as pq
+
+    by_date = {}
+    for row in rows:
+        date = coerce(row.get('timestamp'), 'timestamp').strftime('%Y-%m-%d')
+        by_date.setdefault(date, []).append(row)
+
+    paths = []
+    for date, date_rows in by_date.items():
+        directory = partition_dir(dataset, date, root)
+        os.makedirs(directory, exist_ok=True)
+        stamp = coerce(date_rows[0].get('timestamp'), 'timestamp').strftime('%H%M%S')
+        path = os.path.join(directory, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(to_table(dataset, date_rows), path, compression='zstd')
+        paths.append(path)
+    return paths
+
+
+def compact(dataset, root=None, min_files=2):
+    """Merge each date partition's small files into one, sorted by time; returns partitions merged"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    merged = 0
+    for directory in sorted(glob.glob(os.path.join(root or EXPORT_DIR, dataset, 'date=*'))):
+        parts = sorted(glob.glob(os.path.join(directory, 'part-*.parquet')))
+        if len(parts) < min_files:
+            continue
+
+        table = pa.concat_tables([pq.read_table(p, memory_map=True) for p in parts])
+        table = table.unify_dictionaries().combine_chunks().sort_by('timestamp')
+        target = os.path.join(directory, f"part-compacted-{uuid.uuid4().hex[:8]}.parquet")
+        # Write the merged file before removing inputs so a crash never loses rows
+        pq.write_table(table, target + '.tmp', compression='zstd')
+        os.replace(target + '.tmp', target)
+        for p in parts:
+            os.remove(p)
+        merged += 1
+    return merged
+
+
+def read_history(dataset, root=None, columns=None, filter=None):
+    """Whole history of a dataset as an Arrow table (date comes from the partition)"""
+    import pyarrow.dataset as ds
+
+    path = os.path.join(root or EXPORT_DIR, dataset)
+    if not os.path.isdir(path):
+        return None
+    data = ds.dataset(path, format='parquet', partitioning='hive')
+    # Each file carries its own dictionaries; unify so group_by/joins work across files
+    return data.to_table(columns=columns, filter=filter).unify_dictionaries()
+
+
+def import_csv(paths, dataset='tickets', root=None):
+    """Backfill existing per-run CSV snapshots into the dataset; returns rows imported"""
+    total = 0
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        if rows:
+            append_observations(dataset, rows, root)
+            total += len(rows)
+    return total
+
+
+def summary(dataset, root=None):
+    """Cheapest price per section across all history"""
+    import pyarrow.compute as pc
+
+    price_column = 'final_price_per_ticket' if dataset == 'verified_tickets' else 'price_per_ticket'
+    start = time.perf_counter()
+    table = read_history(dataset, root, columns=['timestamp', 'section', price_column],
+                         filter=pc.is_valid(pc.field(price_column)))
+    if table is None or table.num_rows == 0:
+        print(f"No {dataset} history in {root or EXPORT_DIR}")
+        return
+    sections = table.group_by('section').aggregate([(price_column, 'min'), (price_column, 'count')])
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 {dataset}: {table.num_rows:,} observations, "
+          f"{pc.min(table['timestamp']).as_py()} → {pc.max(table['timestamp']).as_py()} ({elapsed * 1000:.1f} ms)")
+    for row in sorted(sections.to_pylist(), key=lambda r: r[f'{price_column}_min']):
+        print(f"  {row['section']:15} min ${row[f'{price_column}_min']:.0f} over {row[f'{price_column}_count']} observations")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar ticket history")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('compact', help="merge small files per date partition")
+    p.add_argument('dataset', nargs='?', choices=list(SCHEMAS))
+    p = sub.add_parser('import-csv', help="backfill per-run CSV snapshots")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--dataset', choices=list(SCHEMAS), default='tickets')
+    p = sub.add_parser('summary', help="cheapest price per section over all history")
+    p.add_argument('dataset', nargs='?', choices=list(SCHEMAS), default='tickets')
+    args = parser.parse_args()
+
+    if not available():
+        print("❌ pyarrow is not installed (pip install pyarrow)")
+        sys.exit(1)
+
+    if args.command == 'compact':
+        for dataset in [args.dataset] if args.dataset else list(SCHEMAS):
+            print(f"🗜️  {dataset}: compacted {compact(dataset)} partitions")
+    elif args.command == 'import-csv':
+        print(f"✅ Imported {import_csv(args.paths, args.dataset)} rows into {args.dataset}")
+    elif args.command == 'summary':
+        summary(args.dataset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Leases and exactly-once alert claims for redundant monitor nodes.
+
+Nodes share one SQLite file (MONITOR_DB on a shared volume). A lease is a
+row naming its owner and expiry; taking one is a single upsert that only
+succeeds when the row is free, expired or already ours. Leases are
+released when the work is done; expiry only matters when a node dies
+holding one, and then it falls to whoever asks next.
+
+- event:<id> leases decide which node fetches SeatPick and records the
+  snapshot for a poll; nodes polling at the same time work from that
+  stored snapshot instead.
+- verify:<event>:<listing key> leases split verification jobs so
+  concurrent nodes check different listings instead of the same 20.
+- alert_claims rows make each (event, listing, price) alert go out once:
+  a claim is only re-takeable if it was never marked sent and is older
+  than the lease period (the claiming node died mid-send).
+"""
+import os
+import socket
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alert_claims (
+    alert_key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    sent_at REAL
+);
+"""
+
+
+def default_node_id():
+    return os.environ.get('MONITOR_NODE_ID') or f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Coordinator:
+    """SQLite leases for events and verification jobs, plus alert claims"""
+
+    def __init__(self, conn, node_id=None, lease_seconds=None):
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self.node_id = node_id or default_node_id()
+        self.lease_seconds = lease_seconds or float(os.environ.get('LEASE_SECONDS', 300))
+
+    def acquire(self, name, ttl=None, now=None):
+        """Take or renew a lease; False while another live node holds it"""
+        now = now or time.time()
+        with self.conn:
+            cursor = self.conn.execute("""
+                INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at <= ?
+            """, (name, self.node_id, now + (ttl or self.lease_seconds), now))
+        return cursor.rowcount > 0
+
+    def release(self, name):
+        with self.conn:
+            self.conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.node_id))
+
+    def holder(self, name, now=None):
+        """Node currently holding a lease, or None"""
+        row = self.conn.execute(
+            "SELECT owner FROM leases WHERE name = ? AND expires_at > ?", (name, now or time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def claim_jobs(self, event_id, listings, key, limit, ttl=None):
+        """Up to `limit` listings, in order, whose verification lease this node got"""
+        claimed = []
+        for listing in listings:
+            if len(claimed) >= limit:
+                break
+            if self.acquire(f"verify:{event_id}:{key(listing)}", ttl):
+                claimed.append(listing)
+        return claimed
+
+    def release_jobs(self, event_id, listings, key):
+        """Hand back verification leases once the jobs are done"""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM leases WHERE name = ? AND owner = ?",
+                [(f"verify:{event_id}:{key(listing)}", self.node_id) for listing in listings]
+            )
+
+    def claim_alert(self, alert_key, now=None):
+        """True if this node should send the alert: unclaimed, or claimed by a node that died before sending"""
+        now = now or time.time()
+        with self.conn:
+            cursor = self.conn.execute("""
+                INSERT INTO alert_claims (alert_key, owner, claimed_at) VALUES (?, ?, ?)
+                ON CONFLICT (alert_key) DO UPDATE SET
+                    owner = excluded.owner,
+                    claimed_at = excluded.claimed_at
+                WHERE alert_claims.sent_at IS NULL
+                  AND (alert_claims.owner = excluded.owner OR alert_claims.claimed_at <= ?)
+            """, (alert_key, self.node_id, now, now - self.lease_seconds))
+        return cursor.rowcount > 0
+
+    def mark_alerts_sent(self, alert_keys, now=None):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE alert_claims SET sent_at = ? WHERE alert_key = ? AND owner = ?",
+                [(now or time.time(), key, self.node_id) for key in alert_keys]
+            )
+
+    def release_alerts(self, alert_keys):
+        """Give claims back after a failed send so another run can retry"""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM alert_claims WHERE alert_key = ? AND owner = ? AND sent_at IS NULL",
+                [(key, self.node_id) for key in alert_keys]
+            )
@@ -7,6 +7,9 @@ import csv
 from datetime import datetime
 import aiohttp
 
+import columnar_export
+from quantity_index import PARTY_SIZE, can_sell
+
 async def extract_tickets_to_csv():
     """Extract tickets and save to CSV with all details"""
     # Define constants directly
@@ -54,13 +57,9 @@ async def extract_tickets_to_csv():
         seller = listing.get('seller', 'Unknown')
         deep_link = listing.get('deepLink', '')
         row = listing.get('row', '')
-        splits = listing.get('splits', [])
-        
-        # Determine if 2 tickets can be bought together
-        can_buy_2 = quantity >= 2 and (not splits or 2 in splits)
         
-        # Only include if 2 tickets can be bought together
-        if not can_buy_2:
+        # Only include if PARTY_SIZE tickets can be bought together
+        if not can_sell(listing, PARTY_SIZE):
             continue
         
         tickets.append({
@@ -78,23 +77,28 @@ async def extract_tickets_to_csv():
     # Sort by price
     tickets.sort(key=lambda x: x['price_per_ticket'])
     
-    # Write to CSV
-    csv_filename = f'tickets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    
-    with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['timestamp', 'section', 'row', 'price_per_ticket', 'total_for_2', 
-                      'quantity', 'seller', 'site', 'checkout_url']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    # Append to the columnar history (date-partitioned Parquet); CSV only without pyarrow
+    if columnar_export.available():
+        paths = columnar_export.append_observations('tickets', tickets)
+        csv_filename = paths[0] if paths else columnar_export.EXPORT_DIR
+        print(f"✅ Appended {len(tickets)} tickets to {csv_filename}")
+    else:
+        csv_filename = f'tickets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         
-        writer.writeheader()
-        for ticket in tickets:
-            writer.writerow(ticket)
-    
-    print(f"✅ Saved {len(tickets)} tickets to {csv_filename}")
+        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+            fieldnames = ['timestamp', 'section', 'row', 'price_per_ticket', 'total_for_2', 
+                          'quantity', 'seller', 'site', 'checkout_url']
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            
+            writer.writeheader()
+            for ticket in tickets:
+                writer.writerow(ticket)
+        
+        print(f"✅ Saved {len(tickets)} tickets to {csv_filename}")
     
     # Print summary statistics
     print("\n📊 Summary Statistics:")
-    print(f"Premium tickets under $400 (2 together): {len(tickets)}")
+    print(f"Premium tickets under $400 ({PARTY_SIZE} together): {len(tickets)}")
     
     if tickets:
         # Count by section
@@ -106,7 +110,7 @@ async def extract_tickets_to_csv():
             sections[section].append(ticket)
         
         print(f"Sections with tickets: {len(sections)}")
-        print("\n🎯 Tickets by section (all under $400, 2 tickets together):")
+        print(f"\n🎯 Tickets by section (all under $400, {PARTY_SIZE} tickets together):")
         for section in ["Front Left", "Front Right", "Front Center", "Left", "Right", "Center"]:
             if section in sections:
                 section_tickets = sections[section]
@@ -117,12 +121,12 @@ async def extract_tickets_to_csv():
         # Show all tickets sorted by price
         print("\n💰 All tickets (sorted by price per ticket):")
         for ticket in tickets:
-            print(f"  {ticket['section']:15} - ${ticket['price_per_ticket']:3.0f}/ticket (${ticket['total_for_2']:4.0f} total) - {ticket['seller']}")
+            print(f"  {ticket['section']:15} - ${ticket['price_per_ticket']:3.0f}/ticket (${ticket['price_per_ticket'] * PARTY_SIZE:4.0f} for {PARTY_SIZE}) - {ticket['seller']}")
     else:
-        print("No tickets found under $400 where you can buy 2 together (excluding Reserved Seating)")
+        print(f"No tickets found under $400 where you can buy {PARTY_SIZE} together (excluding Reserved Seating)")
     
     return csv_filename
 
 if __name__ == "__main__":
     csv_file = asyncio.run(extract_tickets_to_csv())
-    print(f"\n📁 CSV file created: {csv_file}")
\ No newline at end of file
+    print(f"\n📁 Tickets written to: {csv_file}")
\ No newline at end of file
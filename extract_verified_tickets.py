@@ -6,6 +6,8 @@ import asyncio
 import csv
 from datetime import datetime
 from premium_monitor import PremiumSeatPickMonitor
+import columnar_export
+from quantity_index import PARTY_SIZE, can_sell
 
 async def extract_verified_tickets_to_csv():
     """Extract only verified tickets with final prices to CSV"""
@@ -43,10 +45,9 @@ async def extract_verified_tickets_to_csv():
             print(f"   ❌ Too expensive: {ticket['section']} final=${final_price} via {ticket['seller']}")
             continue
             
-        # Check quantity - must be able to buy 2 together
-        quantity = ticket.get('quantity', 1)
-        if quantity < 2:
-            print(f"   ❌ Single ticket only: {ticket['section']} via {ticket['seller']}")
+        # Check quantity - must be able to buy PARTY_SIZE together
+        if not can_sell(ticket, PARTY_SIZE):
+            print(f"   ❌ Can't buy {PARTY_SIZE} together: {ticket['section']} via {ticket['seller']}")
             continue
         
         verified_tickets.append({
@@ -65,26 +66,30 @@ async def extract_verified_tickets_to_csv():
         print(f"   ✅ Verified: {ticket['section']} final=${final_price}/ticket via {ticket['seller']}")
     
     if not verified_tickets:
-        print("\n❌ No verified tickets found under $400 where you can buy 2 together")
+        print(f"\n❌ No verified tickets found under $400 where you can buy {PARTY_SIZE} together")
         return None
     
     # Sort by final price
     verified_tickets.sort(key=lambda x: x['final_price_per_ticket'])
     
-    # Write to CSV
-    csv_filename = f'verified_tickets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    
-    with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['timestamp', 'section', 'row', 'seatpick_price', 
-                      'final_price_per_ticket', 'total_for_2', 'price_accurate',
-                      'seller', 'site', 'checkout_url']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    # Append to the columnar history (date-partitioned Parquet); CSV only without pyarrow
+    if columnar_export.available():
+        csv_filename = columnar_export.append_observations('verified_tickets', verified_tickets)[0]
+        print(f"\n✅ Appended {len(verified_tickets)} VERIFIED tickets to {csv_filename}")
+    else:
+        csv_filename = f'verified_tickets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         
-        writer.writeheader()
-        for ticket in verified_tickets:
-            writer.writerow(ticket)
-    
-    print(f"\n✅ Saved {len(verified_tickets)} VERIFIED tickets to {csv_filename}")
+        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+            fieldnames = ['timestamp', 'section', 'row', 'seatpick_price', 
+                          'final_price_per_ticket', 'total_for_2', 'price_accurate',
+                          'seller', 'site', 'checkout_url']
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            
+            writer.writeheader()
+            for ticket in verified_tickets:
+                writer.writerow(ticket)
+        
+        print(f"\n✅ Saved {len(verified_tickets)} VERIFIED tickets to {csv_filename}")
     
     # Print summary
     print("\n📊 Summary of VERIFIED tickets under $400:")
@@ -92,7 +97,7 @@ async def extract_verified_tickets_to_csv():
     
     for ticket in verified_tickets:
         price_warning = "" if ticket['price_accurate'] == 'Yes' else " ⚠️ (price differs from listing)"
-        print(f"{ticket['section']:15} - Final: ${ticket['final_price_per_ticket']:3.0f}/ticket (${ticket['total_for_2']:4.0f} total) - {ticket['seller']}{price_warning}")
+        print(f"{ticket['section']:15} - Final: ${ticket['final_price_per_ticket']:3.0f}/ticket (${ticket['final_price_per_ticket'] * PARTY_SIZE:4.0f} for {PARTY_SIZE}) - {ticket['seller']}{price_warning}")
     
     # Alert about tickets under $300
     under_300 = [t for t in verified_tickets if t['final_price_per_ticket'] < 300]
@@ -106,6 +111,6 @@ async def extract_verified_tickets_to_csv():
 if __name__ == "__main__":
     csv_file = asyncio.run(extract_verified_tickets_to_csv())
     if csv_file:
-        print(f"\n📁 CSV file created: {csv_file}")
+        print(f"\n📁 Verified tickets written to: {csv_file}")
     else:
-        print("\n⚠️ No CSV created - no verified tickets met the criteria")
\ No newline at end of file
+        print("\n⚠️ Nothing written - no verified tickets met the criteria")
\ No newline at end of file
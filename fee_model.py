@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Per-seller fee model fitted from stored checkout verifications.
+
+Markups are multiplicative (VividSeats ~+35%, Viagogo $293 -> $396), so the
+model works on log(final / listed) for each seller and section, falling back
+to the seller as a whole when a section has too few verifications. A
+prediction is the listed price times the mean markup with a prediction
+interval around it; a listing whose whole interval sits above the alert
+limit can skip the browser.
+"""
+import math
+
+# Verifications needed before a (seller, section) or seller group is trusted
+MIN_SAMPLES = 3
+
+# ~95% two-sided interval
+Z = 1.96
+
+# Floor on the log-markup spread so a few identical observations don't look certain
+MIN_LOG_STD = 0.03
+
+
+def log_stats(values):
+    """(count, mean, sample std) of a list of log ratios"""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return n, mean, MIN_LOG_STD
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return n, mean, max(math.sqrt(variance), MIN_LOG_STD)
+
+
+class FeeModel:
+    """Predicts all-in prices with an interval from (seller, section, listed, final) history"""
+
+    def __init__(self, history=(), min_samples=MIN_SAMPLES, z=Z):
+        self.min_samples = min_samples
+        self.z = z
+        self.groups = {}
+        self.fit(history)
+
+    def fit(self, history):
+        """Refit from (seller, section, listed_price, final_price) rows"""
+        ratios = {}
+        for seller, section, listed_price, final_price in history:
+            if not listed_price or not final_price:
+                continue
+            log_ratio = math.log(final_price / listed_price)
+            ratios.setdefault((seller, section), []).append(log_ratio)
+            ratios.setdefault((seller, None), []).append(log_ratio)
+
+        self.groups = {key: log_stats(values) for key, values in ratios.items()
+                       if len(values) >= self.min_samples}
+        return self
+
+    def params(self, seller, section):
+        """Most specific fitted (count, mean, std) for a listing, or None"""
+        return self.groups.get((seller, section)) or self.groups.get((seller, None))
+
+    def predict(self, listing):
+        """(low, expected, high) all-in price per ticket, or None without enough history"""
+        price = listing.get('price') or 0
+        params = self.params(listing.get('seller', ''), listing.get('section', ''))
+        if price <= 0 or not params:
+            return None
+
+        n, mean, std = params
+        margin = self.z * std * math.sqrt(1 + 1 / n)
+        return (
+            round(price * math.exp(mean - margin), 2),
+            round(price * math.exp(mean), 2),
+            round(price * math.exp(mean + margin), 2),
+        )
+
+    def classify(self, listing, low_threshold, high_threshold):
+        """'below', 'above', 'ambiguous' or 'unknown' relative to the alert thresholds"""
+        prediction = self.predict(listing)
+        if not prediction:
+            return 'unknown'
+        low, _, high = prediction
+        if low >= high_threshold:
+            return 'above'
+        if high < low_threshold:
+            return 'below'
+        return 'ambiguous'
+
+    def describe(self):
+        """One line per seller-level group, for logs"""
+        lines = []
+        for (seller, section), (n, mean, std) in sorted(self.groups.items(), key=lambda kv: str(kv[0])):
+            if section is None:
+                lines.append(f"{seller}: +{math.exp(mean) - 1:.0%} fees (n={n}, ±{std:.0%})")
+        return lines
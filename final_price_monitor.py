@@ -7,6 +7,8 @@ from datetime import datetime
 from playwright.async_api import async_playwright
 import time
 
+from traffic_control import TrafficControl, host_of
+
 class FinalPriceMonitor:
     """Monitor that ONLY reports final prices with all fees included"""
     
@@ -26,6 +28,9 @@ class FinalPriceMonitor:
             "Right"
         ]
         
+        # Per-vendor rate limits and circuit breakers for checkout pages
+        self.traffic = TrafficControl()
+        
     async def fetch_and_verify(self, max_price=400):
         """Fetch listings and verify FINAL prices with fees"""
         
@@ -94,14 +99,21 @@ class FinalPriceMonitor:
                 if not deeplink:
                     continue
                 
+                host = host_of(deeplink)
+                if not self.traffic.allow(host):
+                    print(f"\n⛔ Skipping {section} via {seller} - {host} is blocking us (circuit open)")
+                    continue
+                
                 row_info = f"Row {row}" if row else ""
                 print(f"\n📍 {section} {row_info}")
                 print(f"   SeatPick shows: ${seatpick_price}")
                 print(f"   Seller: {seller}")
                 
+                await self.traffic.acquire(host)
                 try:
                     page = await context.new_page()
-                    await page.goto(deeplink, wait_until='domcontentloaded', timeout=20000)
+                    response = await page.goto(deeplink, wait_until='domcontentloaded', timeout=20000)
+                    self.traffic.record(host, status=getattr(response, 'status', None))
                     await page.wait_for_timeout(5000)
                     
                     # Extract FINAL price with fees
@@ -138,12 +150,11 @@ class FinalPriceMonitor:
                     
                 except Exception as e:
                     print(f"   ❌ Error: {str(e)[:50]}")
+                    self.traffic.record(host, error=e)
                     try:
                         await page.close()
                     except:
                         pass
-                
-                await asyncio.sleep(2)  # Rate limiting
             
             await browser.close()
         
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic SeatPick listings payloads for scale testing.
+
+Listings are bootstrap-resampled from the checked-in tickets_*.csv snapshots,
+so section, row, quantity/split and seller mixes (and which sections each
+seller lists in) match what the real API returns. Prices are jittered around
+the observed price for the sampled row.
+
+Usage:
+    python3 generate_listings.py --size 10k                 # Write a 10,000 listing payload
+    python3 generate_listings.py --size 100k --seed 7 --output /tmp/listings_100k.json
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import random
+from collections import Counter
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Affiliate deep link shapes SeatPick hands out for each seller
+DEEPLINK_TEMPLATES = {
+    'vividseats': "https://vivid-seats.pxf.io/c/3289547/952533/12730?u=https://www.vividseats.com/r/production/5644998?showDetails=VB{id}&qty=2",
+    'vgg': "https://viagogo.prf.hn/click/camref:1101lrBs2/pubref:gggggg/destination:https%3A//checkout.viagogo.com/secure/buy/Initialise%3FlistingId%3D{id}%26qty%3D2",
+    'tn': "https://ticketnetwork.lusg.net/c/3289547/1592982/2322?u=https://www.ticketnetwork.com/e/checkout-ticket?ticketGroupId={id}",
+    'te': "https://buy.events365.com/checkout/preview/2951272/{id}",
+}
+
+
+def parse_size(value):
+    """Parse sizes like 1000, 10k or 1m"""
+    value = str(value).strip().lower()
+    multiplier = 1
+    if value.endswith('k'):
+        multiplier, value = 1000, value[:-1]
+    elif value.endswith('m'):
+        multiplier, value = 1000000, value[:-1]
+    return int(float(value) * multiplier)
+
+
+def deeplink_for(seller, listing_id):
+    """Build a SeatPick-style affiliate deep link for a synthetic listing"""
+    template = DEEPLINK_TEMPLATES.get(seller, DEEPLINK_TEMPLATES['tn'])
+    return template.format(id=listing_id)
+
+
+def splits_for(seller, quantity, can_buy_two):
+    """Purchasable split sizes in the shape each seller reports them"""
+    if not can_buy_two:
+        return [quantity] if quantity > 1 else []
+    if seller in ('vividseats', 'tn'):
+        # These sellers never leave a single orphan ticket behind
+        return [n for n in range(1, quantity + 1) if n != quantity - 1]
+    # Viagogo / Events365 listings come through without explicit splits
+    return []
+
+
+def load_observations(paths=None):
+    """Load listing rows from the checked-in CSV snapshots"""
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join(REPO_DIR, 'tickets_*.csv')))
+
+    rows = []
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    price = float(row['price_per_ticket'])
+                    quantity = int(row['quantity'])
+                except (KeyError, ValueError):
+                    continue
+                rows.append({
+                    'section': row.get('section', ''),
+                    'row': row.get('row', ''),
+                    'price': price,
+                    'quantity': quantity,
+                    'seller': row.get('seller', ''),
+                    'can_buy_two': row.get('can_buy_2_together', 'Yes') != 'No' and quantity >= 2,
+                })
+    return rows
+
+
+class ListingGenerator:
+    """Draws realistic SeatPick listings from observed CSV rows"""
+
+    def __init__(self, observations=None, seed=None, price_jitter=0.12):
+        self.observations = observations if observations is not None else load_observations()
+        if not self.observations:
+            raise ValueError("No observed listings to sample from (tickets_*.csv missing?)")
+        self.rng = random.Random(seed)
+        self.price_jitter = price_jitter
+        self.next_id = 9000000000
+
+    def new_listing(self):
+        template = self.rng.choice(self.observations)
+        self.next_id += 1
+        price = max(20, round(template['price'] * self.rng.lognormvariate(0, self.price_jitter)))
+        return {
+            'section': template['section'],
+            'row': template['row'],
+            'price': price,
+            'quantity': template['quantity'],
+            'splits': splits_for(template['seller'], template['quantity'], template['can_buy_two']),
+            'seller': template['seller'],
+            'deepLink': deeplink_for(template['seller'], self.next_id),
+        }
+
+    def payload(self, size, event_id=366607):
+        """A full listings payload with `size` listings"""
+        return {'eventId': event_id, 'listings': [self.new_listing() for _ in range(size)]}
+
+    def churn(self, listings, rate):
+        """Return a copy of `listings` where a `rate` fraction was repriced or sold and relisted"""
+        churned = []
+        for listing in listings:
+            if self.rng.random() >= rate:
+                churned.append(listing)
+            elif self.rng.random() < 0.5:
+                repriced = dict(listing)
+                repriced['price'] = max(20, round(listing['price'] * self.rng.uniform(0.8, 1.1)))
+                churned.append(repriced)
+            else:
+                churned.append(self.new_listing())
+        return churned
+
+
+def generate_payload(size, seed=None, event_id=366607):
+    """Convenience wrapper returning a payload of `size` listings"""
+    return ListingGenerator(seed=seed).payload(size, event_id)
+
+
+def describe(listings, top=8):
+    """Print the distributions of a generated payload"""
+    print(f"📊 {len(listings):,} listings")
+    for field in ['section', 'row', 'seller', 'quantity']:
+        counts = Counter(str(l[field]) for l in listings).most_common(top)
+        shares = ", ".join(f"{k or '(blank)'} {v / len(listings):.0%}" for k, v in counts)
+        print(f"   {field:9} {shares}")
+    can_buy_two = sum(1 for l in listings if l['quantity'] >= 2 and (not l['splits'] or 2 in l['splits']))
+    print(f"   2 together {can_buy_two / len(listings):.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic SeatPick listings payloads")
+    parser.add_argument('--size', default='1k', help="number of listings (e.g. 1k, 10k, 100k)")
+    parser.add_argument('--seed', type=int, help="random seed for reproducible payloads")
+    parser.add_argument('--event-id', type=int, default=366607)
+    parser.add_argument('--output', help="output path (default: listings_<size>.json)")
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    payload = generate_payload(size, args.seed, args.event_id)
+    describe(payload['listings'])
+
+    output = args.output or f"listings_{args.size}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    print(f"📁 Payload written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Checkout verification over plain HTTP for server-rendered vendor pages.
+
+A Chromium render costs seconds per listing, but some vendors put the
+all-in price in the initial HTML or in an embedded JSON blob. For hosts
+flagged 'http' (VENDOR_CAPABILITIES, or HTTP_VENDORS in the environment),
+HttpVerifier fetches the page with one pooled aiohttp session and
+extracts the price from embedded JSON, or else with the monitor's content
+extractor. Every other host uses the browser, which is the default:
+vendors behind bot protection let the rebrowser browser through but not
+a plain HTTP client, so a host only goes on the HTTP path once its live
+checkout page has been checked.
+
+Pages that come back without any price text (a JavaScript shell) go to
+the browser, and a host that returns shells HTTP_MISS_LIMIT times in a
+row is treated as browser-only for the rest of the run. So is a host
+that answers the HTTP client with 403/429: that listing is retried in
+the browser instead of being left unverified. A page that shows prices
+but none the extractor trusts is left unverified, since rendering it
+would change nothing.
+
+VerificationSession is what verify_listing receives as its context: it
+carries the HTTP verifier and launches the browser on the first
+new_page(), so a cycle that needs no JavaScript never starts Chromium.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import re
+
+from monitor_log import get_logger
+from traffic_control import BLOCKING_STATUSES
+
+log = get_logger('http_verifier')
+
+# 'http': all-in price is server-rendered and the page is served to plain clients;
+# anything not listed needs the browser. Only add a host after checking its live checkout page.
+VENDOR_CAPABILITIES = {}
+
+# Consecutive HTTP fetches without a price before a host goes to the browser for the run
+HTTP_MISS_LIMIT = 3
+
+# Per-ticket all-in price keys seen in vendor page state blobs
+FINAL_PRICE_KEYS = ('allInPrice', 'allInPricePerTicket', 'priceWithFees', 'finalPrice')
+
+JSON_SCRIPT = re.compile(
+    r'<script[^>]*type=["\']application/(?:ld\+)?json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL
+)
+
+# Any dollar amount; a page without one is a JavaScript shell the browser has to fill in
+PRICE_TEXT = re.compile(r'(?:US)?\$\s*\d')
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+def host_list(name):
+    return {h.strip().lower() for h in os.environ.get(name, '').split(',') if h.strip()}
+
+
+def capability(host):
+    """'http' or 'browser' for a vendor host; HTTP_VENDORS and BROWSER_ONLY_VENDORS
+    (comma-separated hosts) add to and override VENDOR_CAPABILITIES"""
+    if host in host_list('BROWSER_ONLY_VENDORS'):
+        return 'browser'
+    if host in host_list('HTTP_VENDORS'):
+        return 'http'
+    return VENDOR_CAPABILITIES.get(host, 'browser')
+
+
+def find_price_key(value):
+    """First FINAL_PRICE_KEYS value anywhere in a decoded JSON document"""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key in FINAL_PRICE_KEYS:
+                if key in node:
+                    try:
+                        return float(node[key])
+                    except (TypeError, ValueError):
+                        pass
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def embedded_json_price(content):
+    """All-in per-ticket price from an embedded JSON script, or None"""
+    for blob in JSON_SCRIPT.findall(content):
+        try:
+            price = find_price_key(json.loads(blob))
+        except ValueError:
+            continue
+        if price:
+            return price
+    return None
+
+
+class HttpVerifier:
+    """Pooled aiohttp fetches of checkout pages, parsed without a browser"""
+
+    def __init__(self, extract, timeout=15, limit_per_host=4):
+        self.extract = extract
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.session = None
+        self.misses = {}
+
+    async def __aenter__(self):
+        import aiohttp
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=self.limit_per_host),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def supports(self, host):
+        return capability(host) == 'http' and self.misses.get(host, 0) < HTTP_MISS_LIMIT
+
+    async def final_price(self, url, seller, host):
+        """(HTTP status, all-in price or None, True if the page needs the browser)"""
+        async with self.session.get(url) as response:
+            status = response.status
+            if status in BLOCKING_STATUSES:
+                # Bot protection turning away a plain client; the browser may still get through
+                if self.misses.get(host, 0) < HTTP_MISS_LIMIT:
+                    self.misses[host] = HTTP_MISS_LIMIT
+                    log.warning('http.blocked', "   🌐 {host} blocked the HTTP client ({status}) - using the browser for it from now on",
+                                host=host, status=status)
+                return status, None, True
+            if status != 200:
+                return status, None, False
+            content = await response.text()
+
+        price = embedded_json_price(content)
+        if price is None and not PRICE_TEXT.search(content):
+            self.misses[host] = self.misses.get(host, 0) + 1
+            if self.misses[host] == HTTP_MISS_LIMIT:
+                log.warning('http.demoted', "   🌐 {host} pages need JavaScript - using the browser for it from now on", host=host)
+            return status, None, True
+
+        self.misses[host] = 0
+        return status, price or self.extract(content, seller), False
+
+
+class VerificationSession:
+    """HTTP verifier plus a browser context that is only launched when a page needs it"""
+
+    def __init__(self, browser_factory, http):
+        self.browser_factory = browser_factory
+        self.http = http
+        self.browser = None
+        # Why the browser couldn't start; later pages fail fast instead of relaunching it
+        self.launch_error = None
+        self.stack = contextlib.AsyncExitStack()
+        self.lock = asyncio.Lock()
+
+    async def new_page(self):
+        async with self.lock:
+            if self.launch_error is not None:
+                raise self.launch_error
+            if self.browser is None:
+                log.info('browser.launch', "   🌐 Launching browser for pages that need JavaScript")
+                try:
+                    self.browser = await self.stack.enter_async_context(self.browser_factory())
+                except Exception as e:
+                    self.launch_error = e
+                    log.warning('browser.launch_failed', "   ❌ Browser failed to launch: {error} - skipping browser checks this session",
+                                error=str(e)[:100])
+                    raise
+        return await self.browser.new_page()
+
+    async def aclose(self):
+        await self.stack.aclose()
+
+
+@contextlib.asynccontextmanager
+async def verification_session(browser_factory, extract):
+    async with HttpVerifier(extract) as http:
+        session = VerificationSession(browser_factory, http)
+        try:
+            yield session
+        finally:
+            await session.aclose()
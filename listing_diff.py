@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Diff two SeatPick listing snapshots: what was added, sold, or repriced.
+"""
+from url_canonical import canonical_key
+
+
+def listing_key(listing):
+    """Stable identity for a listing across polls"""
+    seller = listing.get('seller', '')
+    key = canonical_key(seller, listing.get('deepLink') or listing.get('checkout_link'))
+    if key:
+        return key
+    return f"{seller}:{listing.get('section', '')}:{listing.get('row', '')}:{listing.get('price', '')}"
+
+
+def diff_listings(previous, current):
+    """Compare two snapshots and return added, removed and repriced listings"""
+    previous_by_key = {listing_key(l): l for l in previous}
+    current_by_key = {listing_key(l): l for l in current}
+
+    added = [l for k, l in current_by_key.items() if k not in previous_by_key]
+    removed = [l for k, l in previous_by_key.items() if k not in current_by_key]
+    price_changes = []
+    for key, listing in current_by_key.items():
+        old = previous_by_key.get(key)
+        if old is not None and old.get('price') != listing.get('price'):
+            price_changes.append({
+                'key': key,
+                'listing': listing,
+                'old_price': old.get('price'),
+                'new_price': listing.get('price'),
+            })
+
+    return {
+        'added': added,
+        'removed': removed,
+        'price_changes': price_changes,
+        'price_drops': [c for c in price_changes if c['new_price'] < c['old_price']],
+        'unchanged': len(current_by_key) - len(added) - len(price_changes),
+        'total': len(current_by_key),
+    }
+
+
+def churn_ratio(diff):
+    """Fraction of the inventory that changed between the two snapshots"""
+    changed = len(diff['added']) + len(diff['removed']) + len(diff['price_changes'])
+    baseline = max(diff['total'] + len(diff['removed']), 1)
+    return changed / baseline
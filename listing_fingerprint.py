@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Cross-source listing fingerprints, so the same seats are verified and alerted once.
+
+Brokers list the same seats on several marketplaces: one pair shows up
+on SeatPick through VividSeats and again through Viagogo, or directly on
+SeatGeek. Each copy used to cost a checkout verification and an alert
+line. ListingIndex groups them as sources report, one record at a time:
+
+- A record's fingerprint is (event, section, row, quantity, price band,
+  vendor). Sections and rows are normalized ('Reserved Left' ~ 'Left',
+  'Row 07' ~ '7'). The price is the all-in price per ticket: verified if
+  known, else the fee model's estimate, else the listed price.
+- Bands are FINGERPRINT_TOLERANCE wide on a log scale. A record matches an
+  entry in its own or a neighbouring band whose price is within the
+  tolerance and that has no listing from the same vendor yet: one vendor's
+  two similar listings in a row are different seats. The same listing
+  reported twice (same canonical deep link) always matches.
+- Records without a row aren't fingerprinted, since nothing tells their
+  seats apart.
+
+The first record of an entry is its canonical listing until `elect`
+picks the cheapest copy whose vendor can be checked. The pipeline
+verifies only that one, and if it comes back unverified it moves on to
+the next copy from `fallback`. The aggregator lets at most one verified
+ticket per entry through to alerts. Every record's
+source, seller, price and link are kept in the entry's provenance, which
+the alerted ticket carries.
+"""
+import math
+import os
+import re
+from typing import NamedTuple
+
+from listing_diff import listing_key
+
+# Cross-listed copies' all-in prices differ by marketplace fees and rounding
+FINGERPRINT_TOLERANCE = float(os.environ.get('FINGERPRINT_TOLERANCE', 0.03))
+
+# Words marketplaces put around the same section name
+SECTION_NOISE = re.compile(r'\b(?:reserved|seating|section|sec)\b')
+ROW_PREFIX = re.compile(r'^(?:row|rw)\s*')
+
+
+def normalize_section(section):
+    name = ' '.join(str(section or '').lower().split())
+    stripped = ' '.join(SECTION_NOISE.sub(' ', name).split())
+    return stripped or name
+
+
+def normalize_row(row):
+    """Comparable row label, or None for unknown and general admission rows"""
+    label = ROW_PREFIX.sub('', str(row or '').strip().lower())
+    if label in ('', 'ga', 'general', 'general admission', 'n/a', 'tbd'):
+        return None
+    if label.isdigit():
+        return label.lstrip('0') or '0'
+    return label
+
+
+def all_in_price(record, fee_model=None):
+    """Per-ticket price to compare records across vendors by"""
+    if record.get('verified') and record.get('final_price'):
+        return float(record['final_price'])
+    if fee_model is not None:
+        prediction = fee_model.predict(record)
+        if prediction:
+            return prediction[1]
+    return float(record.get('price') or 0)
+
+
+def price_band(price, tolerance=FINGERPRINT_TOLERANCE):
+    return math.floor(math.log(price) / math.log1p(tolerance))
+
+
+class Fingerprint(NamedTuple):
+    event: str
+    section: str
+    row: str
+    quantity: int
+    band: int
+    vendor: str
+
+    @property
+    def bucket(self):
+        return (self.event, self.section, self.row, self.quantity)
+
+
+def fingerprint(record, event_id, price, tolerance=FINGERPRINT_TOLERANCE):
+    """Fingerprint of a listing or ticket, or None if it can't be matched safely"""
+    row = normalize_row(record.get('row'))
+    if row is None or not price or price <= 0:
+        return None
+    try:
+        quantity = int(record.get('quantity') or 0)
+    except (TypeError, ValueError):
+        quantity = 0
+    return Fingerprint(
+        str(record.get('event_id') or event_id),
+        normalize_section(record.get('section')),
+        row,
+        quantity,
+        price_band(price, tolerance),
+        str(record.get('seller') or '').lower(),
+    )
+
+
+class ListingGroup:
+    """One set of seats: the canonical record, and where each copy of it came from"""
+
+    def __init__(self, group_id, record, fp, price):
+        self.id = group_id
+        self.canonical = record
+        self.fingerprint = fp
+        self.price = price
+        self.vendors = set()
+        self.identities = set()
+        self.provenance = []
+        self.copies = []
+        self.tried = set()
+        self.alerted = None
+
+    def add(self, record, source, fp, price):
+        self.vendors.add(fp.vendor)
+        self.copies.append((price, record))
+        self.identities.add(listing_key(record))
+        self.provenance.append({
+            'source': source,
+            'seller': record.get('seller', ''),
+            'price': record.get('price'),
+            'all_in': round(price, 2),
+            'link': record.get('deepLink') or record.get('checkout_link') or '',
+        })
+
+    def best(self, usable):
+        """Cheapest copy not tried yet that `usable(record)` accepts, or None"""
+        for _, record in sorted(self.copies, key=lambda copy: copy[0]):
+            if id(record) not in self.tried and usable(record):
+                return record
+        return None
+
+
+class ListingIndex:
+    """Fingerprint index of one cycle's listings, built incrementally across sources"""
+
+    def __init__(self, event_id, tolerance=FINGERPRINT_TOLERANCE):
+        self.event_id = event_id
+        self.tolerance = tolerance
+        self.buckets = {}
+        self.groups = {}
+        self.by_record = {}
+        self.collapsed = 0
+        self.suppressed = 0
+
+    def match(self, fp, price, identity):
+        """Closest group the record belongs to, or None"""
+        best = None
+        for band in (fp.band - 1, fp.band, fp.band + 1):
+            for group in self.buckets.get(fp.bucket + (band,), ()):
+                if identity in group.identities:
+                    return group
+                if fp.vendor in group.vendors:
+                    continue
+                distance = abs(math.log(price / group.price))
+                if distance <= math.log1p(self.tolerance) and (best is None or distance < best[0]):
+                    best = (distance, group)
+        return best[1] if best else None
+
+    def add(self, record, source, price=None):
+        """(group, True if the record started it); unfingerprintable records get a group of their own"""
+        known = self.by_record.get(id(record))
+        if known and known[0] is record:
+            return known[1], False
+        price = price or all_in_price(record)
+        fp = fingerprint(record, self.event_id, price, self.tolerance)
+        group = self.match(fp, price, listing_key(record)) if fp else None
+        new = group is None
+        if new:
+            group = ListingGroup(len(self.groups) + 1, record, fp, price)
+            self.groups[group.id] = group
+            if fp:
+                self.buckets.setdefault(fp.bucket + (fp.band,), []).append(group)
+        else:
+            self.collapsed += 1
+        if fp:
+            group.add(record, source, fp, price)
+        self.by_record[id(record)] = (record, group)
+        return group, new
+
+    def group_of(self, record):
+        known = self.by_record.get(id(record))
+        return known[1] if known and known[0] is record else None
+
+    def elect(self, record, usable):
+        """The copy of the record's seats to verify: the cheapest usable one, else the record"""
+        group = self.group_of(record)
+        best = group.best(usable) if group else None
+        if best is None:
+            return record
+        group.canonical = best
+        return best
+
+    def fallback(self, record, usable):
+        """Next copy to verify once `record` came back unverified, or None"""
+        group = self.group_of(record)
+        if group is None:
+            return None
+        group.tried.add(id(record))
+        best = group.best(usable)
+        if best is not None:
+            group.tried.add(id(best))
+            group.canonical = best
+        return best
+
+    def tag(self, record, ticket):
+        """Mark the ticket verified for a record already in the index with that record's group"""
+        group = self.group_of(record)
+        if group is not None:
+            ticket['listing_group'] = group.id
+
+    def admit(self, ticket, source):
+        """False if the ticket duplicates seats already alerted on this cycle"""
+        group = self.groups.get(ticket.get('listing_group'))
+        if group is None:
+            group, _ = self.add(ticket, source)
+            ticket['listing_group'] = group.id
+        if ticket.get('verified'):
+            if group.alerted is not None and group.alerted is not ticket:
+                self.suppressed += 1
+                return False
+            group.alerted = ticket
+        if group.provenance:
+            # Shared with the group, so copies reported later show up too
+            ticket['provenance'] = group.provenance
+        return True
+
+
+def also_listed_by(ticket):
+    """Other sellers the same seats were found through"""
+    sellers = []
+    for origin in ticket.get('provenance', ()):
+        seller = origin['seller']
+        if seller and seller != ticket.get('seller') and seller not in sellers:
+            sellers.append(seller)
+    return sellers
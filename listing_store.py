@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed store of the latest listings per event, their price history
+and the checkout prices verification found for them. Active listings are
+indexed by the party sizes they can sell (see quantity_index).
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from listing_diff import listing_key
+from quantity_index import SCHEMA as SIZES_SCHEMA, purchasable_sizes
+
+DEFAULT_DB_PATH = os.environ.get(
+    'MONITOR_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monitor_state.db')
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    event_id TEXT NOT NULL,
+    listing_key TEXT NOT NULL,
+    section TEXT,
+    row TEXT,
+    seller TEXT,
+    price REAL,
+    quantity INTEGER,
+    splits TEXT,
+    deeplink TEXT,
+    first_seen TEXT,
+    last_seen TEXT,
+    active INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (event_id, listing_key)
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    event_id TEXT NOT NULL,
+    listing_key TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    price REAL
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_listing ON price_history (event_id, listing_key);
+CREATE TABLE IF NOT EXISTS verifications (
+    event_id TEXT NOT NULL,
+    listing_key TEXT NOT NULL,
+    seller TEXT,
+    section TEXT,
+    listed_price REAL,
+    final_price REAL,
+    verified_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_verifications_seller ON verifications (seller);
+"""
+
+
+class ListingStore:
+    """Latest snapshot per event, append-only price history and verified checkout prices"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_DB_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self.conn.executescript(SIZES_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save_snapshot(self, event_id, listings, observed_at=None):
+        """Replace the active snapshot for an event, recording new and changed prices"""
+        observed_at = observed_at or datetime.now().isoformat(timespec='seconds')
+        event_id = str(event_id)
+
+        known_prices = dict(self.conn.execute(
+            "SELECT listing_key, price FROM listings WHERE event_id = ? AND active = 1", (event_id,)
+        ))
+
+        rows = []
+        history = []
+        sizes = []
+        for listing in listings:
+            key = listing_key(listing)
+            sizes.extend((event_id, key, size) for size in purchasable_sizes(listing.get('quantity'), listing.get('splits')))
+            price = listing.get('price')
+            rows.append((
+                event_id, key, listing.get('section', ''), listing.get('row', ''),
+                listing.get('seller', ''), price, listing.get('quantity'),
+                json.dumps(listing.get('splits', [])), listing.get('deepLink', ''),
+                observed_at, observed_at
+            ))
+            if known_prices.get(key) != price:
+                history.append((event_id, key, observed_at, price))
+
+        with self.conn:
+            self.conn.execute("UPDATE listings SET active = 0 WHERE event_id = ?", (event_id,))
+            self.conn.executemany("""
+                INSERT INTO listings (event_id, listing_key, section, row, seller, price, quantity,
+                                      splits, deeplink, first_seen, last_seen, active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT (event_id, listing_key) DO UPDATE SET
+                    price = excluded.price,
+                    quantity = excluded.quantity,
+                    splits = excluded.splits,
+                    deeplink = excluded.deeplink,
+                    last_seen = excluded.last_seen,
+                    active = 1
+            """, rows)
+            self.conn.executemany(
+                "INSERT INTO price_history (event_id, listing_key, observed_at, price) VALUES (?, ?, ?, ?)",
+                history
+            )
+            self.conn.execute("DELETE FROM listing_sizes WHERE event_id = ?", (event_id,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO listing_sizes (event_id, listing_key, size) VALUES (?, ?, ?)", sizes
+            )
+
+    def load_snapshot(self, event_id):
+        """Active listings for an event in SeatPick API shape"""
+        cursor = self.conn.execute("""
+            SELECT section, row, seller, price, quantity, splits, deeplink
+            FROM listings WHERE event_id = ? AND active = 1
+        """, (str(event_id),))
+        return [{
+            'section': section,
+            'row': row,
+            'seller': seller,
+            'price': price,
+            'quantity': quantity,
+            'splits': json.loads(splits) if splits else [],
+            'deepLink': deeplink,
+        } for section, row, seller, price, quantity, splits, deeplink in cursor]
+
+    def listings_for_size(self, size, event_ids=None):
+        """Active listings, across events unless `event_ids` is given, that can sell exactly `size` together"""
+        query = """
+            SELECT l.event_id, l.section, l.row, l.seller, l.price, l.quantity, l.splits, l.deeplink
+            FROM listing_sizes s
+            JOIN listings l ON l.event_id = s.event_id AND l.listing_key = s.listing_key
+            WHERE s.size = ? AND l.active = 1
+        """
+        params = [size]
+        if event_ids:
+            query += f" AND s.event_id IN ({','.join('?' * len(event_ids))})"
+            params.extend(str(e) for e in event_ids)
+        return [{
+            'event_id': event_id,
+            'section': section,
+            'row': row,
+            'seller': seller,
+            'price': price,
+            'quantity': quantity,
+            'splits': json.loads(splits) if splits else [],
+            'deepLink': deeplink,
+        } for event_id, section, row, seller, price, quantity, splits, deeplink in self.conn.execute(query, params)]
+
+    def record_verification(self, event_id, listing, result, verified_at=None):
+        """Store a checkout-verified (listed price, final price) pair"""
+        if not result.get('verified') or not result.get('final_price'):
+            return
+        verified_at = verified_at or datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO verifications (event_id, listing_key, seller, section, listed_price, final_price, verified_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (str(event_id), listing_key(listing), listing.get('seller', ''), listing.get('section', ''),
+                  listing.get('price'), result['final_price'], verified_at))
+
+    def verification_history(self, seller=None):
+        """(seller, section, listed_price, final_price) for every stored verification"""
+        query = "SELECT seller, section, listed_price, final_price FROM verifications WHERE listed_price > 0"
+        params = ()
+        if seller:
+            query += " AND seller = ?"
+            params = (seller,)
+        return list(self.conn.execute(query, params))
+
+    def price_history(self, event_id, key):
+        """(observed_at, price) pairs for one listing, oldest first"""
+        return list(self.conn.execute("""
+            SELECT observed_at, price FROM price_history
+            WHERE event_id = ? AND listing_key = ? ORDER BY observed_at
+        """, (str(event_id), key)))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Incremental parsing of SeatPick listings payloads.
+
+`await response.json()` holds the raw body and the full decoded document
+at once. ListingStreamParser instead takes the body chunk by chunk and
+hands back each element of the top-level "listings" array as soon as it
+is complete, so callers can filter as bytes arrive and keep only what they
+accept. Memory is bounded by the chunk size plus one listing, whatever
+the payload size.
+"""
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+
+
+class ListingStreamParser:
+    """Push parser for {"listings": [...], ...} that yields listings one at a time"""
+
+    def __init__(self, array_key='listings'):
+        self.array_key = array_key
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.state = 'start'
+        self.key = None
+        self.count = 0
+
+    def feed(self, data):
+        """Add a chunk of the body; returns the listings completed by it"""
+        self.buffer += self.text_decoder.decode(data)
+        listings = list(self._parse())
+        # Drop consumed text so the buffer never holds more than the unparsed tail
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        return listings
+
+    def close(self):
+        """Finish the stream; raises ValueError if the document was cut short"""
+        self.buffer += self.text_decoder.decode(b'', final=True)
+        list(self._parse())
+        self._skip_whitespace()
+        if self.state != 'done' or self.pos < len(self.buffer):
+            raise ValueError(f"Truncated or malformed listings payload (state {self.state})")
+
+    def _skip_whitespace(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+            self.pos += 1
+
+    def _peek(self):
+        self._skip_whitespace()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def _decode_value(self):
+        """Decode one complete JSON value at pos, or None if more data is needed"""
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            return None
+        # A bare number at the end of the buffer may still be growing
+        if end >= len(self.buffer):
+            return None
+        self.pos = end
+        return (value,)
+
+    def _parse(self):
+        while True:
+            char = self._peek()
+            if char is None:
+                return
+
+            if self.state == 'start':
+                if char != '{':
+                    raise ValueError("Listings payload is not a JSON object")
+                self.pos += 1
+                self.state = 'key'
+
+            elif self.state == 'key':
+                if char == '}':
+                    self.pos += 1
+                    self.state = 'done'
+                    continue
+                decoded = self._decode_value()
+                if decoded is None:
+                    return
+                self.key = decoded[0]
+                self.state = 'colon'
+
+            elif self.state == 'colon':
+                if char != ':':
+                    raise ValueError(f"Expected ':' after key {self.key!r}")
+                self.pos += 1
+                self.state = 'value'
+
+            elif self.state == 'value':
+                if self.key == self.array_key and char == '[':
+                    self.pos += 1
+                    self.state = 'array_first'
+                    continue
+                # Other top-level values are small metadata; decode and discard
+                if self._decode_value() is None:
+                    return
+                self.state = 'after_value'
+
+            elif self.state in ('array_first', 'array_item'):
+                if char == ']':
+                    self.pos += 1
+                    self.state = 'after_value'
+                    continue
+                if self.state == 'array_item':
+                    if char != ',':
+                        raise ValueError("Expected ',' between listings")
+                    self.pos += 1
+                    self.state = 'array_element'
+                    continue
+                self.state = 'array_element'
+
+            elif self.state == 'array_element':
+                decoded = self._decode_value()
+                if decoded is None:
+                    return
+                self.state = 'array_item'
+                self.count += 1
+                yield decoded[0]
+
+            elif self.state == 'after_value':
+                if char == ',':
+                    self.pos += 1
+                    self.state = 'key'
+                elif char == '}':
+                    self.pos += 1
+                    self.state = 'done'
+                else:
+                    raise ValueError("Expected ',' or '}' in listings payload")
+
+            elif self.state == 'done':
+                return
+
+
+async def iter_listing_stream(response, parser=None, chunk_size=64 * 1024):
+    """Yield each listing of an aiohttp response as soon as its bytes are in;
+    `parser.count` holds the total once the stream is exhausted"""
+    parser = parser or ListingStreamParser()
+    async for chunk in response.content.iter_chunked(chunk_size):
+        for listing in parser.feed(chunk):
+            yield listing
+    parser.close()
+
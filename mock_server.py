@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the SeatPick listings API and vendor checkout pages.
+
+Replays the recorded payload in fixtures/, or a synthetic one of any size,
+so the monitor can be load tested and benchmarked without touching live
+sites. Listings churn, response latency, slow vendor pages and 403 blocks
+can all be injected, --short-links swaps deep links for opaque tracker
+short links that only resolve by following redirects, and --cross-listed
+lists some seats again through a second seller at about the same all-in
+price.
+
+Point the monitor at it with:
+    SEATPICK_BASE_URL=http://127.0.0.1:8765 VENDOR_BASE_URL=http://127.0.0.1:8765 python3 premium_monitor.py
+
+Usage:
+    python3 mock_server.py                                    # Replay recorded fixtures on :8765
+    python3 mock_server.py --size 5000 --churn 0.05           # 5k synthetic listings, 5% churn per poll
+    python3 mock_server.py --latency-ms 300 --slow-rate 0.1 --error-rate 0.05
+    python3 mock_server.py --short-links 0.5                  # half the deep links need redirect resolution
+    python3 mock_server.py --cross-listed 0.2                 # a fifth of the seats also listed by another seller
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote, urlparse
+
+from generate_listings import ListingGenerator, deeplink_for
+from url_canonical import RULES_BY_HOST, canonicalize_url, listing_id_from_url
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_LISTINGS_FILE = os.path.join(FIXTURES_DIR, 'seatpick_listings_366607.json')
+CHECKOUT_DIR = os.path.join(FIXTURES_DIR, 'checkout')
+
+# Which saved checkout page each vendor host serves
+VENDOR_TEMPLATES = {
+    'www.vividseats.com': 'vividseats.html',
+    'checkout.viagogo.com': 'viagogo.html',
+    'www.ticketnetwork.com': 'ticketnetwork.html',
+    'buy.events365.com': 'events365.html',
+}
+
+# Observed all-in markups over the SeatPick listed price (see README / github_issue.md)
+VENDOR_MARKUPS = {
+    'vividseats': 1.358,
+    'vgg': 1.35,
+    'te': 1.32,
+    'tn': 1.28,
+}
+
+# Tracker host that short links for each seller go through
+SHORT_LINK_HOSTS = {
+    'vividseats': 'vivid-seats.pxf.io',
+    'vgg': 'viagogo.prf.hn',
+    'tn': 'ticketnetwork.lusg.net',
+}
+
+BLOCKED_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Access Denied</title></head>
+<body><h1>Access Denied</h1><p>You don't have permission to access this page.</p></body></html>
+"""
+
+
+def load_listings_payload(path=DEFAULT_LISTINGS_FILE):
+    """Load a recorded SeatPick listings payload"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_checkout_page(template, listing):
+    """Fill a saved checkout page with the all-in price for one listing"""
+    listed_price = listing.get('price', 0)
+    quantity = 2
+    markup = VENDOR_MARKUPS.get(listing.get('seller', ''), 1.3)
+    final_price = round(listed_price * markup, 2)
+    values = {
+        'section': listing.get('section', ''),
+        'row': listing.get('row', '') or 'GA',
+        'quantity': quantity,
+        'listed_price': listed_price,
+        'listed_total': listed_price * quantity,
+        'fees_total': f"{(final_price - listed_price) * quantity:.2f}",
+        'final_price': f"{final_price:.2f}",
+        'final_price_int': f"{final_price:.0f}",
+        'total_price': f"{final_price * quantity:.2f}",
+        'total_price_int': f"{final_price * quantity:.0f}",
+    }
+    html = template
+    for key, value in values.items():
+        html = html.replace('{{' + key + '}}', str(value))
+    return html
+
+
+class MockSeatPickServer:
+    """Threaded HTTP server serving SeatPick listings and vendor checkout pages"""
+
+    def __init__(self, payload=None, host='127.0.0.1', port=0, size=None, churn=0.0,
+                 latency_ms=0, vendor_latency_ms=0, slow_rate=0.0, slow_ms=5000,
+                 error_rate=0.0, blocked_hosts=(), short_links=0.0, cross_listed=0.0, seed=None):
+        self.rng = random.Random(seed)
+        self.generator = ListingGenerator(seed=seed)
+        if payload is None:
+            payload = self.generator.payload(size) if size else load_listings_payload()
+        self.payload = payload
+        self.host = host
+        self.port = port
+        self.churn = churn
+        self.latency_ms = latency_ms
+        self.vendor_latency_ms = vendor_latency_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.blocked_hosts = set(blocked_hosts)
+        self.stats = {'listings': 0, 'checkout': 0, 'redirects': 0, 'slow': 0, 'blocked': 0, 'not_found': 0}
+        self.lock = threading.Lock()
+        self.templates = {}
+        for vendor_host, filename in VENDOR_TEMPLATES.items():
+            with open(os.path.join(CHECKOUT_DIR, filename), encoding='utf-8') as f:
+                self.templates[vendor_host] = f.read()
+        if cross_listed:
+            self.cross_list(cross_listed)
+        self.short_links = {}
+        if short_links:
+            self.shorten_links(short_links)
+        self._index_listings()
+        self._httpd = None
+        self._thread = None
+
+    def cross_list(self, rate):
+        """List a `rate` fraction of listings again through another seller, priced for the same all-in"""
+        listings = self.payload.get('listings', [])
+        copies = []
+        for listing in listings:
+            seller = listing.get('seller')
+            if seller not in VENDOR_MARKUPS or self.rng.random() >= rate:
+                continue
+            other = self.rng.choice([s for s in VENDOR_MARKUPS if s != seller])
+            self.generator.next_id += 1
+            copy = dict(listing)
+            copy['seller'] = other
+            copy['price'] = round(listing['price'] * VENDOR_MARKUPS[seller] / VENDOR_MARKUPS[other] * self.rng.uniform(0.99, 1.01))
+            copy['deepLink'] = deeplink_for(other, self.generator.next_id)
+            copies.append(copy)
+        listings.extend(copies)
+        self.rng.shuffle(listings)
+        self.stats['cross_listed'] = len(copies)
+
+    def shorten_links(self, rate):
+        """Replace a `rate` fraction of tracked deep links with short links (two redirects deep)"""
+        for listing in self.payload.get('listings', []):
+            host = SHORT_LINK_HOSTS.get(listing.get('seller'))
+            if host and self.rng.random() < rate:
+                short_url = f"https://{host}/s/{len(self.short_links):x}"
+                self.short_links[short_url] = listing['deepLink']
+                listing['deepLink'] = short_url
+
+    def _index_listings(self):
+        self.listings_by_id = {}
+        for listing in self.payload.get('listings', []):
+            deeplink = listing.get('deepLink', '')
+            listing_id = listing_id_from_url(unquote(self.short_links.get(deeplink, deeplink)))
+            if listing_id:
+                self.listings_by_id[listing_id] = listing
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def request_count(self):
+        return self.stats['listings'] + self.stats['checkout'] + self.stats['redirects'] + self.stats['not_found']
+
+    def apply_churn(self):
+        """Reprice, sell out or relist a `churn` fraction of listings"""
+        self.payload['listings'] = self.generator.churn(self.payload.get('listings', []), self.churn)
+        self._index_listings()
+
+    def listings_body(self, event_id):
+        """Serialized listings payload for an event, churned since the previous poll"""
+        with self.lock:
+            self.stats['listings'] += 1
+            if self.churn and self.stats['listings'] > 1:
+                self.apply_churn()
+            return json.dumps(self.payload).encode('utf-8')
+
+    def checkout_body(self, vendor_host, path_and_query):
+        """Rendered checkout HTML for a vendor URL, or None if unknown"""
+        template = self.templates.get(vendor_host)
+        with self.lock:
+            listing = self.listings_by_id.get(listing_id_from_url(unquote(path_and_query)))
+        if template is None or listing is None:
+            return None
+        return render_checkout_page(template, listing).encode('utf-8')
+
+    def redirect_target(self, tracker_host, path_and_query):
+        """Next hop for a tracker URL: short link -> full affiliate link -> vendor page"""
+        tracker_url = f"https://{tracker_host}{path_and_query}"
+        target = self.short_links.get(tracker_url) or canonicalize_url(tracker_url)
+        if target == tracker_url:
+            return None
+        parsed = urlparse(target)
+        local = f"/vendor/{parsed.netloc}{parsed.path}"
+        return local + (f"?{parsed.query}" if parsed.query else '')
+
+    def start(self):
+        """Start serving in a background thread and return the base URL"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.handle_request(self)
+
+            do_HEAD = do_GET
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def handle_request(self, handler):
+        path = handler.path
+
+        if path == '/__stats':
+            self.send(handler, 200, json.dumps(self.stats).encode('utf-8'), 'application/json')
+            return
+
+        match = re.match(r'^/api/proxy/4/events/(\w+)/listings', path)
+        if match:
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            self.send(handler, 200, self.listings_body(match.group(1)), 'application/json')
+            return
+
+        if path.startswith('/vendor/'):
+            vendor_host, _, rest = path[len('/vendor/'):].partition('/')
+            if vendor_host in RULES_BY_HOST:
+                location = self.redirect_target(vendor_host, '/' + rest)
+                if location:
+                    with self.lock:
+                        self.stats['redirects'] += 1
+                    if self.vendor_latency_ms:
+                        time.sleep(self.vendor_latency_ms / 1000)
+                    self.redirect(handler, location)
+                    return
+
+            with self.lock:
+                self.stats['checkout'] += 1
+                blocked = vendor_host in self.blocked_hosts or self.rng.random() < self.error_rate
+                slow = not blocked and self.rng.random() < self.slow_rate
+
+            if blocked:
+                with self.lock:
+                    self.stats['blocked'] += 1
+                self.send(handler, 403, BLOCKED_PAGE, 'text/html; charset=utf-8')
+                return
+
+            delay_ms = self.vendor_latency_ms
+            if slow:
+                with self.lock:
+                    self.stats['slow'] += 1
+                delay_ms += self.slow_ms
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+
+            body = self.checkout_body(vendor_host, '/' + rest)
+            if body is not None:
+                self.send(handler, 200, body, 'text/html; charset=utf-8')
+                return
+
+        with self.lock:
+            self.stats['not_found'] += 1
+        self.send(handler, 404, b'Not Found', 'text/plain')
+
+    def redirect(self, handler, location):
+        try:
+            handler.send_response(302)
+            handler.send_header('Location', location)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send(self, handler, status, body, content_type):
+        try:
+            handler.send_response(status)
+            handler.send_header('Content-Type', content_type)
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            if handler.command != 'HEAD':
+                handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (e.g. a navigation timeout on an injected slow page)
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SeatPick + vendor checkout stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--listings-file', help="recorded payload to replay (default: fixtures/)")
+    parser.add_argument('--size', type=int, help="serve N synthetic listings instead of the recording")
+    parser.add_argument('--churn', type=float, default=0.0, help="fraction of listings changed per poll")
+    parser.add_argument('--latency-ms', type=int, default=0, help="delay before each listings response")
+    parser.add_argument('--vendor-latency-ms', type=int, default=0, help="delay before each checkout page")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="fraction of checkout pages that respond slowly")
+    parser.add_argument('--slow-ms', type=int, default=5000, help="extra delay for slow checkout pages")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of checkout pages answered with 403")
+    parser.add_argument('--block-host', action='append', default=[], help="vendor host that always returns 403")
+    parser.add_argument('--short-links', type=float, default=0.0, help="fraction of deep links served as tracker short links")
+    parser.add_argument('--cross-listed', type=float, default=0.0, help="fraction of listings also listed through a second seller")
+    parser.add_argument('--seed', type=int, help="random seed for reproducible runs")
+    args = parser.parse_args()
+
+    payload = load_listings_payload(args.listings_file) if args.listings_file else None
+    server = MockSeatPickServer(
+        payload=payload, host=args.host, port=args.port, size=args.size, churn=args.churn,
+        latency_ms=args.latency_ms, vendor_latency_ms=args.vendor_latency_ms,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms, error_rate=args.error_rate,
+        blocked_hosts=args.block_host, short_links=args.short_links, cross_listed=args.cross_listed,
+        seed=args.seed
+    )
+    base_url = server.start()
+    print(f"🧪 Mock SeatPick server running at {base_url} ({len(server.payload.get('listings', []))} listings)")
+    print(f"   Listings: {base_url}/api/proxy/4/events/366607/listings")
+    print(f"   Vendor pages: {base_url}/vendor/<host>/<path>")
+    print(f"   Stats: {base_url}/__stats")
+    print(f"   Run the monitor with SEATPICK_BASE_URL={base_url} VENDOR_BASE_URL={base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Structured, levelled logging for the monitor's per-listing hot path.
+
+Verification used to print five to ten unbuffered lines per listing,
+including a dump of every Viagogo page. Per-listing events now go through
+EventLogger instead:
+
+- Each event has a level, a name ('verify.verified') and fields. The
+  message template is only formatted if the record is actually written.
+- Records below LOG_LEVEL (default info) aren't written; they go into a
+  ring buffer of the last LOG_BUFFER_SIZE records, kept unformatted.
+- `sampled=True` events (one line per listing) write the first and every
+  LOG_SAMPLE_EVERY-th occurrence; the rest go to the buffer too.
+- An error writes the buffered records first, so the failure arrives with
+  the context that led up to it, then clears the buffer.
+- LOG_FORMAT=json writes one JSON object per record (ts, level, logger,
+  event, msg, plus the fields) for log pipelines; text keeps the familiar
+  emoji lines.
+
+Cycle-level progress (fetch counts, alerts sent) still uses print.
+"""
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'error': ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'info').lower()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+LOG_SAMPLE_EVERY = int(os.environ.get('LOG_SAMPLE_EVERY', 10))
+LOG_BUFFER_SIZE = int(os.environ.get('LOG_BUFFER_SIZE', 500))
+
+
+class LogSink:
+    """Level threshold, sampling counters, ring buffer and output shared by all loggers"""
+
+    def __init__(self, level=LOG_LEVEL, fmt=LOG_FORMAT, sample_every=LOG_SAMPLE_EVERY,
+                 buffer_size=LOG_BUFFER_SIZE, stream=None):
+        self.configure(level, fmt, sample_every, buffer_size, stream)
+        self.counts = Counter()
+
+    def configure(self, level=None, fmt=None, sample_every=None, buffer_size=None, stream=None):
+        if level is not None:
+            self.threshold = LEVELS.get(level.lower(), INFO)
+        if fmt is not None:
+            self.json = fmt.lower() == 'json'
+        if sample_every is not None:
+            self.sample_every = max(1, sample_every)
+        if buffer_size is not None:
+            self.buffer = deque(getattr(self, 'buffer', ()), maxlen=max(1, buffer_size))
+        # None writes to whatever sys.stdout is at the time (redirect_stdout keeps working)
+        if stream is not None or not hasattr(self, 'stream'):
+            self.stream = stream
+
+    def record(self, level, logger, event, template, fields, sampled=False):
+        entry = (time.time(), level, logger, event, template, fields)
+        if level >= ERROR:
+            self.flush()
+            self.write(entry)
+            return
+
+        emit = level >= self.threshold
+        if emit and sampled:
+            key = (logger, event)
+            emit = self.counts[key] % self.sample_every == 0
+            self.counts[key] += 1
+        if emit:
+            self.write(entry)
+        else:
+            self.buffer.append(entry)
+
+    def flush(self):
+        """Write out and clear the buffered records"""
+        if not self.buffer:
+            return
+        if not self.json:
+            self.out().write(f"   ┄┄ {len(self.buffer)} earlier log records ┄┄\n")
+        while self.buffer:
+            self.write(self.buffer.popleft())
+
+    def out(self):
+        return self.stream or sys.stdout
+
+    def write(self, entry):
+        self.out().write(self.format(entry) + '\n')
+
+    def format(self, entry):
+        ts, level, logger, event, template, fields = entry
+        try:
+            message = template.format(**fields) if fields else template
+        except (KeyError, IndexError, ValueError):
+            message = f"{template} {fields}"
+        if not self.json:
+            return message
+        record = {
+            'ts': round(ts, 3),
+            'level': LEVEL_NAMES[level],
+            'logger': logger,
+            'event': event,
+            'msg': message.strip(),
+        }
+        record.update(fields)
+        return json.dumps(record, default=str, ensure_ascii=False)
+
+
+SINK = LogSink()
+
+
+class EventLogger:
+    """Named logger: `log.info('verify.verified', "✅ {section} ${price}", section=..., price=...)`"""
+
+    def __init__(self, name, sink=None):
+        self.name = name
+        self.sink = sink or SINK
+
+    def enabled(self, level):
+        """True if records at `level` are written rather than only buffered"""
+        return LEVELS[level] >= self.sink.threshold
+
+    def debug(self, event, template='', sampled=False, **fields):
+        self.sink.record(DEBUG, self.name, event, template, fields, sampled)
+
+    def info(self, event, template='', sampled=False, **fields):
+        self.sink.record(INFO, self.name, event, template, fields, sampled)
+
+    def warning(self, event, template='', sampled=False, **fields):
+        self.sink.record(WARNING, self.name, event, template, fields, sampled)
+
+    def error(self, event, template='', **fields):
+        self.sink.record(ERROR, self.name, event, template, fields)
+
+
+def get_logger(name):
+    return EventLogger(name)
+
+
+def configure(level=None, fmt=None, sample_every=None, buffer_size=None, stream=None):
+    """Change the shared sink's settings (tests, benchmarks, CLI flags)"""
+    SINK.configure(level, fmt, sample_every, buffer_size, stream)
+
+
+def flush():
+    SINK.flush()
@@ -1,20 +1,48 @@
 #!/usr/bin/env python3
-import requests
-from bs4 import BeautifulSoup
+import importlib.util
 import json
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
 import sys
+import threading
+import time
 from datetime import datetime, timedelta
 import re
-try:
-    from simplepush import send as simplepush_send
-except ImportError:
-    simplepush_send = None
+
+# requests, bs4, smtplib and simplepush are imported on first use; most runs send nothing
+SIMPLEPUSH_AVAILABLE = importlib.util.find_spec('simplepush') is not None
+if not SIMPLEPUSH_AVAILABLE:
     print("Warning: simplepush not installed - push notifications will be skipped")
 
+# SimplePush message limit used for push bodies
+PUSH_MAX_CHARS = 1000
+
+
+def html_to_text(html):
+    """Cheap tag strip for callers that only pass HTML; renderers should pass text themselves"""
+    text = re.sub(r'<(script|style)[^>]*>.*?</\1>', ' ', html, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def call_with_timeout(timeout, func, *args, **kwargs):
+    """Run a blocking call that has no timeout of its own in a daemon thread, giving up after `timeout`"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"no response after {timeout:.0f}s")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
+
 class SeatPickMonitor:
     def __init__(self):
         self.url = "https://seatpick.com/atmosphere-morrison-red-rocks-amphitheatre-19-09-2025-tickets/event/366607?quantity=2"
@@ -37,7 +65,12 @@ class SeatPickMonitor:
         
         # Choose notification method preference
         self.use_mailersend = bool(self.mailersend_api_key and len(self.mailersend_api_key) > 20)
-        self.use_simplepush = bool(self.simplepush_key and simplepush_send)
+        self.use_simplepush = bool(self.simplepush_key and SIMPLEPUSH_AVAILABLE)
+        
+        # Seconds a notification request may take, cut to what is left before
+        # notify_deadline (a time.monotonic() value) when the caller has one
+        self.request_timeout = 30
+        self.notify_deadline = None
         
     def scrape_tickets(self):
         headers = {
@@ -45,6 +78,9 @@ class SeatPickMonitor:
         }
         
         try:
+            import requests
+            from bs4 import BeautifulSoup
+            
             response = requests.get(self.url, headers=headers, timeout=30)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -108,8 +144,18 @@ class SeatPickMonitor:
         """Filter for all tickets under $400"""
         return [ticket for ticket in tickets if ticket['price'] < 400]
     
+    def notification_timeout(self):
+        """Seconds the next notification request may take; 0 once the deadline has passed"""
+        if self.notify_deadline is None:
+            return self.request_timeout
+        return max(0.0, min(self.request_timeout, self.notify_deadline - time.monotonic()))
+    
     def send_mailersend_email(self, subject, body, is_html=False):
         """Send email via MailerSend API"""
+        timeout = self.notification_timeout()
+        if not timeout:
+            print("⏱️  Out of notification time - skipping MailerSend email")
+            return False
         try:
             import requests
             
@@ -139,7 +185,7 @@ class SeatPickMonitor:
             else:
                 email_data["text"] = body
             
-            response = requests.post(url, json=email_data, headers=headers)
+            response = requests.post(url, json=email_data, headers=headers, timeout=timeout)
             response.raise_for_status()
             
             print("MailerSend email sent successfully")
@@ -151,7 +197,15 @@ class SeatPickMonitor:
     
     def send_smtp_email(self, subject, body, is_html=False):
         """Send email via SMTP (legacy method)"""
+        timeout = self.notification_timeout()
+        if not timeout:
+            print("⏱️  Out of notification time - skipping SMTP email")
+            return False
         try:
+            import smtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+            
             msg = MIMEMultipart()
             msg['From'] = self.email_user
             msg['To'] = self.email_to
@@ -159,7 +213,7 @@ class SeatPickMonitor:
             
             msg.attach(MIMEText(body, 'html' if is_html else 'plain'))
             
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=timeout)
             server.starttls()
             server.login(self.email_user, self.email_pass)
             
@@ -180,8 +234,17 @@ class SeatPickMonitor:
             if not self.use_simplepush:
                 print("SimplePush not configured")
                 return False
+            timeout = self.notification_timeout()
+            if not timeout:
+                print("⏱️  Out of notification time - skipping SimplePush notification")
+                return False
             
-            simplepush_send(
+            from simplepush import send as simplepush_send
+            
+            # simplepush.send takes no timeout
+            call_with_timeout(
+                timeout,
+                simplepush_send,
                 key=self.simplepush_key,
                 title=title,
                 message=message
@@ -194,12 +257,12 @@ class SeatPickMonitor:
             print(f"Error sending SimplePush notification: {e}")
             return False
     
-    def send_notifications(self, subject, body_html, body_text=None):
-        """Send notifications via all configured methods"""
-        if body_text is None:
-            # Convert HTML to plain text for push notifications
-            from bs4 import BeautifulSoup
-            body_text = BeautifulSoup(body_html, 'html.parser').get_text().strip()
+    def send_notifications(self, subject, body_html, body_text=None, push_text=None, push=True):
+        """Send notifications via all configured methods.
+        body_text is the plain-text version; push_text, if given, is an already bounded push body;
+        push=False sends email only (e.g. the tickets were already pushed)"""
+        if body_text is None and push_text is None:
+            body_text = html_to_text(body_html)
         
         success_count = 0
         
@@ -212,9 +275,9 @@ class SeatPickMonitor:
                 success_count += 1
         
         # Send push notification
-        if self.use_simplepush:
+        if self.use_simplepush and push:
             # Truncate message for push notification
-            push_message = body_text[:1000] + "..." if len(body_text) > 1000 else body_text
+            push_message = push_text or (body_text[:PUSH_MAX_CHARS] + "..." if len(body_text) > PUSH_MAX_CHARS else body_text)
             if self.send_simplepush_notification(subject, push_message):
                 success_count += 1
         
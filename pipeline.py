@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+One monitoring cycle as overlapping async stages.
+
+    fetch ──accepted──▶ plan ──jobs──▶ verify (N pages) ──results──▶ collect
+
+- fetch streams the SeatPick payload through filter_listing and hands each
+  accepted listing on while the rest of the body is still arriving.
+- plan sends listings that already look like alerts (score over
+  EARLY_VERIFY_SCORE, not priced above $400 by the fee model) straight to
+  verification, using up to half the budget. Once the stream ends it records the snapshot and runs the
+  usual budgeted plan over what it held back.
+- verify runs VERIFY_CONCURRENCY checks at once in one verification session
+  (HTTP or browser, see http_verifier), or feeds the VerificationPool
+  worker processes when VERIFY_WORKERS > 1.
+- collect hands each ticket to `on_ticket` the moment it is verified,
+  then records verifications and releases leases at the end.
+
+Queues are bounded, so a slow stage holds back the ones before it instead
+of buffering the whole payload. The best ticket's alert latency is its own
+verification, not the slowest of the batch.
+
+fetch and verify run inside their run_budget stages. A fetch cut off at
+its deadline still gets its listings verified but isn't stored as the
+snapshot; at the verify deadline in-flight and queued checks are
+cancelled and handed back as deferred, so they lead the next run's queue.
+
+With a listing_fingerprint.ListingIndex, plan drops listings that are
+copies of seats already in the index (cross-listed through another vendor,
+or reported by another source) before anything is verified; they are
+still part of the snapshot. Of the copies it holds back, plan verifies
+the cheapest all-in one whose vendor's breaker isn't open. A check that
+comes back unverified moves on to the group's next copy, and only the
+last attempt's ticket is passed on (every attempt is still recorded).
+"""
+import asyncio
+import inspect
+import os
+
+from listing_fingerprint import all_in_price
+from monitor_log import get_logger
+from run_budget import RunBudget
+from traffic_control import host_of
+
+log = get_logger('pipeline')
+
+QUEUE_SIZE = 64
+
+# VerificationQueue.score at or above which a listing is verified as soon as it is filtered
+# (roughly: likely under $400 and with a real chance under $300)
+EARLY_VERIFY_SCORE = float(os.environ.get('EARLY_VERIFY_SCORE', 1.0))
+
+# Share of the verification budget early dispatch may use; the rest goes by full-payload ranking
+EARLY_BUDGET_SHARE = 0.5
+
+DONE = object()
+
+
+class CheckPipeline:
+    """Fetch, filter, verify and collect one event's tickets with the stages overlapping"""
+
+    def __init__(self, monitor, on_ticket=None, concurrency=None, budget=None, index=None):
+        self.monitor = monitor
+        self.on_ticket = on_ticket
+        self.concurrency = concurrency or monitor.verify_concurrency
+        self.budget = budget or RunBudget()
+        self.index = index
+        self.accepted = asyncio.Queue(QUEUE_SIZE)
+        self.jobs = asyncio.Queue(QUEUE_SIZE)
+        self.results = asyncio.Queue(QUEUE_SIZE)
+        self.leader = False
+        self.fetch_failed = False
+        self.early = 0
+        self.in_flight = {}
+        # Listings whose unverified result was followed up by another copy of the seats
+        self.retried = set()
+        self.tickets = []
+
+    async def run(self):
+        """All tickets of the cycle: verified, unverified and fee-model predicted"""
+        monitor = self.monitor
+        self.leader = monitor.holds_event_lease()
+        try:
+            tasks = [asyncio.create_task(stage) for stage in
+                     (self.fetch(), self.plan(), self.verify(), self.collect())]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+        finally:
+            if self.leader:
+                monitor.release_event_lease()
+        return self.tickets
+
+    async def fetch(self):
+        monitor = self.monitor
+        try:
+            async with self.budget.stage('fetch'):
+                if self.leader:
+                    async for listing in monitor.stream_listings():
+                        await self.accepted.put(listing)
+                else:
+                    # Another node fetched this poll; help verify its snapshot instead of refetching
+                    print(f"🤝 {monitor.coordinator.holder(f'event:{monitor.event_id}')} is polling this event - verifying from the shared snapshot")
+                    for listing in monitor.filter_listings(monitor.store.listings_for_size(monitor.party_size, [monitor.event_id])):
+                        await self.accepted.put(listing)
+        except Exception as e:
+            print(f"❌ Failed to fetch listings: {e}")
+            self.fetch_failed = True
+        finally:
+            await self.accepted.put(DONE)
+
+    async def plan(self):
+        monitor = self.monitor
+        try:
+            fee_model, queue = monitor.verification_planner()
+            early_budget = int(queue.budget * EARLY_BUDGET_SHARE)
+            held = []
+            snapshot = []
+            copies = 0
+            while (listing := await self.accepted.get()) is not DONE:
+                snapshot.append(listing)
+                if self.index is not None and not self.index.add(listing, 'seatpick', all_in_price(listing, fee_model))[1]:
+                    copies += 1
+                    continue
+                if self.early < early_budget and self.worth_verifying_early(listing, fee_model, queue):
+                    self.early += 1
+                    await self.jobs.put(listing)
+                else:
+                    held.append(listing)
+
+            if self.fetch_failed:
+                # A partial payload would mark the missing listings as gone
+                return
+            if self.leader and 'fetch' not in self.budget.expired:
+                monitor.record_snapshot(snapshot)
+            if copies:
+                print(f"🧬 {copies} listings are copies of seats listed elsewhere - verifying one of each")
+                held = [self.index.elect(listing, self.checkable) for listing in held]
+            if self.early:
+                print(f"⚡ Started verifying {self.early} promising listings while the payload streamed in")
+
+            to_verify, predicted = monitor.plan_verification(held, (fee_model, queue), queue.budget - self.early)
+            for ticket in predicted:
+                await self.results.put((None, ticket))
+            if to_verify:
+                print("🔍 Verifying final prices with all fees...")
+            for listing in to_verify:
+                await self.jobs.put(listing)
+        finally:
+            await self.jobs.put(DONE)
+
+    def worth_verifying_early(self, listing, fee_model, queue):
+        """High-scoring listing with a checkout link that this node could claim"""
+        if not listing.get('deepLink') or fee_model.classify(listing, 300, 400) == 'above':
+            return False
+        return queue.score(listing) >= EARLY_VERIFY_SCORE and self.monitor.claim_verification_job(listing)
+
+    async def verify(self):
+        monitor = self.monitor
+        try:
+            if monitor.verify_workers > 1:
+                async with self.budget.stage('verify'):
+                    await self.verify_in_pool()
+            else:
+                async with monitor.verification_session() as context:
+                    async with self.budget.stage('verify'):
+                        await asyncio.gather(*(self.verify_worker(context) for _ in range(self.concurrency)))
+            if 'verify' in self.budget.expired:
+                await self.defer_unchecked()
+        finally:
+            await self.results.put(DONE)
+
+    def checkable(self, listing):
+        """A copy worth verifying: it has a checkout link and its vendor isn't blocking us"""
+        deeplink = listing.get('deepLink')
+        return bool(deeplink) and self.monitor.traffic.available(host_of(deeplink))
+
+    async def report(self, listing, result, retry=True):
+        """Pass a check's result on; returns another copy of the seats to check if it failed"""
+        copy = None
+        if retry and self.index is not None and not result.get('verified'):
+            copy = self.index.fallback(listing, self.checkable)
+            if copy is not None:
+                self.retried.add(id(listing))
+        await self.results.put((listing, result))
+        return copy
+
+    async def verify_worker(self, context):
+        while (listing := await self.jobs.get()) is not DONE:
+            while listing is not None:
+                self.in_flight[id(listing)] = listing
+                result = await self.monitor.verify_listing(context, listing)
+                del self.in_flight[id(listing)]
+                listing = await self.report(listing, result)
+        # Leave the marker for the sibling workers
+        await self.jobs.put(DONE)
+
+    async def defer_unchecked(self):
+        """Out of verification time: report cancelled and still-queued checks as deferred"""
+        monitor = self.monitor
+        unchecked = list(self.in_flight.values())
+        self.in_flight.clear()
+        while (listing := await self.jobs.get()) is not DONE:
+            unchecked.append(listing)
+        if unchecked:
+            print(f"⏱️  Out of verification time - deferring {len(unchecked)} listings to the next run")
+        for listing in unchecked:
+            result = monitor.unverified_result(listing, monitor.sanitize_checkout_url(listing.get('deepLink', '')))
+            result['deferred'] = True
+            await self.results.put((listing, result))
+
+    async def verify_in_pool(self):
+        from verification_pool import VerificationPool
+
+        pool = VerificationPool(self.monitor, self.monitor.verify_workers)
+        pool.start()
+        submitted = []
+        returned = 0
+        fed = False
+
+        def submit(listing):
+            pool.submit(len(submitted), listing)
+            submitted.append(listing)
+            self.in_flight[id(listing)] = listing
+
+        def finish():
+            # Fallback copies are submitted as results come back, so close only once nothing is out
+            if fed and returned == len(submitted) and not pool.closed:
+                pool.close()
+
+        async def feed():
+            nonlocal fed
+            while (listing := await self.jobs.get()) is not DONE:
+                submit(listing)
+            await self.jobs.put(DONE)
+            fed = True
+            finish()
+
+        async def drain():
+            nonlocal returned
+            async for index, result in pool.results():
+                listing = submitted[index]
+                self.in_flight.pop(id(listing), None)
+                returned += 1
+                live = not pool.closed and any(process.is_alive() for process in pool.processes)
+                copy = await self.report(listing, result, retry=live)
+                if copy is not None:
+                    submit(copy)
+                finish()
+
+        try:
+            await asyncio.gather(feed(), drain())
+        except asyncio.CancelledError:
+            # Keep what the workers finished before the deadline; the rest is deferred
+            for index, result in await pool.stop():
+                self.in_flight.pop(id(submitted[index]), None)
+                await self.report(submitted[index], result, retry=False)
+            raise
+        finally:
+            pool.shutdown()
+
+    async def collect(self):
+        monitor = self.monitor
+        verified = []
+        try:
+            while (item := await self.results.get()) is not DONE:
+                listing, ticket = item
+                if listing is not None:
+                    verified.append((listing, ticket))
+                    if self.index is not None:
+                        self.index.tag(listing, ticket)
+                    if id(listing) in self.retried:
+                        continue
+                self.tickets.append(ticket)
+                if self.on_ticket:
+                    outcome = self.on_ticket(ticket)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+        finally:
+            if verified:
+                log.info('verify.summary', "✅ Verified {verified} of {checked} checkout prices",
+                         verified=sum(1 for _, ticket in verified if ticket.get('verified')), checked=len(verified))
+            listings = [listing for listing, _ in verified]
+            monitor.release_verification_jobs(listings)
+            monitor.record_verifications(listings, [ticket for _, ticket in verified])
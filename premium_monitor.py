@@ -1,217 +1,53 @@
 #!/usr/bin/env python3
 import asyncio
+import contextlib
 import os
 import sys
 from datetime import datetime
 import re
-import aiohttp
-from rebrowser_playwright.async_api import async_playwright
-from camoufox.async_api import AsyncCamoufox
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from urllib.parse import urlparse
+
+# Browser and HTTP clients (playwright, camoufox, aiohttp) are imported where they are
+# used so schedule checks and skipped polls start without loading them
 
 # Import notification functionality from original monitor
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from monitor_tickets import SeatPickMonitor
+from monitor_tickets import SeatPickMonitor, PUSH_MAX_CHARS
+from listing_store import ListingStore
+from listing_diff import diff_listings, churn_ratio, listing_key
+from adaptive_scheduler import AdaptiveScheduler
+from verification_queue import VerificationQueue
+from fee_model import FeeModel
+from listing_stream import ListingStreamParser, iter_listing_stream
+from url_canonical import canonicalize_url
+from verification_pool import VerificationPool
+from coordination import Coordinator
+from quantity_index import PARTY_SIZE, can_sell
+from traffic_control import TrafficControl, host_of, is_blocking_failure
+from http_verifier import verification_session
+from redirect_resolver import RedirectResolver, needs_resolution
+from monitor_log import get_logger
+from ticket_sources import TICKET_SOURCES, TicketAggregator, build_sources
+from listing_fingerprint import also_listed_by
+from run_budget import RunBudget
+from run_profiler import RunProfiler, profiling_requested
+from price_analytics import PriceAnalytics, describe_event
+
+log = get_logger('monitor')
 
 class PremiumSeatPickMonitor(SeatPickMonitor):
     def __init__(self):
         super().__init__()
         self.event_id = "366607"
-        self.base_url = "https://seatpick.com"
-        self.api_url = f"https://seatpick.com/api/proxy/4/events/{self.event_id}/listings"
-    
-    def sanitize_checkout_url(self, url):
-        """Remove tracking parameters from checkout URLs while keeping essential params"""
-        if not url:
-            return url
-        
-        # For VividSeats URLs (through pxf.io tracking)
-        if 'vivid-seats.pxf.io' in url or 'vividseats.pxf.io' in url:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
-            if 'u' in params:
-                actual_url = params['u'][0]
-                parsed_actual = urlparse(actual_url)
-                actual_params = parse_qs(parsed_actual.query)
-                clean_params = {}
-                if 'showDetails' in actual_params:
-                    clean_params['showDetails'] = actual_params['showDetails'][0]
-                if 'qty' in actual_params:
-                    clean_params['qty'] = actual_params['qty'][0]
-                
-                return urlunparse((
-                    parsed_actual.scheme,
-                    parsed_actual.netloc,
-                    parsed_actual.path,
-                    '',
-                    urlencode(clean_params),
-                    ''
-                ))
+        self.event_date = datetime(2025, 9, 19, 18, 0)
+        # Base-URL overrides let the monitor run against mock_server.py instead of live sites
+        self.base_url = os.environ.get('SEATPICK_BASE_URL', "https://seatpick.com").rstrip('/')
+        self.api_url = f"{self.base_url}/api/proxy/4/events/{self.event_id}/listings"
+        self.vendor_base_url = os.environ.get('VENDOR_BASE_URL', '').rstrip('/')
         
-        # For Viagogo URLs (through prf.hn tracking)
-        elif 'viagogo.prf.hn' in url:
-            if 'destination:' in url:
-                dest_start = url.find('destination:') + len('destination:')
-                actual_url = url[dest_start:]
-                import urllib.parse
-                actual_url = urllib.parse.unquote(actual_url)
-                return actual_url
-        
-        # For TicketNetwork URLs (through lusg.net tracking)
-        elif 'ticketnetwork.lusg.net' in url:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
-            if 'u' in params:
-                actual_url = params['u'][0]
-                parsed_actual = urlparse(actual_url)
-                actual_params = parse_qs(parsed_actual.query)
-                clean_params = {}
-                if 'ticketGroupId' in actual_params:
-                    clean_params['ticketGroupId'] = actual_params['ticketGroupId'][0]
-                
-                return urlunparse((
-                    parsed_actual.scheme,
-                    parsed_actual.netloc,
-                    parsed_actual.path,
-                    '',
-                    urlencode(clean_params),
-                    ''
-                ))
-        
-        # For direct URLs, remove common tracking parameters
-        else:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
-            
-            tracking_params = [
-                'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-                'fbclid', 'gclid', 'msclkid', 'ref', 'referrer', 'source',
-                'camref', 'pubref', 'clickid', 'affid', 'affiliate'
-            ]
-            
-            clean_params = {k: v[0] for k, v in params.items() 
-                           if k.lower() not in tracking_params}
-            
-            return urlunparse((
-                parsed.scheme,
-                parsed.netloc,
-                parsed.path,
-                '',
-                urlencode(clean_params) if clean_params else '',
-                ''
-            ))
+        # Tickets that must be purchasable together (PARTY_SIZE)
+        self.party_size = PARTY_SIZE
         
-        return url
-    
-    async def scrape_tickets_detailed(self):
-        """Fetch and verify tickets with final prices including all fees"""
-        try:
-            print("🔍 Fetching tickets from SeatPick API...")
-            
-            # Fetch from SeatPick API
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                'Accept': 'application/json',
-                'Referer': f'{self.base_url}/atmosphere-morrison-red-rocks-amphitheatre-19-09-2025-tickets/event/{self.event_id}'
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.api_url, headers=headers) as response:
-                    if response.status != 200:
-                        print("❌ Failed to fetch listings")
-                        return []
-                        
-                    data = await response.json()
-            
-            # Filter for desired sections only (NO GA) and quantity >= 2
-            filtered = []
-            for listing in data.get('listings', []):
-                if listing.get('section') not in self.desired_sections:
-                    continue
-                
-                # STRICT REQUIREMENT: Must have exactly 2 tickets available together (side by side)
-                quantity = listing.get('quantity', 1)
-                splits = listing.get('splits', [])
-                
-                # Only accept if:
-                # 1. Quantity is at least 2 (can buy 2+ tickets)
-                # 2. Either no splits specified OR splits explicitly allows 2
-                # 3. We specifically want 2 tickets, not 1, not 3+ (unless they allow splits of 2)
-                has_two_available = quantity >= 2
-                
-                # Check if splits allow exactly 2 (or if no splits specified, assume ok)
-                if splits:
-                    # If splits are specified, 2 must be in the list
-                    allows_exactly_two = 2 in splits
-                else:
-                    # No splits specified means any quantity up to max is allowed
-                    allows_exactly_two = True
-                
-                can_buy_two_together = has_two_available and allows_exactly_two
-                
-                if not can_buy_two_together:
-                    print(f"   ❌ Skipping single ticket: {listing.get('section')} ${listing.get('price')} - qty:{quantity}, splits:{splits}")
-                    continue
-                
-                # Extract details
-                section = listing.get('section')
-                row = listing.get('row', 'General')
-                seatpick_price = listing.get('price', 0)
-                seller = listing.get('seller', '')
-                deeplink = listing.get('deepLink', '')
-                
-                if not deeplink:
-                    # Skip if no checkout link
-                    filtered.append({
-                        'section': section,
-                        'row': row,
-                        'price': seatpick_price,
-                        'seller': seller,
-                        'verified': False,
-                        'final_price': seatpick_price,
-                        'price_diff': 0,
-                        'checkout_link': '',
-                        'accurate': True
-                    })
-                    continue
-                
-                print(f"   ✅ {section} ${seatpick_price} via {seller} (qty: {quantity})")
-                filtered.append({
-                    'section': section,
-                    'row': row,
-                    'price': seatpick_price,
-                    'seller': seller,
-                    'deeplink': deeplink,  # Keep original for verification
-                    'quantity': quantity,
-                    'splits': splits
-                })
-            
-            print(f"📊 Found {len(filtered)} tickets in premium sections")
-            
-            # Verify prices with fees for tickets under $500 (to catch misleading pricing)
-            verified_tickets = []
-            if filtered:
-                print("🔍 Verifying final prices with all fees...")
-                verified_tickets = await self.verify_final_prices(filtered[:20])  # Limit to avoid rate limiting
-            
-            # DISABLED: SeatGeek integration
-            # try:
-            #     print("🦊 Checking SeatGeek for Reserved Left/Center sections...")
-            #     seatgeek_tickets = await self.scrape_seatgeek_tickets()
-            #     if seatgeek_tickets:
-            #         verified_tickets.extend(seatgeek_tickets)
-            #         print(f"🎫 Added {len(seatgeek_tickets)} SeatGeek tickets to results")
-            #     else:
-            #         print("🦊 SeatGeek: No target section tickets found")
-            # except Exception as e:
-            #     print(f"🦊 SeatGeek integration error: {e}")
-            
-            return verified_tickets
-            
-        except Exception as e:
-            print(f"❌ Error in scrape_tickets_detailed: {e}")
-            return []
-
         # Your desired sections (NO GA)
         self.desired_sections = [
             "Center",
@@ -225,100 +61,311 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
             "Reserved Left",
             "Reserved Center"
         ]
+        
+        # Listing history and adaptive polling state (SQLite, opened on first use)
+        self._store = None
+        self._scheduler = None
+        self._coordinator = None
+        self._analytics = None
+        self._redirects = None
+        self.last_diff = None
+        self.price_events = []
+        # When the current check began; the next poll is scheduled from here
+        self.run_started = None
+        
+        # Browser verification: worker processes (each with its own browser), and per-vendor
+        # rate limits / circuit breakers instead of a fixed delay between pages
+        self.verify_workers = int(os.environ.get('VERIFY_WORKERS', 1))
+        self.verify_concurrency = int(os.environ.get('VERIFY_CONCURRENCY', 2))
+        
+        # Push each urgent ticket as soon as it is verified; the email follows at the end of the cycle
+        self.early_push = os.environ.get('EARLY_PUSH', '1') != '0'
+        self._traffic = None
+        
+        # Sources fetched concurrently each cycle (SeatPick, SeatGeek)
+        self.ticket_sources = TICKET_SOURCES
+    
+    def __getstate__(self):
+        # Shipped to verification worker processes; SQLite connections stay with the coordinator
+        state = self.__dict__.copy()
+        state['_store'] = None
+        state['_scheduler'] = None
+        state['_coordinator'] = None
+        state['_analytics'] = None
+        state['_redirects'] = None
+        return state
+    
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = ListingStore()
+        return self._store
+    
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            self._scheduler = AdaptiveScheduler(self.store.conn)
+        return self._scheduler
+    
+    @property
+    def coordinator(self):
+        if self._coordinator is None:
+            self._coordinator = Coordinator(self.store.conn)
+        return self._coordinator
+    
+    @property
+    def analytics(self):
+        if self._analytics is None:
+            self._analytics = PriceAnalytics(self.store.conn)
+        return self._analytics
+    
+    @property
+    def redirects(self):
+        if self._redirects is None:
+            self._redirects = RedirectResolver(self.store.conn)
+        return self._redirects
+    
+    @property
+    def traffic(self):
+        if self._traffic is None:
+            self._traffic = TrafficControl()
+        return self._traffic
     
-    async def scrape_tickets_detailed(self):
-        """Fetch and verify tickets with final prices including all fees"""
+    def sanitize_checkout_url(self, url):
+        """Remove tracking parameters from checkout URLs while keeping essential params"""
+        # Rule table per affiliate domain, memoized: see url_canonical
+        return canonicalize_url(url)
+    
+    def navigation_url(self, clean_url):
+        """URL the browser should open for a checkout link, honoring VENDOR_BASE_URL"""
+        if not self.vendor_base_url or not clean_url:
+            return clean_url
+        
+        parsed = urlparse(clean_url)
+        local_url = f"{self.vendor_base_url}/vendor/{parsed.netloc}{parsed.path}"
+        if parsed.query:
+            local_url += f"?{parsed.query}"
+        return local_url
+    
+    def vendor_url(self, url):
+        """Inverse of navigation_url: the real URL behind a VENDOR_BASE_URL address"""
+        prefix = f"{self.vendor_base_url}/vendor/"
+        if not self.vendor_base_url or not url.startswith(prefix):
+            return url
+        return f"https://{url[len(prefix):]}"
+    
+    async def resolve_checkout_url(self, context, clean_url):
+        """Vendor URL behind a tracker link url_canonical can't unwrap (resolved once, then cached)"""
+        http = getattr(context, 'http', None)
+        if http is None:
+            return self.redirects.cached(clean_url) or clean_url
+        return await self.redirects.resolve(http.session, clean_url, self.navigation_url, self.vendor_url)
+    
+    def filter_listings(self, listings):
+        """Filter raw SeatPick listings to premium sections where party_size tickets can be bought together"""
+        filtered = []
+        for listing in listings:
+            accepted = self.filter_listing(listing)
+            if accepted:
+                filtered.append(accepted)
+        return filtered
+    
+    def filter_listing(self, listing):
+        """One raw SeatPick listing as a ticket dict, or None if it fails the section/split filters"""
+        # Filter for desired sections only (NO GA)
+        if listing.get('section') not in self.desired_sections:
+            return None
+        
+        # STRICT REQUIREMENT: party_size tickets (2 by default) must be purchasable together,
+        # from quantity and the seller's allowed splits - see quantity_index
+        quantity = listing.get('quantity', 1)
+        splits = listing.get('splits', [])
+        if not can_sell(listing, self.party_size):
+            log.debug('filter.split', "   ❌ Skipping: can't buy {size} together: {section} ${price} - qty:{quantity}, splits:{splits}",
+                      size=self.party_size, section=listing.get('section'), price=listing.get('price'), quantity=quantity, splits=splits)
+            return None
+            
+        return {
+            'section': listing.get('section', ''),
+            'row': listing.get('row', ''),
+            'price': listing.get('price', 0),
+            'seller': listing.get('seller', ''),
+            'deepLink': listing.get('deepLink', ''),
+            'quantity': quantity,
+            'splits': splits,
+            'verified': False,
+            'final_price': None,
+            'price_diff': None
+        }
+    
+    async def stream_listings(self):
+        """Yield premium listings as the SeatPick response streams in; raises if the fetch fails"""
+        print("🔍 Fetching tickets from SeatPick API...")
+        
+        # Fetch from SeatPick API
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Accept': 'application/json',
+            'Referer': f'{self.base_url}/atmosphere-morrison-red-rocks-amphitheatre-19-09-2025-tickets/event/{self.event_id}'
+        }
+        
+        import aiohttp
+        
+        parser = ListingStreamParser()
+        accepted = 0
+        async with aiohttp.ClientSession() as session:
+            async with session.get(self.api_url, headers=headers) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"SeatPick returned HTTP {response.status}")
+                
+                # Filter while the body streams in; rejected listings are never kept
+                async for listing in iter_listing_stream(response, parser):
+                    kept = self.filter_listing(listing)
+                    if kept:
+                        accepted += 1
+                        yield kept
+        
+        print(f"📊 Found {accepted} tickets in premium sections (of {parser.count} listings)")
+    
+    async def fetch_listings(self):
+        """Fetch the SeatPick listings and filter them as they stream in; None on failure"""
+        try:
+            return [listing async for listing in self.stream_listings()]
+        except RuntimeError as e:
+            print(f"❌ Failed to fetch listings: {e}")
+            return None
+    
+    async def scrape_tickets_detailed(self, on_ticket=None, budget=None):
+        """Fetch and verify tickets with final prices including all fees from every source at
+        once (see ticket_sources); `on_ticket` sees each ticket as soon as it is verified"""
+        try:
+            sources = build_sources(self.ticket_sources)
+            return await TicketAggregator(self, sources, on_ticket, budget=budget).run()
+        except Exception as e:
+            print(f"❌ Error in ticket scraping: {e}")
+            return []
+    
+    def holds_event_lease(self):
+        """True if this node should fetch the event (it holds or just took the event lease)"""
+        try:
+            return self.coordinator.acquire(f"event:{self.event_id}")
+        except Exception as e:
+            print(f"⚠️  Coordination unavailable ({e}), polling anyway")
+            return True
+    
+    def release_event_lease(self):
+        try:
+            self.coordinator.release(f"event:{self.event_id}")
+        except Exception as e:
+            print(f"⚠️  Could not release event lease: {e}")
+    
+    def claim_verification_job(self, listing):
+        """Take the verification lease for one listing; True if coordination is unavailable"""
+        try:
+            return bool(self.coordinator.claim_jobs(self.event_id, [listing], listing_key, 1))
+        except Exception as e:
+            print(f"⚠️  Coordination unavailable ({e}), verifying anyway")
+            return True
+    
+    def release_verification_jobs(self, listings):
+        try:
+            self.coordinator.release_jobs(self.event_id, [l for l in listings if l.get('deepLink')], listing_key)
+        except Exception as e:
+            print(f"⚠️  Could not release verification leases: {e}")
+    
+    def record_snapshot(self, listings):
+        """Diff against the previous poll, store this snapshot and schedule the next poll"""
         try:
-            print("🔍 Fetching tickets from SeatPick API...")
+            previous = self.store.load_snapshot(self.event_id)
+            self.last_diff = diff_listings(previous, listings) if previous else None
+            self.store.save_snapshot(self.event_id, listings)
             
-            # Fetch from SeatPick API
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                'Accept': 'application/json',
-                'Referer': f'{self.base_url}/atmosphere-morrison-red-rocks-amphitheatre-19-09-2025-tickets/event/{self.event_id}'
-            }
+            if self.last_diff:
+                print(f"🔄 Changes since last poll: +{len(self.last_diff['added'])} new, "
+                      f"-{len(self.last_diff['removed'])} gone, {len(self.last_diff['price_drops'])} price drops "
+                      f"({churn_ratio(self.last_diff):.0%} churn)")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.api_url, headers=headers) as response:
-                    if response.status != 200:
-                        print("❌ Failed to fetch listings")
-                        return []
-                        
-                    data = await response.json()
+            interval = self.scheduler.record_poll(self.event_id, self.last_diff, self.event_date, started=self.run_started)
+            print(f"⏲️  Next poll in {interval / 60:.1f} minutes")
+        except Exception as e:
+            print(f"⚠️  Could not record listing snapshot: {e}")
+        
+        try:
+            self.price_events = self.analytics.observe(self.event_id, listings)
+            for event in self.price_events:
+                print(f"   {describe_event(event)}")
+        except Exception as e:
+            print(f"⚠️  Price analytics unavailable: {e}")
+    
+    def price_drop_keys(self):
+        """Listing keys flagged by this poll's price-drop / new-low events"""
+        return {listing_key(event['listing']) for event in self.price_events}
+    
+    def verification_planner(self):
+        """Fee model and verification queue fitted on the stored verification history"""
+        fee_model = FeeModel(self.store.verification_history())
+        return fee_model, VerificationQueue(self.store.conn, self.get_section_category, fee_model)
+    
+    def plan_verification(self, listings, planner=None, budget=None):
+        """Pick listings worth a browser check: skip those the fee model prices clearly above
+        $400, then order the rest by alert likelihood within the budget; the rest wait a cycle"""
+        try:
+            fee_model, queue = planner or self.verification_planner()
+            if budget is not None:
+                queue.budget = max(0, budget)
             
-            # Filter for desired sections only (NO GA) and quantity >= 2
-            filtered = []
-            for listing in data.get('listings', []):
-                if listing.get('section') not in self.desired_sections:
-                    continue
-                
-                # STRICT REQUIREMENT: Must have exactly 2 tickets available together (side by side)
-                quantity = listing.get('quantity', 1)
-                splits = listing.get('splits', [])
-                
-                # Only accept if:
-                # 1. Quantity is at least 2 (can buy 2+ tickets)
-                # 2. Either no splits specified OR splits explicitly allows 2
-                # 3. We specifically want 2 tickets, not 1, not 3+ (unless they allow splits of 2)
-                has_two_available = quantity >= 2
-                
-                # Check if splits allow exactly 2 (or if no splits specified, assume ok)
-                if splits:
-                    # If splits are specified, 2 must be in the list
-                    allows_exactly_two = 2 in splits
+            # Listings predicted clearly under the limits still get navigated: alerts
+            # only go out on checkout-verified prices. Price drops are checked whatever
+            # the fee model says, since they can alert above $400
+            drop_keys = self.price_drop_keys()
+            needs_browser = []
+            predicted = []
+            for listing in listings:
+                if (listing.get('deepLink') and listing_key(listing) not in drop_keys
+                        and fee_model.classify(listing, 300, 400) == 'above'):
+                    predicted.append(self.predicted_result(listing, fee_model.predict(listing)))
                 else:
-                    # No splits specified means any quantity up to max is allowed
-                    allows_exactly_two = True
-                
-                can_buy_two_together = has_two_available and allows_exactly_two
-                
-                if not can_buy_two_together:
-                    print(f"   ❌ Skipping single ticket: {listing.get('section')} ${listing.get('price')} - qty:{quantity}, splits:{splits}")
-                    continue
-                
-                # Additional check: reject if quantity is 1 (single ticket only)
-                if quantity < 2:
-                    print(f"   ❌ Skipping single ticket only: {listing.get('section')} ${listing.get('price')}")
-                    continue
-                    
-                filtered.append({
-                    'section': listing.get('section', ''),
-                    'row': listing.get('row', ''),
-                    'price': listing.get('price', 0),
-                    'seller': listing.get('seller', ''),
-                    'deepLink': listing.get('deepLink', ''),
-                    'quantity': quantity,
-                    'splits': splits,
-                    'verified': False,
-                    'final_price': None,
-                    'price_diff': None
-                })
-            
-            print(f"📊 Found {len(filtered)} tickets in premium sections")
+                    needs_browser.append(listing)
+            if predicted:
+                print(f"🧮 Fee model prices {len(predicted)} listings above $400 - skipping browser checks")
             
-            # Verify prices with fees for tickets under $500 (to catch misleading pricing)
-            verified_tickets = []
-            if filtered:
-                print("🔍 Verifying final prices with all fees...")
-                verified_tickets = await self.verify_final_prices(filtered[:20])  # Limit to avoid rate limiting
+            to_verify, deferred = queue.plan(self.event_id, needs_browser, boosted=drop_keys)
+            if deferred:
+                print(f"🎯 Verifying {len(to_verify)} most promising listings, deferring {len(deferred)} to next cycle")
             
-            # DISABLED: SeatGeek integration
-            # try:
-            #     print("🦊 Checking SeatGeek for Reserved Left/Center sections...")
-            #     seatgeek_tickets = await self.scrape_seatgeek_tickets()
-            #     if seatgeek_tickets:
-            #         verified_tickets.extend(seatgeek_tickets)
-            #         print(f"🎫 Added {len(seatgeek_tickets)} SeatGeek tickets to results")
-            #     else:
-            #         print("🦊 SeatGeek: No target section tickets found")
-            # except Exception as e:
-            #     print(f"🦊 SeatGeek integration error: {e}")
-            
-            return verified_tickets
+            # Other nodes may be verifying this event too: take the best listings nobody holds
+            candidates = [l for l in to_verify + deferred if l.get('deepLink')]
+            claimed = self.coordinator.claim_jobs(self.event_id, candidates, listing_key, queue.budget)
+            if len(claimed) < min(len(candidates), queue.budget):
+                print(f"🤝 Claimed {len(claimed)} verification jobs; the rest are held by other nodes")
+            return [l for l in to_verify if not l.get('deepLink')] + claimed, predicted
+        except Exception as e:
+            print(f"⚠️  Verification planning failed ({e}), verifying first 20 in API order")
+            return listings[:20], []
+    
+    def predicted_result(self, listing, prediction):
+        """Unverified ticket dict carrying the fee model's all-in estimate"""
+        low, expected, high = prediction
+        result = self.unverified_result(listing, self.sanitize_checkout_url(listing.get('deepLink', '')))
+        result['predicted_final_price'] = expected
+        result['predicted_range'] = (low, high)
+        return result
+    
+    def record_verifications(self, listings, results):
+        """Keep verified (listed, final) price pairs for fee estimates, and carry listings
+        skipped by an open circuit breaker or the run deadline over to the next cycle"""
+        try:
+            for listing, result in zip(listings, results):
+                self.store.record_verification(self.event_id, listing, result)
             
+            deferred = [listing for listing, result in zip(listings, results) if result.get('deferred')]
+            if deferred:
+                VerificationQueue(self.store.conn, self.get_section_category).defer(self.event_id, deferred)
+                blocked = self.traffic.open_hosts()
+                print(f"⛔ Deferred {len(deferred)} listings to next cycle"
+                      + (f" (blocked vendors: {', '.join(blocked)})" if blocked else ""))
         except Exception as e:
-            print(f"❌ Error in ticket scraping: {e}")
-            return []
+            print(f"⚠️  Could not record verification results: {e}")
     
     async def verify_final_prices(self, listings):
         """Verify FINAL checkout prices including all fees"""
@@ -326,131 +373,182 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
         if not listings:
             return []
         
+        if self.verify_workers > 1 and len(listings) > 1:
+            return await VerificationPool(self, self.verify_workers).verify(listings)
+        
+        # Alternate vendors so each one's rate limit refills while the others are checked
+        order = self.traffic.interleave(range(len(listings)), lambda i: host_of(listings[i].get('deepLink')))
+        verified = [None] * len(listings)
+        async with self.verification_session() as context:
+            for i in order:
+                verified[i] = await self.verify_listing(context, listings[i])
+        
+        return verified
+    
+    def verification_session(self):
+        """What verify_listing runs in: HTTP fetches for server-rendered vendors, and
+        verification_context() launched on the first page that needs a browser"""
+        return verification_session(self.verification_context, self.extract_price_from_content)
+    
+    @contextlib.asynccontextmanager
+    async def verification_context(self):
+        """Browser context that checkout pages are opened in"""
+        from rebrowser_playwright.async_api import async_playwright
+        
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context(
                 user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             )
+            try:
+                yield context
+            finally:
+                await browser.close()
+    
+    def unverified_result(self, listing, checkout_link=''):
+        """Ticket dict for a listing whose checkout price couldn't be verified (SeatPick price kept)"""
+        return {
+            'section': listing.get('section', ''),
+            'row': listing.get('row', ''),
+            'price': listing.get('price', 0),
+            'seller': listing.get('seller', ''),
+            'verified': False,
+            'final_price': listing.get('price', 0),
+            'price_diff': 0,
+            'checkout_link': checkout_link,
+            'accurate': True,
+            'quantity': listing.get('quantity', 1),
+            'splits': listing.get('splits', [])
+        }
+    
+    async def verify_listing(self, context, listing):
+        """Check one listing's checkout page (over HTTP when the vendor allows, else in the
+        browser) and return its verified dict"""
+        section = listing.get('section', '')
+        row = listing.get('row', '')
+        seatpick_price = listing.get('price', 0)
+        seller = listing.get('seller', '')
+        deeplink = listing.get('deepLink', '')
+        
+        if not deeplink:
+            # Add unverified listing
+            return self.unverified_result(listing)
+        
+        # Use sanitized URL for cleaner navigation and validation; trackers the string rules
+        # can't unwrap are resolved over HTTP once instead of the browser walking the redirects
+        clean_url = self.sanitize_checkout_url(deeplink)
+        if needs_resolution(clean_url):
+            clean_url = await self.resolve_checkout_url(context, clean_url)
+        
+        # Vendors that keep timing out or returning 403/429 are skipped until their breaker resets
+        host = host_of(clean_url)
+        if not self.traffic.allow(host):
+            log.info('verify.deferred', "   ⛔ {host} circuit open - deferring {section} via {seller} to next cycle",
+                     sampled=True, host=host, section=section, seller=seller)
+            result = self.unverified_result(listing, clean_url)
+            result['deferred'] = True
+            return result
+        await self.traffic.acquire(host)
+        
+        page = None
+        try:
+            final_price = None
             
-            verified = []
+            # Server-rendered vendors: fetch and parse the page without a browser
+            needs_browser = True
+            http = getattr(context, 'http', None)
+            if http and http.supports(host):
+                status, final_price, needs_browser = await http.final_price(self.navigation_url(clean_url), seller, host)
+                # A 403/429 to the plain client goes to the browser, whose response feeds the breaker
+                if not is_blocking_failure(status) and self.traffic.record(host, status=status):
+                    log.warning('traffic.breaker_open', "   ⛔ {host} returned {status} - circuit open, deferring its listings",
+                                host=host, status=status)
+                if status != 200:
+                    needs_browser = True
             
-            for listing in listings:
-                section = listing.get('section', '')
-                row = listing.get('row', '')
-                seatpick_price = listing.get('price', 0)
-                seller = listing.get('seller', '')
-                deeplink = listing.get('deepLink', '')
+            if needs_browser:
+                page = await context.new_page()
+                log.debug('verify.navigate', "   🔍 Navigating to {seller} page for verification: {url}", seller=seller, url=clean_url)
+                response = await page.goto(self.navigation_url(clean_url), wait_until='domcontentloaded', timeout=20000)
+                if self.traffic.record(host, status=getattr(response, 'status', None)):
+                    log.warning('traffic.breaker_open', "   ⛔ {host} returned {status} - circuit open, deferring its listings",
+                                host=host, status=response.status)
+                await page.wait_for_timeout(3000)
                 
-                if not deeplink:
-                    # Add unverified listing
-                    verified.append({
-                        'section': section,
-                        'row': row,
-                        'price': seatpick_price,
-                        'seller': seller,
-                        'verified': False,
-                        'final_price': seatpick_price,
-                        'price_diff': 0,
-                        'checkout_link': '',
-                        'accurate': True
-                    })
-                    continue
+                # Extract FINAL price with fees
+                final_price = await self.extract_final_price(page, seller)
+            
+            log.debug('verify.extracted', "   📊 {section} via {seller}: SeatPick shows ${listed}, extracted ${extracted}",
+                      section=section, seller=seller, listed=seatpick_price, extracted=final_price)
+            
+            # Reject extracted price if it's suspiciously lower than SeatPick price
+            # For premium tickets, final price should NEVER be less than 80% of SeatPick price
+            if final_price and final_price < (seatpick_price * 0.8):
+                log.warning('verify.rejected', "   🚨 SAFETY REJECTION: Final price ${extracted} vs SeatPick ${listed} - difference {pct:.1f}% (extraction error)",
+                            section=section, seller=seller, extracted=final_price, listed=seatpick_price,
+                            pct=(seatpick_price - final_price) / seatpick_price * 100)
+                final_price = None
+            
+            if final_price:
+                price_diff = final_price - seatpick_price
+                accurate = abs(price_diff) <= 10
                 
-                try:
-                    # Use sanitized URL for cleaner navigation and validation
-                    clean_url = self.sanitize_checkout_url(deeplink)
-                    page = await context.new_page()
-                    print(f"   🔍 Navigating to {seller} page for verification...")
-                    print(f"     Using clean URL: {clean_url[:80]}...")
-                    await page.goto(clean_url, wait_until='domcontentloaded', timeout=20000)
-                    await page.wait_for_timeout(3000)
-                    
-                    # Extract FINAL price with fees
-                    final_price = await self.extract_final_price(page, seller)
-                    
-                    print(f"   📊 Price extraction result for {section} via {seller}:")
-                    print(f"      SeatPick shows: ${seatpick_price}")
-                    print(f"      Extracted price: ${final_price}")
-                    
-                    # Reject extracted price if it's suspiciously lower than SeatPick price
-                    # For premium tickets, final price should NEVER be less than 80% of SeatPick price
-                    if final_price and final_price < (seatpick_price * 0.8):
-                        print(f"   🚨 SAFETY REJECTION: Final price ${final_price} vs SeatPick ${seatpick_price} - difference {((seatpick_price - final_price) / seatpick_price * 100):.1f}% (extraction error)")
-                        final_price = None
-                    
-                    if final_price:
-                        price_diff = final_price - seatpick_price
-                        accurate = abs(price_diff) <= 10
-                        
-                        # Additional safety check: Never use extracted price if it's way too low
-                        filter_price = final_price
-                        if seatpick_price > 400 and final_price < 300:
-                            print(f"   🛡️  SAFETY OVERRIDE: Using SeatPick ${seatpick_price} instead of extracted ${final_price} (suspicious price)")
-                            filter_price = seatpick_price
-                        
-                        print(f"   ✅ VERIFIED: {section} ${filter_price} ({'accurate' if accurate else 'price different'}) - diff: ${price_diff:+.2f}")
-                            
-                        verified.append({
-                            'section': section,
-                            'row': row,
-                            'price': filter_price,  # Use safe price for filtering
-                            'seller': seller,
-                            'verified': True,
-                            'final_price': final_price,
-                            'seatpick_price': seatpick_price,
-                            'price_diff': price_diff,
-                            'checkout_link': clean_url,  # Use the clean URL we already sanitized
-                            'accurate': accurate
-                        })
-                    else:
-                        print(f"   ❓ UNVERIFIED: {section} ${seatpick_price} via {seller} - using SeatPick price")
-                        # Fallback to SeatPick price if can't verify
-                        verified.append({
-                            'section': section,
-                            'row': row,
-                            'price': seatpick_price,
-                            'seller': seller,
-                            'verified': False,
-                            'final_price': seatpick_price,
-                            'price_diff': 0,
-                            'checkout_link': clean_url,  # Use the clean URL
-                            'accurate': True
-                        })
-                    
-                    await page.close()
-                    
-                except Exception as e:
-                    print(f"   ❌ ERROR verifying {section} via {seller}: {str(e)[:100]}")
-                    print(f"      Adding as unverified ticket with SeatPick price ${seatpick_price}")
-                    # Add unverified listing on error
-                    verified.append({
-                        'section': section,
-                        'row': row,
-                        'price': seatpick_price,
-                        'seller': seller,
-                        'verified': False,
-                        'final_price': seatpick_price,
-                        'price_diff': 0,
-                        'checkout_link': self.sanitize_checkout_url(deeplink),  # Sanitize on error
-                        'accurate': True
-                    })
-                    try:
-                        await page.close()
-                    except:
-                        pass
+                # Additional safety check: Never use extracted price if it's way too low
+                filter_price = final_price
+                if seatpick_price > 400 and final_price < 300:
+                    log.warning('verify.override', "   🛡️  SAFETY OVERRIDE: Using SeatPick ${listed} instead of extracted ${extracted} (suspicious price)",
+                                section=section, seller=seller, listed=seatpick_price, extracted=final_price)
+                    filter_price = seatpick_price
                 
-                await asyncio.sleep(1)  # Rate limiting
+                log.info('verify.verified', "   ✅ VERIFIED: {section} ${price} ({accuracy}) - diff: ${diff:+.2f}", sampled=True,
+                         section=section, seller=seller, price=filter_price, diff=price_diff,
+                         accuracy='accurate' if accurate else 'price different')
+                    
+                result = {
+                    'section': section,
+                    'row': row,
+                    'price': filter_price,  # Use safe price for filtering
+                    'seller': seller,
+                    'verified': True,
+                    'final_price': final_price,
+                    'seatpick_price': seatpick_price,
+                    'price_diff': price_diff,
+                    'checkout_link': clean_url,  # Use the clean URL we already sanitized
+                    'accurate': accurate,
+                    'quantity': listing.get('quantity', 1),
+                    'splits': listing.get('splits', [])
+                }
+            else:
+                log.info('verify.unverified', "   ❓ UNVERIFIED: {section} ${listed} via {seller} - using SeatPick price",
+                         sampled=True, section=section, seller=seller, listed=seatpick_price)
+                # Fallback to SeatPick price if can't verify
+                result = self.unverified_result(listing, clean_url)
             
-            await browser.close()
-        
-        return verified
+            if page:
+                await page.close()
+            return result
+            
+        except Exception as e:
+            log.error('verify.error', "   ❌ ERROR verifying {section} via {seller}: {error} - using SeatPick price ${listed}",
+                      section=section, seller=seller, error=str(e)[:100], listed=seatpick_price)
+            if self.traffic.record(host, error=e):
+                log.warning('traffic.breaker_open', "   ⛔ {host} keeps timing out - circuit open, deferring its listings", host=host)
+            try:
+                if page:
+                    await page.close()
+            except:
+                pass
+            # Add unverified listing on error
+            return self.unverified_result(listing, clean_url)
     
     async def scrape_seatgeek_tickets(self):
         """Scrape SeatGeek using Camoufox for Reserved Left/Center sections"""
         verified_tickets = []
         
         try:
-            event_url = "https://seatgeek.com/atmosphere-tickets/morrison-colorado-red-rocks-amphitheatre-2025-09-19-6-pm/concert/17445672?quantity=2"
+            event_url = f"https://seatgeek.com/atmosphere-tickets/morrison-colorado-red-rocks-amphitheatre-2025-09-19-6-pm/concert/17445672?quantity={self.party_size}"
+            
+            from camoufox.async_api import AsyncCamoufox
             
             # Use Camoufox which worked better than rebrowser-playwright
             async with AsyncCamoufox() as browser:
@@ -590,9 +688,8 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                     continue
                 
                 # Extract ticket details
-                quantity = listing.get('quantity', 1)
-                if quantity < 2:
-                    continue  # Need at least 2 tickets together
+                if not can_sell(listing, self.party_size):
+                    continue  # Need party_size tickets together
                 
                 price = listing.get('price')
                 if not price:
@@ -626,8 +723,10 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                     'final_price': price,
                     'seatpick_price': price,
                     'price_diff': 0,
-                    'checkout_link': f"https://seatgeek.com/checkout?listing_id={listing.get('id', '')}&quantity=2",
-                    'accurate': True
+                    'checkout_link': f"https://seatgeek.com/checkout?listing_id={listing.get('id', '')}&quantity={self.party_size}",
+                    'accurate': True,
+                    'quantity': listing.get('quantity', 1),
+                    'splits': listing.get('splits', [])
                 }
                 
                 verified_tickets.append(verified_ticket)
@@ -642,10 +741,17 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
     
     async def extract_final_price(self, page, seller):
         """Extract the FINAL price including all fees from checkout page"""
-        
         try:
             content = await page.content()
-            
+        except Exception as e:
+            log.warning('extract.error', "      Error extracting price: {error}", seller=seller, error=str(e)[:50])
+            return None
+        return self.extract_price_from_content(content, seller)
+    
+    def extract_price_from_content(self, content, seller):
+        """FINAL price including all fees from a checkout page's HTML, or None"""
+        
+        try:
             # VividSeats specific extraction
             if 'vivid' in seller.lower():
                 # Look for "Estimated fees included" price first
@@ -676,7 +782,7 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
             # TicketNetwork specific extraction  
             elif 'tn' in seller.lower() or 'ticketnetwork' in seller.lower():
                 # TicketNetwork often shows misleading prices - be very conservative
-                print(f"      Extracting from TicketNetwork page...")
+                log.debug('extract.start', "      Extracting from TicketNetwork page...", seller=seller)
                 
                 # Only look for very specific final total patterns
                 patterns = [
@@ -690,21 +796,19 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                     if matches:
                         for match in matches:
                             price = float(match)
-                            print(f"      TicketNetwork pattern {i+1} found: ${price}")
+                            log.debug('extract.match', "      TicketNetwork pattern {pattern} found: ${price}", seller=seller, pattern=i + 1, price=price)
                             # TicketNetwork final prices should be higher than SeatPick, not lower
                             if price >= 400:  # Conservative minimum for TicketNetwork
                                 return price
                 
                 # If no good patterns found, return None (use SeatPick price)
-                print(f"      No reliable TicketNetwork price found, using SeatPick price")
+                log.debug('extract.none', "      No reliable TicketNetwork price found, using SeatPick price", seller=seller)
                 return None
             
             # Viagogo specific extraction
             elif 'vgg' in seller.lower() or 'viagogo' in seller.lower() or 'te' in seller.lower():
-                print(f"      Extracting from Viagogo/Events365 page...")
-                # Debug: Show a sample of the page content to understand what we're parsing
-                if len(content) > 500:
-                    print(f"      DEBUG: Viagogo page sample: {content[200:500]}...")
+                # A sample of the page content, to see what we're parsing if extraction goes wrong
+                log.debug('extract.start', "      Extracting from Viagogo/Events365 page: {excerpt}...", seller=seller, excerpt=content[200:500])
                 
                 # Much more conservative Viagogo patterns - only look for clear checkout totals
                 patterns = [
@@ -735,17 +839,17 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                             
                             try:
                                 price = float(price_str)
-                                print(f"      Viagogo pattern {i+1} found: ${price}")
+                                log.debug('extract.match', "      Viagogo pattern {pattern} found: ${price}", seller=seller, pattern=i + 1, price=price)
                                 # Accept prices from $300-$1000 for Viagogo (they add ~35% fees)
                                 if 300 <= price <= 1000:
                                     return price
                                 else:
-                                    print(f"      Rejecting Viagogo price ${price} - outside expected range")
+                                    log.debug('extract.out_of_range', "      Rejecting Viagogo price ${price} - outside expected range", seller=seller, price=price)
                             except (ValueError, TypeError):
                                 continue
                 
                 # NO fallback patterns - if we can't find a clear total, don't guess
-                print(f"      No reliable Viagogo checkout total found - using SeatPick price")
+                log.debug('extract.none', "      No reliable Viagogo checkout total found - using SeatPick price", seller=seller)
                 return None
             
             # Generic extraction for other sellers
@@ -781,7 +885,7 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                         return max(reasonable_prices)
             
         except Exception as e:
-            print(f"      Error extracting price: {str(e)[:50]}")
+            log.warning('extract.error', "      Error extracting price: {error}", seller=seller, error=str(e)[:50])
         
         return None
     
@@ -823,23 +927,38 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
     
     def format_tickets_html_premium(self, tickets, title):
         """Create enhanced HTML table sorted by section with checkout links"""
+        return self.render_tickets(tickets, title)['html']
+    
+    def render_tickets(self, tickets, title, push_header=None):
+        """HTML table, plain text and push body for the same tickets, built in one pass.
+        The push body stops at PUSH_MAX_CHARS with a '+N more' line instead of being cut mid-ticket"""
         if not tickets:
-            return f"<h2>{title}</h2><p>No premium tickets found.</p>"
+            return {
+                'html': f"<h2>{title}</h2><p>No premium tickets found.</p>",
+                'text': f"{title}\nNo premium tickets found.",
+                'push': "\n".join(filter(None, [push_header, "No premium tickets found."]))
+            }
         
         sorted_tickets = self.sort_tickets_by_section(tickets)
+        size = self.party_size
+        text_lines = [title, f"All prices per ticket, buying {size} together."]
+        push_lines = [push_header] if push_header else []
+        push_length = len(push_header) + 1 if push_header else 0
+        pushed = 0
+        push_full = False
         
         html = f"""
         <h2>{title}</h2>
-        <p style="color: #2c3e50; font-weight: bold;">💺 All prices shown are per ticket. You will be purchasing 2 tickets together (side by side).</p>
+        <p style="color: #2c3e50; font-weight: bold;">💺 All prices shown are per ticket. You will be purchasing {size} tickets together (side by side).</p>
         <table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; width: 100%;">
             <tr style="background-color: #2c3e50; color: white;">
                 <th>Location</th>
                 <th>Section</th>
                 <th>Price/Ticket</th>
-                <th>Total (2 tix)</th>
+                <th>Total ({size} tix)</th>
                 <th>Seller</th>
                 <th>Verified</th>
-                <th>Buy 2 Tickets</th>
+                <th>Buy {size} Tickets</th>
             </tr>
         """
         
@@ -862,6 +981,7 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                     <td colspan="7" style="text-align: center;">{category} Sections</td>
                 </tr>
                 """
+                text_lines.append(f"\n{category} Sections")
                 current_category = category
             
             # Verification status and pricing
@@ -870,39 +990,57 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
                     verification_icon = "✅"
                     price_per_ticket = ticket['final_price']
                     price_display = f"${price_per_ticket:.0f}"
-                    total_display = f"${price_per_ticket * 2:.0f}"
+                    total_display = f"${price_per_ticket * size:.0f}"
                 else:
                     verification_icon = "⚠️"
                     seatpick_price = ticket.get('seatpick_price', ticket['price'])
                     price_per_ticket = ticket['final_price']
                     price_display = f"${price_per_ticket:.0f}"
-                    total_display = f"${price_per_ticket * 2:.0f}"
+                    total_display = f"${price_per_ticket * size:.0f}"
             else:
                 verification_icon = "❓"
                 price_per_ticket = ticket['price']
                 price_display = f"${price_per_ticket:.0f}"
-                total_display = f"${price_per_ticket * 2:.0f}"
+                total_display = f"${price_per_ticket * size:.0f}"
             
             # Debug logging for price issues
-            print(f"   DEBUG: {ticket['section']} - price={ticket.get('price')}, final_price={ticket.get('final_price')}, per_ticket={price_per_ticket}, total_for_2={price_per_ticket * 2}")
+            log.debug('render.price', "   {section} - price={price}, final_price={final_price}, per_ticket={per_ticket}, total_for_{size}={total}",
+                      section=ticket['section'], price=ticket.get('price'), final_price=ticket.get('final_price'),
+                      per_ticket=price_per_ticket, size=size, total=price_per_ticket * size)
             
-            # Buy button - updated text to be clear about buying 2 tickets
+            # Buy button - updated text to be clear about buying party_size tickets
             if ticket.get('checkout_link'):
-                buy_button = f'<a href="{ticket["checkout_link"]}" target="_blank" style="background-color: #27ae60; color: white; padding: 5px 10px; text-decoration: none; border-radius: 3px;">Buy 2 Tickets</a>'
+                buy_button = f'<a href="{ticket["checkout_link"]}" target="_blank" style="background-color: #27ae60; color: white; padding: 5px 10px; text-decoration: none; border-radius: 3px;">Buy {size} Tickets</a>'
             else:
                 buy_button = f'<a href="{self.url}" target="_blank" style="background-color: #3498db; color: white; padding: 5px 10px; text-decoration: none; border-radius: 3px;">View on SeatPick</a>'
             
+            # Same seats found through other sellers/sources (see listing_fingerprint)
+            others = also_listed_by(ticket)
+            seller_label = ticket['seller'] + (f" (also {', '.join(others)})" if others else '')
+            
             html += f"""
             <tr>
                 <td style="font-weight: bold; color: {category_colors.get(category, '#95a5a6')};">{category}</td>
                 <td>{ticket['section']}</td>
                 <td style="font-weight: bold;">{price_display}</td>
                 <td style="font-weight: bold; color: #e74c3c;">{total_display}</td>
-                <td>{ticket['seller']}</td>
+                <td>{seller_label}</td>
                 <td style="text-align: center;">{verification_icon}</td>
                 <td>{buy_button}</td>
             </tr>
             """
+            
+            link = ticket.get('checkout_link') or self.url
+            text_lines.append(f"{verification_icon} {ticket['section']}: {price_display}/ticket ({total_display} for {size}) via {seller_label} - {link}")
+            
+            push_line = f"{verification_icon} {ticket['section']} {price_display} via {ticket['seller']}"
+            # Leave room for the "+N more" line
+            if not push_full and push_length + len(push_line) + 1 <= PUSH_MAX_CHARS - 16:
+                push_lines.append(push_line)
+                push_length += len(push_line) + 1
+                pushed += 1
+            else:
+                push_full = True
         
         html += """
         </table>
@@ -912,7 +1050,10 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
         </p>
         """
         
-        return html
+        if pushed < len(sorted_tickets):
+            push_lines.append(f"+{len(sorted_tickets) - pushed} more")
+        
+        return {'html': html, 'text': "\n".join(text_lines), 'push': "\n".join(push_lines)}
     
     def generate_dynamic_subject(self, tickets, price_limit, alert_type=""):
         """Generate dynamic subject line with section breakdown"""
@@ -958,43 +1099,55 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
     
     async def check_for_alerts(self):
         """Enhanced alert checking with your specific requirements"""
-        tickets = await self.scrape_tickets_detailed()
-        if not tickets:
-            print("No premium tickets found")
-            return
-        
-        # Collect test tickets for manual testing (won't auto-send)
+        self.run_started = datetime.now()
         test_tickets = []
-        for t in tickets:
+        immediate_tickets = []
+        early_pushed = []
+        
+        async def evaluate(t):
+            """Sort each ticket into the alert ranges as soon as the pipeline verifies it"""
             # Must be verified to be included
             if not t.get('verified'):
-                continue
-                
+                return
+            
             # Use final verified price for filtering
             final_price = t.get('final_price', t['price'])
             
+            # Collect test tickets for manual testing (won't auto-send)
             if final_price < 400:
                 test_tickets.append(t)
-                print(f"   ✅ Found test-range ticket: {t['section']} final=${final_price} via {t['seller']}")
+                log.info('alert.test_range', "   ✅ Found test-range ticket: {section} final=${price} via {seller}",
+                         section=t['section'], price=final_price, seller=t['seller'])
             else:
-                print(f"   🚫 Verified but too expensive: {t['section']} final=${final_price} via {t['seller']}")
-        
-        # STRICT urgent alerts - ONLY verified prices under $300
-        immediate_tickets = []
-        for t in tickets:
-            # Must be verified
-            if not t.get('verified'):
-                continue
-                
-            # Use final verified price
-            final_price = t.get('final_price', t['price'])
+                log.debug('alert.too_expensive', "   🚫 Verified but too expensive: {section} final=${price} via {seller}",
+                          section=t['section'], price=final_price, seller=t['seller'])
             
+            # STRICT urgent alerts - ONLY verified prices under $300
             if final_price < 300:
                 immediate_tickets.append(t)
-                print(f"   🚨 Including verified urgent alert: {t['section']} final=${final_price} via {t['seller']}")
+                log.info('alert.urgent', "   🚨 Including verified urgent alert: {section} final=${price} via {seller}",
+                         section=t['section'], price=final_price, seller=t['seller'])
+                # Streaming mode: push now rather than after the slowest verification of the cycle
+                if self.early_push and await self.send_early_push(t):
+                    early_pushed.append(t)
             elif final_price < 400:
-                print(f"   📊 Verified but not urgent: {t['section']} final=${final_price} via {t['seller']}")
+                log.debug('alert.not_urgent', "   📊 Verified but not urgent: {section} final=${price} via {seller}",
+                          section=t['section'], price=final_price, seller=t['seller'])
         
+        budget = RunBudget()
+        # Early pushes go out during verification, bounded by the end of the run
+        self.notify_deadline = budget.deadline()
+        try:
+            tickets = await self.scrape_tickets_detailed(on_ticket=evaluate, budget=budget)
+            if not tickets:
+                print("No premium tickets found")
+                return
+            self.send_cycle_alerts(tickets, test_tickets, immediate_tickets, early_pushed, budget)
+        finally:
+            budget.report()
+    
+    def send_cycle_alerts(self, tickets, test_tickets, immediate_tickets, early_pushed, budget):
+        """Consolidated urgent alert and price-drop alert for what the cycle verified"""
         print(f"📊 Found {len(tickets)} premium tickets")
         print(f"📧 Test range (<$400): {len(test_tickets)} tickets")
         print(f"🚨 Alert range (<$300): {len(immediate_tickets)} tickets")
@@ -1003,25 +1156,139 @@ class PremiumSeatPickMonitor(SeatPickMonitor):
         # Test notifications will never be sent automatically
         print(f"ℹ️  Test notifications are disabled - found {len(test_tickets)} tickets in test range but not sending notifications")
         
-        # Send immediate alert if we have tickets under $300
-        if immediate_tickets:
-            subject = self.generate_dynamic_subject(immediate_tickets, 300, "urgent")
+        # Notification calls block, so rather than being cancelled each one gets a request
+        # timeout sized to what is left of the notify stage, and is skipped once that is spent
+        self.notify_deadline = budget.deadline('notify')
+        with budget.timed('notify'):
+            # Each ticket/price is alerted once across runs and nodes; early pushes already hold their claims
+            pushed_keys = {self.alert_key(t) for t in early_pushed}
+            not_pushed, alert_keys = self.claim_alerts([t for t in immediate_tickets if self.alert_key(t) not in pushed_keys])
+            immediate_tickets = early_pushed + not_pushed
             
-            body_html = f"""
-            <h1>🚨 URGENT TICKET ALERT!</h1>
-            <p><strong>Found {len(immediate_tickets)} premium tickets under $300</strong></p>
-            {self.format_tickets_html_premium(immediate_tickets, "Premium Tickets Under $300 - ACT FAST!")}
-            <p><a href="{self.url}">🎫 View all tickets on SeatPick</a></p>
-            <p><em>Immediate alert - checked at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</em></p>
-            """
+            # Send immediate alert if we have tickets under $300: one consolidated email for the
+            # cycle, pushing only what the early pushes didn't already cover
+            if immediate_tickets:
+                subject = self.generate_dynamic_subject(immediate_tickets, 300, "urgent")
+                
+                checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                rendered = self.render_tickets(
+                    immediate_tickets, "Premium Tickets Under $300 - ACT FAST!",
+                    push_header=f"URGENT: Found {len(immediate_tickets)} premium tickets under $300!"
+                )
+                
+                pushed_note = f"<p><em>{len(early_pushed)} of these were pushed as soon as they were verified.</em></p>" if early_pushed else ""
+                body_html = f"""
+                <h1>🚨 URGENT TICKET ALERT!</h1>
+                <p><strong>Found {len(immediate_tickets)} premium tickets under $300</strong></p>
+                {pushed_note}
+                {rendered['html']}
+                <p><a href="{self.url}">🎫 View all tickets on SeatPick</a></p>
+                <p><em>Immediate alert - checked at: {checked_at}</em></p>
+                """
+                
+                body_text = (f"URGENT: Found {len(immediate_tickets)} premium tickets under $300!\n\n{rendered['text']}\n\n"
+                             f"View all tickets: {self.url}\nChecked at: {checked_at}")
+                
+                push_text = None
+                if not_pushed:
+                    push_text = self.render_tickets(
+                        not_pushed, "Premium Tickets Under $300 - ACT FAST!",
+                        push_header=f"URGENT: Found {len(not_pushed)} premium tickets under $300!"
+                    )['push']
+                sent = self.send_notifications(subject, body_html, body_text, push_text, push=bool(not_pushed))
+                self.settle_alerts(alert_keys, sent)
+                print(f"🚨 URGENT alert sent for {len(immediate_tickets)} tickets under $300"
+                      + (f" ({len(early_pushed)} pushed early)" if early_pushed else ""))
             
-            body_text = f"URGENT: Found {len(immediate_tickets)} premium tickets under $300! Prices: " + ", ".join([f"{t['section']} ${t['price']}" for t in immediate_tickets[:5]])
+            if not immediate_tickets:
+                print("No urgent alerts sent (no tickets under $300)")
             
-            self.send_notifications(subject, body_html, body_text)
-            print(f"🚨 URGENT alert sent for {len(immediate_tickets)} tickets under $300")
+            self.send_price_drop_alert(tickets)
+    
+    def send_price_drop_alert(self, tickets):
+        """Alert on verified listings that dropped well below their 24h median or set a section low"""
+        drop_keys = self.price_drop_keys()
+        if not drop_keys:
+            return
+        
+        # Under $300 already went out as urgent; the rest need a verified price too
+        drop_tickets = [
+            t for t in tickets
+            if t.get('verified') and t.get('final_price', t['price']) >= 300 and listing_key(t) in drop_keys
+        ]
+        drop_tickets, alert_keys = self.claim_alerts(drop_tickets)
+        if not drop_tickets:
+            return
+        
+        events = [e for e in self.price_events if listing_key(e['listing']) in {listing_key(t) for t in drop_tickets}]
+        summary = [describe_event(e) for e in events]
+        subject = f"📉 PRICE DROP: {len(drop_tickets)} ATMOSPHERE RED ROCKS listings"
+        rendered = self.render_tickets(
+            drop_tickets, "Price Drops",
+            push_header="\n".join(summary[:3])
+        )
+        checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        items = "".join(f"<li>{line}</li>" for line in summary)
+        body_html = f"""
+        <h1>📉 Price Drop Alert</h1>
+        <ul>{items}</ul>
+        {rendered['html']}
+        <p><a href="{self.url}">🎫 View all tickets on SeatPick</a></p>
+        <p><em>Checked at: {checked_at}</em></p>
+        """
+        body_text = "\n".join(summary) + f"\n\n{rendered['text']}\n\nView all tickets: {self.url}\nChecked at: {checked_at}"
+        
+        sent = self.send_notifications(subject, body_html, body_text, rendered['push'])
+        self.settle_alerts(alert_keys, sent)
+        print(f"📉 Price drop alert sent for {len(drop_tickets)} tickets")
+    
+    async def send_early_push(self, ticket):
+        """SimplePush one urgent ticket the moment it is verified; True if the push went out
+        (its alert claim is then settled, so the end-of-cycle email won't push it again)"""
+        if not self.use_simplepush:
+            return False
+        claimed, alert_keys = self.claim_alerts([ticket])
+        if not claimed:
+            return False
         
-        if not immediate_tickets:
-            print("No urgent alerts sent (no tickets under $300)")
+        final_price = ticket.get('final_price', ticket['price'])
+        rendered = self.render_tickets(
+            [ticket], "Premium Ticket Under $300 - ACT FAST!",
+            push_header=f"URGENT: {ticket['section']} verified at ${final_price:.0f}/ticket - full update follows"
+        )
+        # Pushing is a blocking HTTP call; keep the pipeline's other stages running meanwhile
+        sent = await asyncio.to_thread(
+            self.send_simplepush_notification, self.generate_dynamic_subject([ticket], 300, "urgent"), rendered['push']
+        )
+        self.settle_alerts(alert_keys, sent)
+        if sent:
+            print(f"   📲 Early push sent: {ticket['section']} final=${final_price} via {ticket['seller']}")
+        return sent
+    
+    def alert_key(self, ticket):
+        return f"{self.event_id}:{listing_key(ticket)}:{ticket.get('final_price')}"
+    
+    def claim_alerts(self, tickets):
+        """Tickets this node should alert on (not already alerted at this price), and their claim keys"""
+        try:
+            claimed = [t for t in tickets if self.coordinator.claim_alert(self.alert_key(t))]
+        except Exception as e:
+            print(f"⚠️  Alert dedup unavailable ({e}), alerting on all tickets")
+            return tickets, []
+        if len(claimed) < len(tickets):
+            print(f"🔕 {len(tickets) - len(claimed)} tickets already alerted at this price")
+        return claimed, [self.alert_key(t) for t in claimed]
+    
+    def settle_alerts(self, alert_keys, sent):
+        """Mark claims sent, or hand them back for a retry if delivery failed"""
+        try:
+            if sent:
+                self.coordinator.mark_alerts_sent(alert_keys)
+            else:
+                self.coordinator.release_alerts(alert_keys)
+        except Exception as e:
+            print(f"⚠️  Could not settle alert claims: {e}")
     
     async def send_daily_summary(self):
         """Daily summary of all premium tickets under $400 with section sorting"""
@@ -1126,20 +1393,51 @@ async def main():
     """Main function to run the premium monitor
     
     Usage:
-        python3 premium_monitor.py          # Normal run (only sends urgent alerts <$300)
-        python3 premium_monitor.py daily    # Daily summary
+        python3 premium_monitor.py                  # Normal run if the adaptive schedule says it's due
+        python3 premium_monitor.py --force          # Normal run regardless of schedule
+        python3 premium_monitor.py watch [seconds]  # Keep polling on the adaptive schedule
+        python3 premium_monitor.py daily            # Daily summary
+        python3 premium_monitor.py --profile        # Any of the above under the sampling profiler
     """
+    if profiling_requested():
+        with RunProfiler():
+            await run(sys.argv[1:])
+    else:
+        await run(sys.argv[1:])
+
+async def run(argv):
     monitor = PremiumSeatPickMonitor()
+    args = [a for a in argv if a not in ('--force', '--profile')]
+    force = '--force' in argv
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "daily":
+    if args:
+        if args[0] == "daily":
             await monitor.send_daily_summary()
+        elif args[0] == "watch":
+            duration = float(args[1]) if len(args) > 1 else None
+            await watch(monitor, duration)
         else:
-            print(f"Unknown argument: {sys.argv[1]}")
-            print("Usage: python3 premium_monitor.py [daily]")
+            print(f"Unknown argument: {args[0]}")
+            print("Usage: python3 premium_monitor.py [daily | watch [seconds]] [--force] [--profile]")
             print("Note: Test notifications are permanently disabled")
-    else:
+    elif force or monitor.scheduler.is_due(monitor.event_id):
         await monitor.check_for_alerts()
+    else:
+        next_poll = monitor.scheduler.next_poll_at(monitor.event_id)
+        print(f"⏭️  Not due yet - next poll at {next_poll.strftime('%H:%M:%S') if next_poll else 'unknown'} (use --force to poll now)")
+
+async def watch(monitor, duration=None):
+    """Poll repeatedly on the adaptive schedule, for `duration` seconds or forever"""
+    started = datetime.now()
+    while duration is None or (datetime.now() - started).total_seconds() < duration:
+        if monitor.scheduler.is_due(monitor.event_id):
+            await monitor.check_for_alerts()
+        
+        next_poll = monitor.scheduler.next_poll_at(monitor.event_id) or datetime.now()
+        wait = max(5, (next_poll - datetime.now()).total_seconds())
+        if duration is not None:
+            wait = min(wait, max(0, duration - (datetime.now() - started).total_seconds()))
+        await asyncio.sleep(wait)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
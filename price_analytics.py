@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Streaming price statistics per (event, section, seller).
+
+Each poll feeds the cheapest listed price of every (section, seller) group.
+Per group we keep the last 24h of those observations with a rolling min
+(monotonic deque), rolling median (two heaps with lazy deletion) and an
+EWMA, plus the lowest price ever seen. Before an observation is added it is checked
+against the stats so far, and events come out for:
+
+- below_median: the price is PRICE_DROP_PCT (15%) or more under the 24h median
+- new_low: the cheapest price yet for the section across sellers, by 2%+
+
+The fixed $300/$400 thresholds miss a Center pair falling from $600 to
+$420; these events don't. Observations and lows live in SQLite so a fresh
+cron process picks up the window without rescanning older history.
+"""
+import heapq
+import os
+import time
+from collections import deque
+
+WINDOW_SECONDS = 24 * 3600
+EWMA_ALPHA = 0.2
+
+# Observations a group needs before its median is trusted
+MIN_OBSERVATIONS = 5
+
+# A new section low has to beat the old one by this much; $1 undercuts aren't news
+NEW_LOW_MARGIN = 0.02
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_observations (
+    event_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    seller TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_observations ON price_observations (event_id, observed_at);
+CREATE TABLE IF NOT EXISTS price_lows (
+    event_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    seller TEXT NOT NULL,
+    low REAL NOT NULL,
+    low_at REAL NOT NULL,
+    PRIMARY KEY (event_id, section, seller)
+);
+"""
+
+
+class SlidingMedian:
+    """Median of a window that adds and removes values in O(log n), without reordering a list.
+
+    `lower` is a max-heap (negated) of the smaller half and `upper` a
+    min-heap of the larger half. Removed values stay in the heaps, counted
+    in `pending`, until they reach a top and are popped; the heaps are
+    rebuilt if stale values ever outnumber live ones.
+    """
+
+    def __init__(self):
+        self.lower = []
+        self.upper = []
+        self.lower_size = 0
+        self.upper_size = 0
+        self.pending = {}
+
+    def __len__(self):
+        return self.lower_size + self.upper_size
+
+    def add(self, value):
+        if not self.lower or value <= -self.lower[0]:
+            heapq.heappush(self.lower, -value)
+            self.lower_size += 1
+        else:
+            heapq.heappush(self.upper, value)
+            self.upper_size += 1
+        self.rebalance()
+
+    def remove(self, value):
+        self.pending[value] = self.pending.get(value, 0) + 1
+        if self.lower and value <= -self.lower[0]:
+            self.lower_size -= 1
+            if value == -self.lower[0]:
+                self.prune(self.lower, -1)
+        else:
+            self.upper_size -= 1
+            if self.upper and value == self.upper[0]:
+                self.prune(self.upper, 1)
+        self.rebalance()
+        if len(self.lower) + len(self.upper) > 2 * len(self) + 64:
+            self.compact()
+
+    def compact(self):
+        """Drop every removed value still buried in the heaps"""
+        pending = self.pending
+        for name, sign in (('lower', -1), ('upper', 1)):
+            kept = []
+            for item in getattr(self, name):
+                if pending.get(sign * item):
+                    pending[sign * item] -= 1
+                else:
+                    kept.append(item)
+            heapq.heapify(kept)
+            setattr(self, name, kept)
+        self.pending = {}
+        # A stale copy may have been dropped from the other heap than its live twin
+        self.lower_size, self.upper_size = len(self.lower), len(self.upper)
+        self.rebalance()
+
+    def prune(self, heap, sign):
+        """Pop removed values off the top of a heap"""
+        while heap:
+            value = sign * heap[0]
+            if not self.pending.get(value):
+                break
+            self.pending[value] -= 1
+            if not self.pending[value]:
+                del self.pending[value]
+            heapq.heappop(heap)
+
+    def rebalance(self):
+        if self.lower_size > self.upper_size + 1:
+            heapq.heappush(self.upper, -heapq.heappop(self.lower))
+            self.lower_size -= 1
+            self.upper_size += 1
+            self.prune(self.lower, -1)
+        elif self.lower_size < self.upper_size:
+            heapq.heappush(self.lower, -heapq.heappop(self.upper))
+            self.upper_size -= 1
+            self.lower_size += 1
+            self.prune(self.upper, 1)
+
+    @property
+    def median(self):
+        if not len(self):
+            return None
+        if self.lower_size > self.upper_size:
+            return -self.lower[0]
+        return (-self.lower[0] + self.upper[0]) / 2
+
+
+class RollingStats:
+    """Time-windowed min and median plus EWMA for one price series"""
+
+    def __init__(self, window_seconds=WINDOW_SECONDS, alpha=EWMA_ALPHA):
+        self.window_seconds = window_seconds
+        self.alpha = alpha
+        self.observations = deque()   # (seq, observed_at, price) in arrival order
+        self.minima = deque()         # increasing prices, candidates for the window min
+        self.window = SlidingMedian()  # window prices, for the median
+        self.ewma = None
+        self.low = None
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.observations)
+
+    def expire(self, now):
+        cutoff = now - self.window_seconds
+        while self.observations and self.observations[0][1] <= cutoff:
+            seq, _, price = self.observations.popleft()
+            self.window.remove(price)
+            if self.minima and self.minima[0][0] == seq:
+                self.minima.popleft()
+
+    def add(self, observed_at, price):
+        self.expire(observed_at)
+        self.seq += 1
+        self.observations.append((self.seq, observed_at, price))
+        self.window.add(price)
+        while self.minima and self.minima[-1][1] >= price:
+            self.minima.pop()
+        self.minima.append((self.seq, price))
+        self.ewma = price if self.ewma is None else self.alpha * price + (1 - self.alpha) * self.ewma
+        self.low = price if self.low is None else min(self.low, price)
+
+    @property
+    def minimum(self):
+        return self.minima[0][1] if self.minima else None
+
+    @property
+    def median(self):
+        return self.window.median
+
+
+class PriceAnalytics:
+    """Feeds poll snapshots through RollingStats and returns price events"""
+
+    def __init__(self, conn, drop_threshold=None, window_seconds=WINDOW_SECONDS):
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self.drop_threshold = drop_threshold or float(os.environ.get('PRICE_DROP_PCT', 15)) / 100
+        self.window_seconds = window_seconds
+        self.stats = {}
+        self.loaded_events = set()
+
+    def load(self, event_id, now):
+        """Rebuild the window for an event from SQLite, once per process"""
+        if event_id in self.loaded_events:
+            return
+        self.loaded_events.add(event_id)
+        rows = self.conn.execute("""
+            SELECT section, seller, observed_at, price FROM price_observations
+            WHERE event_id = ? AND observed_at > ? ORDER BY observed_at
+        """, (event_id, now - self.window_seconds))
+        for section, seller, observed_at, price in rows:
+            self.series(event_id, section, seller).add(observed_at, price)
+        for section, seller, low in self.conn.execute(
+            "SELECT section, seller, low FROM price_lows WHERE event_id = ?", (event_id,)
+        ):
+            stats = self.series(event_id, section, seller)
+            stats.low = low if stats.low is None else min(stats.low, low)
+
+    def series(self, event_id, section, seller):
+        key = (event_id, section, seller)
+        if key not in self.stats:
+            self.stats[key] = RollingStats(self.window_seconds)
+        return self.stats[key]
+
+    def section_low(self, event_id, section):
+        lows = [s.low for (e, sec, _), s in self.stats.items() if e == event_id and sec == section and s.low is not None]
+        return min(lows) if lows else None
+
+    def observe(self, event_id, listings, now=None):
+        """Add one poll's listings; returns below_median / new_low events"""
+        event_id = str(event_id)
+        now = now or time.time()
+        self.load(event_id, now)
+
+        cheapest = {}
+        for listing in listings:
+            price = listing.get('price')
+            if not price:
+                continue
+            group = (listing.get('section', ''), listing.get('seller', ''))
+            if group not in cheapest or price < cheapest[group].get('price'):
+                cheapest[group] = listing
+
+        events = []
+        best_by_section = {}
+        for (section, seller), listing in cheapest.items():
+            price = listing['price']
+            stats = self.series(event_id, section, seller)
+            stats.expire(now)
+            median = stats.median
+            if len(stats) >= MIN_OBSERVATIONS and price <= median * (1 - self.drop_threshold):
+                events.append({
+                    'type': 'below_median',
+                    'event_id': event_id,
+                    'section': section,
+                    'seller': seller,
+                    'price': price,
+                    'reference': median,
+                    'drop_pct': round((median - price) / median * 100, 1),
+                    'listing': listing,
+                })
+            if section not in best_by_section or price < best_by_section[section]['price']:
+                best_by_section[section] = listing
+
+        for section, listing in best_by_section.items():
+            previous_low = self.section_low(event_id, section)
+            if previous_low is not None and listing['price'] < previous_low * (1 - NEW_LOW_MARGIN):
+                events.append({
+                    'type': 'new_low',
+                    'event_id': event_id,
+                    'section': section,
+                    'seller': listing.get('seller', ''),
+                    'price': listing['price'],
+                    'reference': previous_low,
+                    'drop_pct': round((previous_low - listing['price']) / previous_low * 100, 1),
+                    'listing': listing,
+                })
+
+        for (section, seller), listing in cheapest.items():
+            self.series(event_id, section, seller).add(now, listing['price'])
+        self.save(event_id, cheapest, now)
+        return events
+
+    def save(self, event_id, cheapest, now):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO price_observations (event_id, section, seller, observed_at, price) VALUES (?, ?, ?, ?, ?)",
+                [(event_id, section, seller, now, l['price']) for (section, seller), l in cheapest.items()]
+            )
+            self.conn.executemany("""
+                INSERT INTO price_lows (event_id, section, seller, low, low_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (event_id, section, seller) DO UPDATE SET
+                    low = excluded.low, low_at = excluded.low_at
+                WHERE excluded.low < price_lows.low
+            """, [(event_id, section, seller, l['price'], now) for (section, seller), l in cheapest.items()])
+            self.conn.execute(
+                "DELETE FROM price_observations WHERE event_id = ? AND observed_at <= ?",
+                (event_id, now - self.window_seconds)
+            )
+
+
+def describe_event(event):
+    if event['type'] == 'new_low':
+        return (f"📉 New {event['section']} low: ${event['price']:.0f} via {event['seller']} "
+                f"(was ${event['reference']:.0f}, -{event['drop_pct']:.0f}%)")
+    return (f"📉 {event['section']} via {event['seller']} at ${event['price']:.0f} is "
+            f"{event['drop_pct']:.0f}% below its 24h median ${event['reference']:.0f}")
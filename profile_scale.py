@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Memory and CPU profile of the monitor's per-poll work at increasing scale.
+
+For each payload size the synthetic generator builds a listings payload and
+a churned follow-up poll, then parsing, filtering, streamed parse+filter,
+diffing, storage and rendering are each timed (wall clock, no tracing) and run again under
+tracemalloc for peak memory. Use --cprofile to dump the hottest functions
+of one stage.
+
+Usage:
+    python3 profile_scale.py                        # 1k, 10k, 100k
+    python3 profile_scale.py --sizes 1k,10k --cprofile render
+"""
+import argparse
+import cProfile
+import gc
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark import RESULTS_DIR, git_commit, quiet
+from generate_listings import ListingGenerator, parse_size
+from listing_diff import diff_listings
+from listing_store import ListingStore
+from listing_stream import ListingStreamParser
+from premium_monitor import PremiumSeatPickMonitor
+
+
+def as_verified(filtered):
+    """Shape filtered listings like verify_final_prices output for rendering"""
+    return [{
+        'section': l['section'],
+        'row': l['row'],
+        'price': l['price'],
+        'seller': l['seller'],
+        'verified': True,
+        'final_price': round(l['price'] * 1.35, 2),
+        'seatpick_price': l['price'],
+        'price_diff': round(l['price'] * 0.35, 2),
+        'checkout_link': l.get('deepLink', ''),
+        'accurate': False
+    } for l in filtered]
+
+
+def measure(func):
+    """Wall time of one call, then peak traced memory of a second call"""
+    gc.collect()
+    with quiet():
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    with quiet():
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(seconds, 6), 'peak_mb': round(peak / 1024 / 1024, 3)}
+
+
+def profile_size(size, seed, cprofile_stage=None, top=15):
+    generator = ListingGenerator(seed=seed)
+    monitor = PremiumSeatPickMonitor()
+
+    payload = generator.payload(size)
+    previous = payload['listings']
+    current = generator.churn(previous, 0.05)
+    body = json.dumps({'listings': current})
+
+    with quiet():
+        filtered = monitor.filter_listings(current)
+    verified = as_verified(filtered)
+
+    db_dir = tempfile.mkdtemp(prefix='scale_profile_')
+
+    raw = body.encode('utf-8')
+
+    def stream_filter():
+        # Chunked like an HTTP body, filtered as listings complete
+        parser = ListingStreamParser()
+        kept = []
+        for start in range(0, len(raw), 64 * 1024):
+            for listing in parser.feed(raw[start:start + 64 * 1024]):
+                accepted = monitor.filter_listing(listing)
+                if accepted:
+                    kept.append(accepted)
+        parser.close()
+        return kept
+
+    def storage():
+        store = ListingStore(os.path.join(db_dir, f'store_{time.perf_counter_ns()}.db'))
+        store.save_snapshot(monitor.event_id, previous)
+        store.save_snapshot(monitor.event_id, current)
+        store.load_snapshot(monitor.event_id)
+        store.close()
+
+    stages = {
+        'parse': lambda: json.loads(body),
+        'filter': lambda: monitor.filter_listings(current),
+        'stream_filter': stream_filter,
+        'diff': lambda: diff_listings(previous, current),
+        'storage': storage,
+        'render': lambda: (
+            monitor.format_tickets_html_premium(verified, "Scale test"),
+            monitor.generate_dynamic_subject(verified, 400, "test")
+        ),
+    }
+
+    results = {'size': size, 'filtered': len(filtered), 'payload_mb': round(len(body) / 1024 / 1024, 3), 'stages': {}}
+    for name, func in stages.items():
+        print(f"   ⏱️  {name}...")
+        results['stages'][name] = measure(func)
+
+        if cprofile_stage == name:
+            profiler = cProfile.Profile()
+            with quiet():
+                profiler.runcall(func)
+            print(f"\n🔥 Hottest functions in {name} at {size:,} listings:")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+    return results
+
+
+def print_table(all_results):
+    stages = list(all_results[0]['stages'])
+    print("\n📊 Scale profile (seconds / peak MB)")
+    print("=" * (14 + 20 * len(stages)))
+    print(f"{'listings':>12}  " + "".join(f"{s:>20}" for s in stages))
+    for r in all_results:
+        cells = "".join(
+            f"{r['stages'][s]['seconds']:>10.3f}s {r['stages'][s]['peak_mb']:>7.1f}MB" for s in stages
+        )
+        print(f"{r['size']:>12,}  {cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and CPU scale profile of the monitor")
+    parser.add_argument('--sizes', default='1k,10k,100k', help="comma separated payload sizes")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cprofile', choices=['parse', 'filter', 'stream_filter', 'diff', 'storage', 'render'],
+                        help="print cProfile hot functions for one stage")
+    parser.add_argument('--output', help="results JSON path (default: benchmark_results/)")
+    args = parser.parse_args()
+
+    all_results = []
+    for size in [parse_size(s) for s in args.sizes.split(',')]:
+        print(f"🧪 Profiling {size:,} listings...")
+        all_results.append(profile_size(size, args.seed, args.cprofile))
+
+    print_table(all_results)
+
+    commit = git_commit()
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"scale_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'results': all_results
+        }, f, indent=2)
+    print(f"\n📁 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
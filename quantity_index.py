@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Which listings can sell exactly N tickets together.
+
+SeatPick listings carry `quantity` (tickets in the listing) and `splits`
+(sizes the seller will sell them in; empty means any size up to
+quantity). purchasable_sizes turns that into the set of party sizes one
+purchase can cover, and every filter asks it rather than re-deriving the
+"2 together" rule.
+
+Stored listings are indexed by those sizes in the listing_sizes table
+(maintained by ListingStore.save_snapshot), so "what can seat 4, across
+every event" is an indexed lookup instead of a rescan of the snapshots.
+
+Usage:
+    python3 quantity_index.py 4              # active listings that sell exactly 4, all events
+    python3 quantity_index.py 2 --event 366607
+"""
+import argparse
+import os
+from functools import lru_cache
+
+# Party size the monitors alert for (tickets bought together)
+PARTY_SIZE = int(os.environ.get('PARTY_SIZE', 2))
+
+# Listings without splits can sell any size up to their quantity; index no further than this
+MAX_PARTY_SIZE = 12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listing_sizes (
+    event_id TEXT NOT NULL,
+    listing_key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (event_id, listing_key, size)
+);
+CREATE INDEX IF NOT EXISTS idx_listing_sizes_size ON listing_sizes (size, event_id);
+"""
+
+
+@lru_cache(maxsize=1024)
+def sizes_for(quantity, splits):
+    if splits:
+        return frozenset(n for n in splits if 1 <= n <= quantity)
+    return frozenset(range(1, min(quantity, MAX_PARTY_SIZE) + 1))
+
+
+def purchasable_sizes(quantity, splits=None):
+    """Party sizes that one purchase from this listing can cover"""
+    try:
+        quantity = int(quantity)
+    except (TypeError, ValueError):
+        quantity = 1
+    try:
+        splits = tuple(sorted(int(n) for n in splits or ()))
+    except (TypeError, ValueError):
+        splits = ()
+    return sizes_for(quantity, splits)
+
+
+def can_sell(listing, size=PARTY_SIZE):
+    """True if `size` tickets from this listing can be bought together"""
+    return size in purchasable_sizes(listing.get('quantity', 1), listing.get('splits'))
+
+
+def main():
+    from listing_store import ListingStore
+
+    parser = argparse.ArgumentParser(description="Active listings that can sell N tickets together")
+    parser.add_argument('size', type=int)
+    parser.add_argument('--event', action='append', help="limit to these event ids (repeatable)")
+    args = parser.parse_args()
+
+    listings = ListingStore().listings_for_size(args.size, args.event)
+    print(f"🎟️  {len(listings)} active listings can sell exactly {args.size} together")
+    for listing in sorted(listings, key=lambda l: (l['event_id'], l['price'] or 0)):
+        print(f"  {listing['event_id']:>8}  {listing['section']:15} row {listing['row']:5} "
+              f"${listing['price'] or 0:.0f}  qty {listing['quantity']} via {listing['seller']}")
+
+
+if __name__ == "__main__":
+    main()
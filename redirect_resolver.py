@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Vendor URLs behind affiliate links that url_canonical can't unwrap.
+
+url_canonical unwraps the tracker link shapes it has rules for by string
+parsing. Short or unfamiliar links (vivid-seats.pxf.io/s/XyZ, a new prf.hn
+format) only give up the vendor URL when followed, and the browser used to
+walk that redirect chain on every verification. RedirectResolver follows
+it once with HEAD/GET requests that don't auto-follow, stops at the first
+hop that is a vendor URL or a link url_canonical can unwrap, and caches the
+canonical vendor URL per deep link in SQLite for RESOLVED_TTL. Navigation
+then goes straight to the checkout page.
+
+Links that fail to resolve are remembered for the run only, so the browser
+falls back to following them itself and the next run tries again.
+"""
+import re
+import time
+from urllib.parse import urljoin, urlparse
+
+from monitor_log import get_logger
+from url_canonical import canonicalize_url
+
+log = get_logger('redirects')
+
+# Affiliate networks' click domains (Impact, Partnerize, CJ, Rakuten, Awin)
+TRACKER_DOMAINS = (
+    'pxf.io', 'sjv.io', '7eer.net', 'evyy.net', 'prf.hn', 'lusg.net',
+    'anrdoezrs.net', 'dpbolvw.net', 'jdoqocy.com', 'kqzyfj.com', 'tkqlhce.com',
+    'linksynergy.com', 'awin1.com',
+)
+
+MAX_HOPS = 8
+HOP_TIMEOUT = 10
+
+# Vendor URLs behind a deep link rarely change; re-resolve weekly in case they do
+RESOLVED_TTL = 7 * 24 * 3600
+
+REDIRECT_STATUSES = frozenset([301, 302, 303, 307, 308])
+
+# Trackers that answer 200 and redirect in the page instead
+META_REFRESH = re.compile(
+    r'<meta[^>]+http-equiv=["\']?refresh["\']?[^>]*content=["\']?\s*\d+\s*;\s*url=([^"\'>\s]+)', re.IGNORECASE
+)
+SCRIPT_REDIRECT = re.compile(r'(?:window|document)\.location(?:\.href)?\s*=\s*["\']([^"\']+)["\']')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resolved_redirects (
+    deeplink TEXT PRIMARY KEY,
+    final_url TEXT NOT NULL,
+    hops INTEGER NOT NULL,
+    resolved_at REAL NOT NULL
+);
+"""
+
+
+def is_tracker(url):
+    host = urlparse(url or '').netloc.lower()
+    return any(host == domain or host.endswith('.' + domain) for domain in TRACKER_DOMAINS)
+
+
+def needs_resolution(url):
+    """True if a deep link still points at a tracker after url_canonical's rules"""
+    return bool(url) and is_tracker(canonicalize_url(url))
+
+
+def page_redirect(content):
+    """Target of a meta-refresh or script redirect in a tracker's interstitial page"""
+    match = META_REFRESH.search(content) or SCRIPT_REDIRECT.search(content)
+    return match.group(1).strip() if match else None
+
+
+class RedirectResolver:
+    """Follows tracker chains over HTTP once and caches the vendor URL per deep link"""
+
+    def __init__(self, conn, ttl=RESOLVED_TTL):
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self.ttl = ttl
+        self.resolved = {}
+        self.failed = set()
+
+    def cached(self, url):
+        """Resolved vendor URL for a deep link, or None if unknown or expired"""
+        if url in self.resolved:
+            return self.resolved[url]
+        row = self.conn.execute(
+            "SELECT final_url FROM resolved_redirects WHERE deeplink = ? AND resolved_at > ?",
+            (url, time.time() - self.ttl)
+        ).fetchone()
+        if row:
+            self.resolved[url] = row[0]
+            return row[0]
+        return None
+
+    async def resolve(self, session, url, fetch_url=None, source_url=None):
+        """Canonical vendor URL behind `url`, or `url` itself if it can't be resolved.
+
+        fetch_url maps a URL to the one actually requested and source_url maps
+        redirect targets back (see PremiumSeatPickMonitor.navigation_url).
+        """
+        known = self.cached(url)
+        if known:
+            return known
+        if url in self.failed:
+            return url
+
+        try:
+            final_url, hops = await self.follow(session, url, fetch_url or (lambda u: u), source_url or (lambda u: u))
+        except Exception as e:
+            log.warning('redirect.failed', "   🔗 Couldn't resolve {tracker} link: {error}",
+                        tracker=urlparse(url).netloc, error=str(e)[:80], url=url)
+            final_url = None
+        if final_url is None:
+            self.failed.add(url)
+            return url
+
+        self.resolved[url] = final_url
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO resolved_redirects (deeplink, final_url, hops, resolved_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (deeplink) DO UPDATE SET
+                    final_url = excluded.final_url, hops = excluded.hops, resolved_at = excluded.resolved_at
+            """, (url, final_url, hops, time.time()))
+        log.info('redirect.resolved', "   🔗 Resolved {tracker} link in {hops} hop(s) -> {vendor}", sampled=True,
+                 tracker=urlparse(url).netloc, hops=hops, vendor=urlparse(final_url).netloc, url=url, final_url=final_url)
+        return final_url
+
+    async def follow(self, session, url, fetch_url, source_url):
+        """(canonical vendor URL, requests made), or (None, requests) if the chain doesn't end at one"""
+        import aiohttp
+
+        timeout = aiohttp.ClientTimeout(total=HOP_TIMEOUT)
+        current = url
+        for hop in range(1, MAX_HOPS + 1):
+            requested = fetch_url(current)
+            async with session.head(requested, allow_redirects=False, timeout=timeout) as response:
+                location = response.headers.get('Location') if response.status in REDIRECT_STATUSES else None
+            if location is None:
+                # HEAD not supported, or the tracker redirects from an interstitial page
+                async with session.get(requested, allow_redirects=False, timeout=timeout) as response:
+                    if response.status in REDIRECT_STATUSES:
+                        location = response.headers.get('Location')
+                    elif response.status == 200:
+                        location = page_redirect(await response.text())
+            if not location:
+                return None, hop
+
+            current = source_url(urljoin(requested, location))
+            target = canonicalize_url(current)
+            if not is_tracker(target):
+                return target, hop
+        return None, MAX_HOPS
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+A deadline for the whole monitoring run, handed down to its stages.
+
+Cron starts a run every 5 minutes; one Viagogo page sitting on its 20s
+navigation timeout per listing, or a stuck challenge page, used to push a
+run past that and into the next one. RunBudget gives each run
+RUN_BUDGET_SECONDS and each stage a point in it by which it has to be
+done (STAGE_ENDS, as fractions of the budget, since fetch and
+verification overlap):
+
+    fetch ........ 25%   stream the SeatPick payload
+    verify ....... 85%   checkout checks, early pushes
+    notify ...... 100%   consolidated alerts
+
+Time a stage doesn't use rolls over to the ones after it. `stage()`
+cancels the work inside it at its deadline and swallows the timeout, so
+the caller carries on with whatever finished: verified tickets are still
+alerted on and stored, and the listings that didn't get checked are
+deferred to the next run. `report()` prints where the time went.
+"""
+import asyncio
+import contextlib
+import os
+import time
+
+RUN_BUDGET_SECONDS = float(os.environ.get('RUN_BUDGET_SECONDS', 240))
+
+# Fraction of the run budget by which each stage has to finish
+STAGE_ENDS = {
+    'fetch': 0.25,
+    'verify': 0.85,
+    'notify': 1.0,
+}
+
+
+class RunBudget:
+    """Deadlines for one run and its stages, measured from construction"""
+
+    def __init__(self, total=None, stage_ends=None, clock=time.monotonic):
+        self.total = total or RUN_BUDGET_SECONDS
+        self.stage_ends = stage_ends or STAGE_ENDS
+        self.clock = clock
+        self.started = clock()
+        self.elapsed = {}
+        self.expired = set()
+
+    def deadline(self, stage=None):
+        end = self.stage_ends.get(stage, 1.0) if stage else 1.0
+        return self.started + self.total * end
+
+    def remaining(self, stage=None):
+        """Seconds left for a stage (or the whole run), never negative"""
+        return max(0.0, self.deadline(stage) - self.clock())
+
+    def allotted(self, stage):
+        """Seconds of the budget a stage may run until, counted from the run start"""
+        return self.deadline(stage) - self.started
+
+    @contextlib.asynccontextmanager
+    async def stage(self, name):
+        """Run the block until the stage deadline; on expiry it is cancelled and the run goes on"""
+        began = self.clock()
+        try:
+            async with asyncio.timeout(self.remaining(name)):
+                yield
+        except TimeoutError:
+            self.expired.add(name)
+            print(f"⏱️  {name} stage hit its deadline ({self.allotted(name):.0f}s into the run) - continuing with partial results")
+        finally:
+            self.elapsed[name] = self.elapsed.get(name, 0.0) + self.clock() - began
+
+    @contextlib.contextmanager
+    def timed(self, name):
+        """Record a stage's time for blocking work that bounds itself (request timeouts)"""
+        began = self.clock()
+        try:
+            yield
+        finally:
+            self.elapsed[name] = self.elapsed.get(name, 0.0) + self.clock() - began
+
+    def summary(self):
+        return {
+            'total_seconds': round(self.clock() - self.started, 3),
+            'budget_seconds': self.total,
+            'stages': {
+                name: {
+                    'elapsed': round(self.elapsed[name], 3),
+                    'allotted': round(self.allotted(name), 3),
+                    'expired': name in self.expired,
+                }
+                for name in self.stage_ends if name in self.elapsed
+            },
+        }
+
+    def report(self):
+        summary = self.summary()
+        parts = [
+            f"{name} {stage['elapsed']:.1f}s" + (" (cut off)" if stage['expired'] else "")
+            for name, stage in summary['stages'].items()
+        ]
+        print(f"⏱️  Run took {summary['total_seconds']:.1f}s of {self.total:.0f}s budget: {', '.join(parts)}")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler for whole monitor runs, with asyncio task attribution.
+
+`python3 premium_monitor.py --profile` (or PROFILE_RUN=1) samples the
+stacks of every thread every PROFILE_INTERVAL_MS of wall time, so the run
+itself isn't traced and the overhead stays at a few percent.
+
+Samples are taken from a SIGALRM timer in the main thread. A sampler
+thread would only get the GIL when the event loop releases it in
+select(), and would see an idle loop whatever the CPU was doing. A signal
+that arrives during a long C call (a regex, a parse) runs when the call
+returns, so each sample is weighted by the time since the previous one.
+Where there is no setitimer, or the run isn't on the main thread, a
+sampler thread is used instead, with that bias.
+
+Each event-loop sample is rooted at the task that was running
+(`task:CheckPipeline.verify_worker`), at `loop:callback` for transport
+callbacks outside any task, or at `loop:idle` when the loop was waiting on
+I/O; other threads (to_thread notification sends, the pool's
+result poller) are rooted at their thread name.
+
+At the end of the run it writes to PROFILE_DIR (default profiles/):
+
+    run_<timestamp>.folded   folded stacks (flamegraph.pl / speedscope input)
+    run_<timestamp>.svg      flame graph
+    run_<timestamp>.txt      top functions by self and total time, and top lines
+
+and prints the top functions. The hot-lines table charges each sample to
+the innermost line of the monitor's own code, so a re.findall or a
+BeautifulSoup parse shows up as the line in extract_price_from_content
+(or wherever) that called it.
+"""
+import asyncio
+import html
+import os
+import signal
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+PROFILE_DIR = os.environ.get(
+    'PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+)
+TOP_N = 15
+
+# Hot lines are charged to the innermost frame from this directory
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loop frames below the running task's coroutine; cut so stacks start at the task
+LOOP_INTERNALS = ('asyncio/events.py', 'asyncio/base_events.py', 'asyncio/runners.py')
+
+
+def profiling_requested(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    return '--profile' in argv or os.environ.get('PROFILE_RUN', '0') not in ('', '0')
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def task_label(task):
+    name = task.get_name()
+    if not name.startswith('Task-'):
+        return name
+    coro = task.get_coro()
+    return getattr(coro, '__qualname__', None) or name
+
+
+class RunProfiler:
+    """Samples all threads on a wall-clock timer; use as a context manager around a run"""
+
+    def __init__(self, interval_ms=None, output_dir=None, top=TOP_N):
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000
+        self.output_dir = output_dir or PROFILE_DIR
+        self.top = top
+        self.stacks = Counter()
+        self.lines = Counter()
+        self.labels = {}
+        self.samples = 0
+        self.loop = None
+        self.loop_thread = None
+        self.stopping = threading.Event()
+        self.thread = None
+        self.previous_handler = None
+        self.last_sample = None
+        self.started = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        self.write()
+        return False
+
+    def start(self):
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+        self.loop_thread = threading.get_ident()
+        self.started = self.last_sample = time.perf_counter()
+        if hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread():
+            self.previous_handler = signal.signal(signal.SIGALRM, self.on_timer)
+            signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+        else:
+            self.thread = threading.Thread(target=self.run, name='run-profiler', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread:
+            self.stopping.set()
+            self.thread.join()
+        else:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.previous_handler or signal.SIG_DFL)
+        self.elapsed = time.perf_counter() - self.started
+
+    def on_timer(self, signum, frame):
+        self.sample_threads({threading.get_ident(): frame})
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stopping.wait(self.interval):
+            self.sample_threads({own: None})
+
+    def sample_threads(self, current):
+        """One tick: the interrupted frame (signal mode) plus every other thread's stack"""
+        now = time.perf_counter()
+        weight = max(1, round((now - self.last_sample) / self.interval))
+        self.last_sample = now
+
+        frames = sys._current_frames()
+        frames.update(current)
+        names = None
+        for ident, frame in frames.items():
+            if frame is None:
+                continue
+            if ident == self.loop_thread:
+                name = 'main'
+            else:
+                if names is None:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                name = names.get(ident, str(ident))
+            self.sample(ident, frame, name, weight)
+        self.samples += 1
+
+    def sample(self, ident, frame, thread_name, weight=1):
+        leaf = None
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            if leaf is None and frame.f_code.co_filename.startswith(PROJECT_DIR):
+                leaf = frame
+            frame = frame.f_back
+        stack.reverse()
+
+        if ident == self.loop_thread and self.loop is not None:
+            task = asyncio.current_task(self.loop)
+            if task is None:
+                root = 'loop:idle' if stack[-1].co_filename.endswith('selectors.py') else 'loop:callback'
+            else:
+                root = f"task:{task_label(task)}"
+                # Drop runner and event-loop frames above the task's own coroutine
+                cut = 0
+                for i, code in enumerate(stack):
+                    if code.co_filename.endswith(LOOP_INTERNALS):
+                        cut = i + 1
+                stack = stack[cut:]
+        else:
+            root = f"thread:{thread_name}"
+
+        labels = []
+        for code in stack:
+            label = self.labels.get(code)
+            if label is None:
+                label = self.labels[code] = frame_label(code)
+            labels.append(label)
+        self.stacks[';'.join([root] + labels)] += weight
+        if leaf is not None:
+            self.lines[f"{os.path.basename(leaf.f_code.co_filename)}:{leaf.f_lineno} {leaf.f_code.co_name}"] += weight
+
+    def function_times(self):
+        """(self samples, total samples) per function"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        return own, total
+
+    def table(self):
+        own, total = self.function_times()
+        all_samples = sum(self.stacks.values()) or 1
+        rows = [f"{'self %':>7} {'total %':>8}  function"]
+        for label, count in own.most_common(self.top):
+            rows.append(f"{count / all_samples:7.1%} {total[label] / all_samples:8.1%}  {label}")
+        rows.append("")
+        rows.append(f"{'total %':>8}  function (inclusive)")
+        for label, count in total.most_common(self.top):
+            rows.append(f"{count / all_samples:8.1%}  {label}")
+        rows.append("")
+        rows.append(f"{'self %':>7}  line (innermost monitor code)")
+        for label, count in self.lines.most_common(self.top):
+            rows.append(f"{count / all_samples:7.1%}  {label}")
+        return '\n'.join(rows)
+
+    def write(self):
+        """Write folded stacks, flame graph and table; print the top functions"""
+        if not self.stacks:
+            print("🔬 Profiler collected no samples")
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        with open(f"{base}.folded", 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(f"{base}.svg", 'w', encoding='utf-8') as f:
+            f.write(flame_graph_svg(self.stacks, f"Monitor run, {self.elapsed:.1f}s, {self.samples} samples"))
+        table = self.table()
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(table + '\n')
+
+        print(f"🔬 Profile: {self.samples} samples over {self.elapsed:.1f}s every {self.interval * 1000:.0f}ms -> {base}.svg")
+        print('\n'.join(table.split('\n')[:self.top + 1]))
+        return base
+
+
+def flame_graph_svg(stacks, title, width=1200, frame_height=16):
+    """Flame graph of folded stacks as a standalone SVG (roots at the bottom)"""
+    tree = {}
+    for stack, count in stacks.items():
+        node = tree
+        for label in stack.split(';'):
+            entry = node.setdefault(label, [0, {}])
+            entry[0] += count
+            node = entry[1]
+
+    total = sum(entry[0] for entry in tree.values()) or 1
+    rects = []
+
+    def depth_of(node):
+        return 1 + max((depth_of(child) for _, child in node.values()), default=0) if node else 0
+
+    depth = depth_of(tree)
+    height = (depth + 2) * frame_height + 30
+    scale = (width - 20) / total
+
+    def place(node, x, level):
+        for label, (count, children) in sorted(node.items()):
+            w = count * scale
+            if w >= 0.5:
+                rects.append((label, count, x, level, w))
+                place(children, x, level + 1)
+            x += w
+
+    place(tree, 10.0, 0)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="Verdana" font-size="11">',
+        '<rect width="100%" height="100%" fill="#f8f8f8"/>',
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="14">{html.escape(title)}</text>',
+    ]
+    for label, count, x, level, w in rects:
+        y = height - (level + 1) * frame_height - 10
+        hue = zlib.crc32(label.split(' (')[0].encode()) % 60
+        fill = '#9ab' if label.startswith(('loop:', 'thread:')) else f'hsl({hue},80%,{60 + hue % 15}%)'
+        text = label if len(label) * 6.5 < w - 6 else label[:max(0, int((w - 6) / 6.5) - 2)] + '..'
+        parts.append(
+            f'<g><title>{html.escape(label)} ({count} samples, {count / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{frame_height - 1}" fill="{fill}" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">{html.escape(text)}</text>' if w > 20 else '')
+            + '</g>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts)
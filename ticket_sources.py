@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Ticket sources fetched concurrently and merged into one stream.
+
+SeatGeek used to be commented out of scrape_tickets_detailed because its
+Camoufox scrape (page load, DataDome challenge, API capture) added 20+
+seconds to every cycle on top of SeatPick. Each source is now a
+TicketSource that hands its normalized ticket dicts to `emit` as it
+produces them, and TicketAggregator runs all enabled sources at once:
+
+- each source runs under its own timeout (SEATGEEK_TIMEOUT, ...), capped
+  by what is left of the run budget's verify stage, so a cycle takes as
+  long as its slowest source rather than the sum of them. SeatPick has
+  no timeout of its own: its pipeline stops verifying at the verify
+  deadline and defers what is left, so it is only guarded by the end of
+  the whole run, which leaves the pipeline time to defer;
+- a source that times out or raises only loses its own tickets; what it
+  emitted before that is kept;
+- every ticket goes through the same `on_ticket` callback, tagged with
+  the source it came from, so alerts don't care where it was found;
+- sources share one listing_fingerprint.ListingIndex, so seats reported
+  by several sources are verified and alerted once, with every source's
+  copy in the alerted ticket's provenance (FINGERPRINT_TOLERANCE=0 turns
+  this off).
+
+TICKET_SOURCES (comma-separated, default 'seatpick,seatgeek') picks the
+sources. SeatGeek is skipped when camoufox isn't installed. A new
+aggregator is a TicketSource subclass added to SOURCES.
+"""
+import abc
+import asyncio
+import importlib.util
+import inspect
+import os
+import time
+
+from listing_fingerprint import FINGERPRINT_TOLERANCE, ListingIndex
+from pipeline import CheckPipeline
+
+TICKET_SOURCES = os.environ.get('TICKET_SOURCES', 'seatpick,seatgeek')
+
+# Page load plus the DataDome challenge and API capture waits
+SEATGEEK_TIMEOUT = float(os.environ.get('SEATGEEK_TIMEOUT', 90))
+
+
+class TicketSource(abc.ABC):
+    """Somewhere tickets come from; `fetch` hands each normalized ticket to `emit`"""
+
+    name = None
+    # Seconds the source may take; None leaves it to the run budget's own stages
+    timeout = None
+
+    def available(self):
+        """False if the source can't run here (missing optional dependency)"""
+        return True
+
+    @abc.abstractmethod
+    async def fetch(self, monitor, emit, budget, index):
+        """Emit the source's tickets; `index` (or None) holds what other sources reported so far"""
+
+
+class SeatPickSource(TicketSource):
+    """SeatPick listings, checkout-verified by the overlapped pipeline"""
+
+    name = 'seatpick'
+
+    async def fetch(self, monitor, emit, budget, index):
+        # The pipeline bounds its fetch and verify stages with the run budget itself
+        await CheckPipeline(monitor, emit, budget=budget, index=index).run()
+
+
+class SeatGeekSource(TicketSource):
+    """Reserved Left/Center listings from SeatGeek's own listings API (prices are all-in)"""
+
+    name = 'seatgeek'
+    timeout = SEATGEEK_TIMEOUT
+
+    def available(self):
+        return importlib.util.find_spec('camoufox') is not None
+
+    async def fetch(self, monitor, emit, budget, index):
+        for ticket in await monitor.scrape_seatgeek_tickets():
+            await emit(ticket)
+
+
+SOURCES = {source.name: source for source in (SeatPickSource, SeatGeekSource)}
+
+
+def build_sources(names=None):
+    """Enabled, available sources for a comma-separated list of names"""
+    names = TICKET_SOURCES if names is None else names
+    if isinstance(names, str):
+        names = names.split(',')
+    sources = []
+    for name in (n.strip().lower() for n in names):
+        if not name:
+            continue
+        if name not in SOURCES:
+            print(f"⚠️  Unknown ticket source '{name}' - skipping")
+            continue
+        source = SOURCES[name]()
+        if not source.available():
+            print(f"⚠️  {name} source unavailable (missing dependency) - skipping")
+            continue
+        sources.append(source)
+    return sources
+
+
+class TicketAggregator:
+    """Runs sources concurrently, each under its own deadline, merging their tickets"""
+
+    def __init__(self, monitor, sources, on_ticket=None, budget=None):
+        self.monitor = monitor
+        self.sources = sources
+        self.on_ticket = on_ticket
+        self.budget = budget
+        self.index = ListingIndex(monitor.event_id) if FINGERPRINT_TOLERANCE > 0 else None
+        self.tickets = []
+        self.results = {}
+
+    async def run(self):
+        """Every source's tickets, in the order they arrived"""
+        await asyncio.gather(*(self.run_source(source) for source in self.sources))
+        if len(self.sources) > 1:
+            print("🧩 Sources: " + ', '.join(
+                f"{name} {result['tickets']} tickets in {result['elapsed']:.1f}s"
+                + ('' if result['outcome'] == 'ok' else f" ({result['outcome']})")
+                for name, result in self.results.items()
+            ))
+        if self.index is not None and self.index.suppressed:
+            print(f"🧬 Dropped {self.index.suppressed} tickets for seats already found through another source")
+        return self.tickets
+
+    def limit(self, source):
+        """Seconds a source may run: its own timeout, capped by the verify stage deadline;
+        sources without one (the pipeline keeps to the budget itself) only by the end of the run"""
+        if self.budget is None:
+            return source.timeout
+        if not source.timeout:
+            return self.budget.remaining()
+        return min(source.timeout, self.budget.remaining('verify'))
+
+    async def run_source(self, source):
+        count = 0
+
+        async def emit(ticket):
+            nonlocal count
+            ticket.setdefault('source', source.name)
+            if self.index is not None and not self.index.admit(ticket, source.name):
+                return
+            count += 1
+            self.tickets.append(ticket)
+            if self.on_ticket:
+                outcome = self.on_ticket(ticket)
+                if inspect.isawaitable(outcome):
+                    await outcome
+
+        limit = self.limit(source)
+        outcome = 'ok'
+        began = time.monotonic()
+        try:
+            async with asyncio.timeout(limit):
+                await source.fetch(self.monitor, emit, self.budget, self.index)
+        except TimeoutError:
+            outcome = f"timed out after {limit:.0f}s"
+            print(f"⏱️  {source.name} source hit its {limit:.0f}s limit - keeping the {count} tickets it found")
+        except Exception as e:
+            outcome = 'failed'
+            print(f"❌ {source.name} source failed: {e}")
+        self.results[source.name] = {
+            'tickets': count,
+            'elapsed': time.monotonic() - began,
+            'outcome': outcome,
+        }
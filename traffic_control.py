@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Per-host rate limiting and circuit breaking for vendor checkout traffic.
+
+Each destination host (the vendor behind an affiliate link, e.g.
+www.vividseats.com) gets a token bucket: VENDOR_RATE requests per second
+with bursts of VENDOR_BURST. A navigation only waits when its own host's
+bucket is empty, so checking one vendor never idles the others.
+
+Each host also gets a circuit breaker. BREAKER_FAILURES consecutive
+timeouts or 403/429 responses open it; while it is open, jobs for that
+host are deferred instead of spending browser time on a vendor that is
+blocking us. After BREAKER_RESET_SECONDS one probe is let through
+(half-open): a response that isn't a 403/429 closes the breaker; a timeout,
+403/429 or any other error reopens it.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+
+from url_canonical import canonicalize_url
+
+BLOCKING_STATUSES = frozenset([403, 429])
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def host_of(url):
+    """Vendor host a checkout link ends up at (affiliate wrapping removed), or None"""
+    if not url:
+        return None
+    return urlparse(canonicalize_url(url)).netloc.lower() or None
+
+
+def is_blocking_failure(status=None, error=None):
+    """Timeouts and 403/429 count against a host's breaker; other errors don't"""
+    if status in BLOCKING_STATUSES:
+        return True
+    if error is not None:
+        # asyncio/aiohttp timeouts, and Playwright's TimeoutError (not a subclass of either)
+        return isinstance(error, asyncio.TimeoutError) or 'Timeout' in type(error).__name__
+    return False
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `capacity`; rate <= 0 means unlimited"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self):
+        """Take a token now and return how long to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        # Tokens can go negative: concurrent callers queue up behind each other
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; probes again after `reset_seconds`"""
+
+    def __init__(self, threshold, reset_seconds, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self):
+        if self.state == OPEN:
+            if self.clock() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = HALF_OPEN
+            return True
+        # Half-open lets a single probe through until it reports back
+        return self.state == CLOSED
+
+    def ready(self):
+        """Whether allow() would let a job through, without starting a half-open probe"""
+        if self.state == OPEN:
+            return self.clock() - self.opened_at >= self.reset_seconds
+        return self.state == CLOSED
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = self.clock()
+
+
+class TrafficControl:
+    """Token bucket and circuit breaker per destination host"""
+
+    def __init__(self, rate=None, burst=None, failure_threshold=None, reset_seconds=None):
+        self.rate = rate if rate is not None else float(os.environ.get('VENDOR_RATE', 0.5))
+        self.burst = burst or float(os.environ.get('VENDOR_BURST', 2))
+        self.failure_threshold = failure_threshold or int(os.environ.get('BREAKER_FAILURES', 3))
+        self.reset_seconds = reset_seconds or float(os.environ.get('BREAKER_RESET_SECONDS', 300))
+        self.buckets = {}
+        self.breakers = {}
+
+    def share(self, parts):
+        """Limit this copy to 1/parts of the rate and burst, for one of `parts` worker processes"""
+        if parts > 1:
+            self.rate /= parts
+            self.burst /= parts
+            self.buckets = {}
+        return self
+
+    def bucket(self, host):
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    def breaker(self, host):
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+        return self.breakers[host]
+
+    def allow(self, host):
+        """False while the host's breaker is open: defer its jobs"""
+        return self.breaker(host).allow()
+
+    def available(self, host):
+        """allow() without side effects, for choosing between hosts"""
+        breaker = self.breakers.get(host)
+        return breaker is None or breaker.ready()
+
+    async def acquire(self, host):
+        """Wait for the host's next request slot; returns seconds waited"""
+        return await self.bucket(host).acquire()
+
+    def record(self, host, status=None, error=None):
+        """Report a request's outcome; returns True if it opened (or reopened) the breaker"""
+        breaker = self.breaker(host)
+        if is_blocking_failure(status, error) or (error is not None and breaker.state == HALF_OPEN):
+            # A half-open probe has to settle the breaker, or the host stays blocked for good
+            was_open = breaker.state == OPEN
+            breaker.record_failure()
+            return breaker.state == OPEN and not was_open
+        if error is None:
+            breaker.record_success()
+        return False
+
+    def open_hosts(self):
+        return sorted(host for host, breaker in self.breakers.items() if breaker.state == OPEN)
+
+    def interleave(self, items, host):
+        """Round-robin items across hosts so consecutive requests hit different vendors"""
+        queues = OrderedDict()
+        for item in items:
+            queues.setdefault(host(item), deque()).append(item)
+        ordered = []
+        while queues:
+            for key in list(queues):
+                ordered.append(queues[key].popleft())
+                if not queues[key]:
+                    del queues[key]
+        return ordered
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Canonical checkout URLs and listing keys.
+
+SeatPick deep links go through affiliate trackers (pxf.io for VividSeats,
+prf.hn for Viagogo, lusg.net for TicketNetwork). Each tracker has one rule
+in AFFILIATE_RULES saying how to unwrap the vendor URL and which vendor
+parameters to keep; rules are looked up by host instead of a chain of
+substring checks. Direct vendor URLs just lose tracking parameters.
+
+Both canonicalize_url and canonical_key are memoized: the same deep link
+is sanitized for navigation, on error paths, for storage keys, diffs and
+alert dedup, and it only needs parsing once.
+"""
+import re
+from functools import lru_cache
+from urllib.parse import parse_qs, unquote, urlencode, urlparse, urlunparse
+
+# Distinct deep links per poll are in the low thousands even for big events
+CACHE_SIZE = 16384
+
+# unwrap 'query': vendor URL is the `param` query value; 'destination': it follows
+# 'destination:' in the path, percent-encoded. keep: vendor params to retain, None for all
+AFFILIATE_RULES = [
+    {
+        'hosts': ('vivid-seats.pxf.io', 'vividseats.pxf.io'),
+        'unwrap': 'query',
+        'param': 'u',
+        'keep': ('showDetails', 'qty'),
+    },
+    {
+        'hosts': ('viagogo.prf.hn',),
+        'unwrap': 'destination',
+        'keep': None,
+    },
+    {
+        'hosts': ('ticketnetwork.lusg.net',),
+        'unwrap': 'query',
+        'param': 'u',
+        'keep': ('ticketGroupId',),
+    },
+]
+
+RULES_BY_HOST = {host: rule for rule in AFFILIATE_RULES for host in rule['hosts']}
+
+TRACKING_PARAMS = frozenset([
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'fbclid', 'gclid', 'msclkid', 'ref', 'referrer', 'source',
+    'camref', 'pubref', 'clickid', 'affid', 'affiliate'
+])
+
+# Patterns that pull the vendor listing id out of a deep link or checkout URL
+LISTING_ID_PATTERNS = [
+    re.compile(r'showDetails=VB(\w+)'),
+    re.compile(r'listingId(?:=|%3D)(-?\d+)'),
+    re.compile(r'ticketGroupId=(\d+)'),
+    re.compile(r'/checkout/preview/\d+/(\d+)'),
+]
+
+
+def unwrap(rule, url, parsed):
+    """Vendor URL inside an affiliate link, or None if the link doesn't carry one"""
+    if rule['unwrap'] == 'destination':
+        marker = url.find('destination:')
+        return unquote(url[marker + len('destination:'):]) if marker != -1 else None
+    values = parse_qs(parsed.query).get(rule['param'])
+    return values[0] if values else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonicalize_url(url):
+    """Vendor checkout URL without affiliate wrapping or tracking parameters"""
+    if not url:
+        return url
+
+    parsed = urlparse(url)
+    rule = RULES_BY_HOST.get(parsed.netloc.lower())
+    if rule is None:
+        params = parse_qs(parsed.query)
+        clean_params = {k: v[0] for k, v in params.items() if k.lower() not in TRACKING_PARAMS}
+        return urlunparse((parsed.scheme, parsed.netloc, parsed.path, '',
+                           urlencode(clean_params) if clean_params else '', ''))
+
+    target = unwrap(rule, url, parsed)
+    if target is None:
+        return url
+    if rule['keep'] is None:
+        return target
+
+    parsed_target = urlparse(target)
+    target_params = parse_qs(parsed_target.query)
+    clean_params = {k: target_params[k][0] for k in rule['keep'] if k in target_params}
+    return urlunparse((parsed_target.scheme, parsed_target.netloc, parsed_target.path, '',
+                       urlencode(clean_params), ''))
+
+
+def listing_id_from_url(url):
+    """Return the vendor listing id embedded in a deep link or checkout URL"""
+    if not url:
+        return None
+    for pattern in LISTING_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_key(seller, url):
+    """'seller:vendor_listing_id' for a deep link or its canonical URL, or None without an id"""
+    listing_id = listing_id_from_url(canonicalize_url(url)) or listing_id_from_url(url)
+    return f"{seller}:{listing_id}" if listing_id else None
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Checkout verification sharded across worker processes.
+
+Page rendering and the regex scans in extract_final_price all run on one
+event loop, so a single process tops out at one core. VerificationPool
+starts K processes; each unpickles its own copy of the monitor, opens its
+own verification session (HTTP client, browser on demand) through
+monitor.verification_session(), and pulls (index, listing) jobs from a
+shared queue until it sees a stop sentinel.
+Results come back on a second queue. verify() puts them back in input
+order, so callers get the same list of verified dicts as the in-process
+path; the pipeline instead submits jobs and consumes results() as they
+stream.
+Listings whose worker died are returned unverified rather than dropped.
+When the run budget cancels the pipeline, stop() terminates the workers
+without waiting on them and hands back the results they already sent.
+Each worker rate-limits vendors through its own copy of monitor.traffic,
+given 1/K of VENDOR_RATE and VENDOR_BURST so the K workers together keep
+to the per-host limit.
+"""
+import asyncio
+import multiprocessing
+import queue
+
+
+def worker_main(monitor, jobs, results, workers=1):
+    """Process entry point: verify jobs until the stop sentinel"""
+    monitor.traffic.share(workers)
+    asyncio.run(run_worker(monitor, jobs, results))
+
+
+async def run_worker(monitor, jobs, results):
+    loop = asyncio.get_running_loop()
+    async with monitor.verification_session() as context:
+        while True:
+            job = await loop.run_in_executor(None, jobs.get)
+            if job is None:
+                break
+            index, listing = job
+            try:
+                result = await monitor.verify_listing(context, listing)
+            except Exception as e:
+                print(f"   ❌ Worker error verifying {listing.get('section', '')}: {str(e)[:100]}")
+                result = monitor.unverified_result(listing, monitor.sanitize_checkout_url(listing.get('deepLink', '')))
+            results.put((index, result))
+
+
+class VerificationPool:
+    """Fan verification jobs out to worker processes and gather results in order"""
+
+    def __init__(self, monitor, workers, poll_timeout=0.25):
+        self.monitor = monitor
+        self.workers = workers
+        self.poll_timeout = poll_timeout
+        self.processes = []
+        self.submitted = {}
+        self.closed = False
+        self.stopped = False
+        # The in-progress result read, shielded so a cancelled run doesn't drop what it returns
+        self.reading = None
+
+    def start(self, worker_count=None):
+        # spawn, not fork: the coordinator may already hold an event loop, threads and SQLite handles
+        mp = multiprocessing.get_context('spawn')
+        self.jobs = mp.Queue()
+        self.result_queue = mp.Queue()
+        count = worker_count or self.workers
+        self.processes = [
+            mp.Process(target=worker_main, args=(self.monitor, self.jobs, self.result_queue, count), daemon=True)
+            for _ in range(count)
+        ]
+        for process in self.processes:
+            process.start()
+        print(f"🧵 Verifying across {len(self.processes)} worker processes")
+
+    def submit(self, index, listing):
+        self.submitted[index] = listing
+        self.jobs.put((index, listing))
+
+    def close(self):
+        """No more jobs: each worker exits after the queue drains"""
+        self.closed = True
+        for _ in self.processes:
+            self.jobs.put(None)
+
+    async def results(self):
+        """Yield (index, result) as workers finish, until every submitted job is back;
+        jobs lost with a dead worker come back unverified"""
+        loop = asyncio.get_running_loop()
+        collected = set()
+        while not (self.closed and len(collected) >= len(self.submitted)):
+            if self.reading is None:
+                self.reading = loop.run_in_executor(None, self.result_queue.get, True, self.poll_timeout)
+            try:
+                index, result = await asyncio.shield(self.reading)
+            except queue.Empty:
+                self.reading = None
+                if not any(p.is_alive() for p in self.processes):
+                    break
+                continue
+            self.reading = None
+            collected.add(index)
+            yield index, result
+
+        # Workers that exited may still have results in the pipe
+        while len(collected) < len(self.submitted):
+            try:
+                index, result = self.result_queue.get(timeout=0.1)
+            except queue.Empty:
+                break
+            collected.add(index)
+            yield index, result
+
+        missing = [index for index in self.submitted if index not in collected]
+        if missing:
+            print(f"⚠️  {len(missing)} listings lost with their worker - returning them unverified")
+        for index in missing:
+            listing = self.submitted[index]
+            yield index, self.monitor.unverified_result(listing, self.monitor.sanitize_checkout_url(listing.get('deepLink', '')))
+
+    def ready_results(self):
+        """Results already sent back and not yet read"""
+        ready = []
+        while True:
+            try:
+                ready.append(self.result_queue.get(timeout=0.05))
+            except queue.Empty:
+                return ready
+
+    async def stop(self):
+        """Out of time: terminate the workers without joining them; returns the (index, result)
+        pairs they finished that results() hadn't yielded yet"""
+        self.stopped = True
+        finished = []
+        if self.reading is not None:
+            try:
+                finished.append(await self.reading)
+            except queue.Empty:
+                pass
+            self.reading = None
+        finished.extend(await asyncio.get_running_loop().run_in_executor(None, self.ready_results))
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        return finished
+
+    def shutdown(self):
+        if self.stopped:
+            return
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    async def verify(self, listings):
+        self.start(min(self.workers, len(listings)))
+        collected = {}
+        try:
+            for job in enumerate(listings):
+                self.submit(*job)
+            self.close()
+            async for index, result in self.results():
+                collected[index] = result
+        finally:
+            self.shutdown()
+        return [collected[index] for index in range(len(listings))]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Priority ordering for checkout verification.
+
+Each listing is scored by how likely its all-in price is to land under the
+alert thresholds: the fee model's expected all-in price (the same
+fee_model.FeeModel that classifies listings), how close that lands to
+$300 / $400, and how much we want the section. The
+per-cycle budget is spent in score order; the rest is deferred to the next
+cycle (with an aging boost so nothing starves) instead of being dropped.
+"""
+import heapq
+import math
+import os
+from datetime import datetime
+
+from listing_diff import listing_key
+
+# Typical all-in markup over the SeatPick price while the fee model has too little history
+DEFAULT_FEE_MARKUPS = {
+    'vividseats': 1.35,
+    'vgg': 1.35,
+    'te': 1.30,
+    'tn': 1.30,
+}
+UNKNOWN_SELLER_MARKUP = 1.35
+
+# Section preference, matching sort_tickets_by_section: Center, Left, Right, Other
+SECTION_WEIGHTS = {
+    'Center': 1.0,
+    'Left': 0.9,
+    'Right': 0.85,
+    'Other': 0.6,
+}
+
+URGENT_THRESHOLD = 300
+TEST_THRESHOLD = 400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verification_deferred (
+    event_id TEXT NOT NULL,
+    listing_key TEXT NOT NULL,
+    deferrals INTEGER NOT NULL DEFAULT 1,
+    last_deferred_at TEXT NOT NULL,
+    PRIMARY KEY (event_id, listing_key)
+);
+"""
+
+
+def likelihood_under(expected_price, threshold, spread=0.08):
+    """Soft probability that a price estimated at `expected_price` lands under `threshold`"""
+    if expected_price <= 0:
+        return 0.0
+    # Logistic in log-price space: 50% at the threshold, ~8% relative spread
+    z = (math.log(threshold) - math.log(expected_price)) / spread
+    return 1 / (1 + math.exp(-max(-60, min(60, z))))
+
+
+class VerificationQueue:
+    """Scores listings for verification and carries unverified ones to the next cycle"""
+
+    def __init__(self, conn, get_section_category, fee_model=None, budget=None):
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self.get_section_category = get_section_category
+        self.fee_model = fee_model
+        self.budget = budget or int(os.environ.get('VERIFY_BUDGET', 20))
+
+    def expected_final_price(self, listing):
+        """The fee model's expected all-in price, or the default markup without enough history"""
+        prediction = self.fee_model.predict(listing) if self.fee_model is not None else None
+        if prediction:
+            return prediction[1]
+        markup = DEFAULT_FEE_MARKUPS.get(listing.get('seller', ''), UNKNOWN_SELLER_MARKUP)
+        return (listing.get('price') or 0) * markup
+
+    def score(self, listing, deferrals=0, boosted=False):
+        """Higher is more worth a browser navigation this cycle"""
+        if not listing.get('deepLink'):
+            # Nothing to navigate; these pass through without spending budget
+            return float('inf')
+        expected = self.expected_final_price(listing)
+        alert_likelihood = 2 * likelihood_under(expected, URGENT_THRESHOLD) + likelihood_under(expected, TEST_THRESHOLD)
+        section_weight = SECTION_WEIGHTS.get(self.get_section_category(listing.get('section', '')), 0.6)
+        # Aging: every deferred cycle adds a little so low scorers are eventually checked.
+        # Boosted listings (price-drop events) go ahead of anything scored on thresholds
+        return alert_likelihood * section_weight + 0.05 * deferrals + (3.0 if boosted else 0.0)
+
+    def deferred_counts(self, event_id):
+        return dict(self.conn.execute(
+            "SELECT listing_key, deferrals FROM verification_deferred WHERE event_id = ?", (str(event_id),)
+        ))
+
+    def plan(self, event_id, listings, boosted=()):
+        """Split listings into (verify now in score order, deferred to next cycle)"""
+        deferred_before = self.deferred_counts(event_id)
+        heap = []
+        for i, listing in enumerate(listings):
+            key = listing_key(listing)
+            score = self.score(listing, deferred_before.get(key, 0), key in boosted)
+            heapq.heappush(heap, (-score, i, listing))
+
+        to_verify = []
+        deferred = []
+        spent = 0
+        while heap:
+            _, _, listing = heapq.heappop(heap)
+            if not listing.get('deepLink'):
+                to_verify.append(listing)
+            elif spent < self.budget:
+                to_verify.append(listing)
+                spent += 1
+            else:
+                deferred.append(listing)
+
+        self.save_deferred(event_id, deferred, deferred_before)
+        return to_verify, deferred
+
+    def defer(self, event_id, listings):
+        """Add listings to the deferred set after planning (e.g. their vendor was blocking us)"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO verification_deferred (event_id, listing_key, deferrals, last_deferred_at)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT (event_id, listing_key) DO UPDATE SET
+                    deferrals = deferrals + 1,
+                    last_deferred_at = excluded.last_deferred_at
+            """, [(str(event_id), listing_key(listing), now) for listing in listings])
+
+    def save_deferred(self, event_id, deferred, deferred_before):
+        """Replace the deferred set; listings that sold out simply disappear"""
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = []
+        for listing in deferred:
+            key = listing_key(listing)
+            rows.append((str(event_id), key, deferred_before.get(key, 0) + 1, now))
+        with self.conn:
+            self.conn.execute("DELETE FROM verification_deferred WHERE event_id = ?", (str(event_id),))
+            self.conn.executemany("""
+                INSERT INTO verification_deferred (event_id, listing_key, deferrals, last_deferred_at)
+                VALUES (?, ?, ?, ?)
+            """, rows)
@@ -7,12 +7,17 @@ from datetime import datetime
 from playwright.async_api import async_playwright
 import time
 
+from traffic_control import TrafficControl, host_of
+
 class VerifiedSeatPickScraper:
     def __init__(self):
         self.event_id = "366607"
         self.base_url = "https://seatpick.com"
         self.api_url = f"https://seatpick.com/api/proxy/4/events/{self.event_id}/listings"
         
+        # Per-vendor rate limits and circuit breakers for checkout pages
+        self.traffic = TrafficControl()
+        
         # Your desired sections (from the filter screenshot)
         self.desired_sections = [
             "Center",
@@ -137,13 +142,21 @@ class VerifiedSeatPickScraper:
                     print(f"  ⏭️  Skipping {listing['section']} - no checkout link")
                     continue
                 
+                host = host_of(listing['deeplink'])
+                if not self.traffic.allow(host):
+                    print(f"  ⛔ Skipping {listing['section']} - {host} is blocking us (circuit open)")
+                    listing['verified'] = False
+                    continue
+                
                 print(f"  [{i+1}/{len(listings)}] Verifying {listing['section']} ${listing['price']} from {listing['seller_name']}...")
+                await self.traffic.acquire(host)
                 
                 try:
                     page = await context.new_page()
                     
                     # Navigate to checkout page
-                    await page.goto(listing['deeplink'], wait_until='domcontentloaded', timeout=15000)
+                    response = await page.goto(listing['deeplink'], wait_until='domcontentloaded', timeout=15000)
+                    self.traffic.record(host, status=getattr(response, 'status', None))
                     await page.wait_for_timeout(3000)  # Let page fully load
                     
                     # Try to find price on checkout page
@@ -198,13 +211,11 @@ class VerifiedSeatPickScraper:
                 except Exception as e:
                     print(f"    ❌ Error verifying {listing['seller_name']}: {str(e)[:100]}")
                     listing['verified'] = False
+                    self.traffic.record(host, error=e)
                     try:
                         await page.close()
                     except:
                         pass
-                
-                # Rate limiting to avoid being blocked
-                await asyncio.sleep(2)
             
             await browser.close()
         